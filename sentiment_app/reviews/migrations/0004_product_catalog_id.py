@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_delete_recommendation_delete_review'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='catalog_id',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
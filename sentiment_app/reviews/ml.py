@@ -1,77 +1,70 @@
 # reviews/ml.py
 
-from pathlib import Path
-import joblib
+import os
+import threading
 import numpy as np
 
-# пробуем аккуратно подключить keras (для LSTM)
-try:
-    from tensorflow.keras.models import load_model
-    from tensorflow.keras.preprocessing.sequence import pad_sequences
-    import pickle
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    load_model = None
-    pad_sequences = None
-    pickle = None
-    TENSORFLOW_AVAILABLE = False
+from django.conf import settings
 
-BASE_DIR = Path(__file__).resolve().parent  # папка reviews
+from .registry import registry
+from src.lstm_batcher import process_batcher
+from src.prediction_cache import PredictionCache, LRUCache, DjangoCache
 
+# длина последовательности и бакеты берутся из lstm_config.json (max_len, length_buckets)
 
-# ============ 1. Naive Bayes ============
+# одиночные запросы к LSTM из параллельных потоков склеиваются в один батч
+LSTM_MICRO_BATCHING = os.environ.get("LSTM_MICRO_BATCHING", "1") != "0"
 
-NB_MODEL_PATH = BASE_DIR / "naive_bayes_model.joblib"
-NB_VECTORIZER_PATH = BASE_DIR / "naive_bayes_tfidf.joblib"
-NB_ENCODER_PATH = BASE_DIR / "naive_bayes_label_encoder.joblib"
 
-try:
-    nb_model = joblib.load(NB_MODEL_PATH)
-    nb_vectorizer = joblib.load(NB_VECTORIZER_PATH)
-    nb_encoder = joblib.load(NB_ENCODER_PATH)
-    print("✔ Naive Bayes loaded")
-except Exception as e:
-    print("❌ Error loading Naive Bayes:", e)
-    nb_model = nb_vectorizer = nb_encoder = None
+# кэш предсказаний: ключ = (модель, отпечаток артефактов, clean_text(текст));
+# после выкладки переобученной модели в models/ старые записи перестают совпадать.
+# SENTIMENT_PREDICTION_CACHE["BACKEND"]: "local" (LRU в процессе) | "django" (CACHES[ALIAS]) | None
+_cache_conf = getattr(settings, "SENTIMENT_PREDICTION_CACHE", {"BACKEND": "local"}) or {}
+_cache_lock = threading.Lock()
+_prediction_cache = None
 
 
-# ============ 2. SVM ============
+def get_prediction_cache():
+    global _prediction_cache
+    backend = _cache_conf.get("BACKEND")
+    if backend is None:
+        return None
+    if _prediction_cache is None:
+        with _cache_lock:
+            if _prediction_cache is None:
+                ttl = _cache_conf.get("TTL", 3600)
+                if backend == "django":
+                    store = DjangoCache(_cache_conf.get("ALIAS", "default"), ttl=ttl)
+                else:
+                    store = LRUCache(_cache_conf.get("MAX_SIZE", 10000), ttl=ttl)
+                _prediction_cache = PredictionCache(
+                    lambda name: registry.reload_if_changed(name).fingerprint,
+                    store, namespace="reviews",
+                )
+    return _prediction_cache
 
-SVM_MODEL_PATH = BASE_DIR / "svm_model.joblib"
-SVM_VECTORIZER_PATH = BASE_DIR / "svm_tfidf.joblib"
-SVM_ENCODER_PATH = BASE_DIR / "svm_label_encoder.joblib"
 
-try:
-    svm_model = joblib.load(SVM_MODEL_PATH)
-    svm_vectorizer = joblib.load(SVM_VECTORIZER_PATH)
-    svm_encoder = joblib.load(SVM_ENCODER_PATH)
-    print("✔ SVM loaded")
-except Exception as e:
-    print("❌ Error loading SVM:", e)
-    svm_model = svm_vectorizer = svm_encoder = None
+def cache_stats():
+    """Счётчики попаданий/промахов кэша предсказаний (пустой dict, если кэш выключен)."""
+    cache = get_prediction_cache()
+    return cache.stats() if cache is not None else {}
 
 
-# ============ 3. LSTM ============
+# общий для процесса MicroBatcher (пересоздаётся после fork)
+_get_lstm_batcher = process_batcher(
+    lambda texts: _predict_labels(registry.get("lstm"), texts, BATCH_SIZE)
+)
 
-LSTM_MODEL_PATH = BASE_DIR / "lstm_model.h5"
-LSTM_TOKENIZER_PATH = BASE_DIR / "lstm_tokenizer.pkl"
-LSTM_ENCODER_PATH = BASE_DIR / "lstm_label_encoder.joblib"
 
-if TENSORFLOW_AVAILABLE:
+def _get_model(model_type: str):
+    """Модель из общего реестра (загружается при первом обращении) или None."""
     try:
-        lstm_model = load_model(LSTM_MODEL_PATH)
-        with open(LSTM_TOKENIZER_PATH, "rb") as f:
-            lstm_tokenizer = pickle.load(f)
-        lstm_encoder = joblib.load(LSTM_ENCODER_PATH)
-        MAX_LEN = 100  # ту длину, которую ты использовала при обучении
-        print("✔ LSTM loaded")
+        return registry.get(model_type)
+    except ValueError:
+        return None
     except Exception as e:
-        print("❌ Error loading LSTM:", e)
-        lstm_model = lstm_tokenizer = lstm_encoder = None
-        MAX_LEN = 100
-else:
-    lstm_model = lstm_tokenizer = lstm_encoder = None
-    MAX_LEN = 100
+        print(f"❌ Error loading {model_type}:", e)
+        return None
 
 
 def analyze_sentiment(text: str, model_type: str = "nb") -> str:
@@ -83,27 +76,62 @@ def analyze_sentiment(text: str, model_type: str = "nb") -> str:
     if not text:
         return "Neutral"
 
-    # --- Naive Bayes ---
-    if model_type == "nb" and nb_model and nb_vectorizer and nb_encoder:
-        X = nb_vectorizer.transform([text])
-        pred = nb_model.predict(X)[0]
-        label = nb_encoder.inverse_transform([pred])[0]
-        return str(label).capitalize()
-
-    # --- SVM ---
-    if model_type == "svm" and svm_model and svm_vectorizer and svm_encoder:
-        X = svm_vectorizer.transform([text])
-        pred = svm_model.predict(X)[0]
-        label = svm_encoder.inverse_transform([pred])[0]
-        return str(label).capitalize()
-
-    # --- LSTM ---
-    if model_type == "lstm" and lstm_model and lstm_tokenizer and lstm_encoder:
-        seq = lstm_tokenizer.texts_to_sequences([text])
-        seq = pad_sequences(seq, maxlen=MAX_LEN)
-        probs = lstm_model.predict(seq)[0]
-        pred_class = int(np.argmax(probs))
-        label = lstm_encoder.inverse_transform([pred_class])[0]
-        return str(label).capitalize()
-
-    return "Error"
+    loaded = _get_model(model_type)
+    if loaded is None:
+        return "Error"
+
+    if loaded.vectorizer is None and LSTM_MICRO_BATCHING:
+        # --- LSTM: одиночные запросы склеиваются в батч ---
+        predict = lambda miss: [_get_lstm_batcher().predict(t) for t in miss]
+    else:
+        # модель берётся из реестра в момент вызова: кэш мог подгрузить новую версию
+        predict = lambda miss: _predict_labels(registry.get(model_type), miss, BATCH_SIZE)
+
+    cache = get_prediction_cache()
+    if cache is None:
+        return predict([text])[0]
+    return cache.predict([text], model_type, predict)[0]
+
+
+BATCH_SIZE = 1024
+
+
+def analyze_sentiment_batch(texts, model_type: str = "nb", batch_size: int = BATCH_SIZE) -> list:
+    """
+    Пакетная версия analyze_sentiment: векторизует сразу batch_size текстов,
+    один predict (или один проход LSTM) на батч.
+    Возвращает список меток в том же порядке, что и texts.
+    """
+    texts = [(t or "").strip() for t in texts]
+    results = ["Neutral"] * len(texts)
+    idx = [i for i, t in enumerate(texts) if t]
+
+    loaded = _get_model(model_type)
+    if loaded is None:
+        return ["Error"] * len(texts)
+
+    cache = get_prediction_cache()
+    chunk = [texts[i] for i in idx]
+    if cache is None:
+        preds = _predict_labels(loaded, chunk, batch_size)
+    else:
+        preds = cache.predict(chunk, model_type, lambda miss: _predict_labels(registry.get(model_type), miss, batch_size))
+    for i, label in zip(idx, preds):
+        results[i] = label
+
+    return results
+
+
+def _predict_labels(loaded, texts, batch_size):
+    """Метки ('Positive' / ...) для непустых текстов: NB/SVM векторизуют батч, LSTM - один проход."""
+    # индекс -> метка, чтобы не вызывать inverse_transform на каждый элемент
+    labels = np.array([str(c).capitalize() for c in loaded.labels], dtype=object)
+    out = []
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        if loaded.vectorizer is not None:
+            pred = loaded.predict_encoded(loaded.vectorizer.transform(chunk))
+        else:
+            pred = np.argmax(loaded.predict_proba(chunk), axis=1)
+        out.extend(labels[np.asarray(pred, dtype=np.intp)])
+    return out
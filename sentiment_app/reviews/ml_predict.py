@@ -1,22 +1,8 @@
-import joblib
-import tensorflow as tf
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-
-# -----------------------------
-# Load traditional ML models
-# -----------------------------
-nb_model = joblib.load(r"reviews\models\naive_bayes_model.joblib")
-svm_model = joblib.load(r"reviews\models\svm_model.joblib")
-
-nb_vectorizer = joblib.load(r"reviews\models\naive_bayes_tfidf.joblib")
-svm_vectorizer = joblib.load(r"reviews\models\svm_tfidf.joblib")
-
 # -----------------------------
-# Load LSTM model
+# Models come from the shared, lazily loaded registry
+# (TensorFlow is only imported if the LSTM is used)
 # -----------------------------
-lstm_model = tf.keras.models.load_model(r"reviews\models\lstm_model.h5")
-with open(r"reviews\models\lstm_tokenizer.pkl", "rb") as f:
-    lstm_tokenizer = joblib.load(f)
+from reviews.registry import registry
 
 LSTM_MAXLEN = 200 # Must match what was used during training
 
@@ -30,18 +16,14 @@ def predict_sentiment(text: str, model_name: str = "nb") -> str:
     """
     model_name = model_name.lower()
     
-    if model_name == "nb":
-        X = nb_vectorizer.transform([text])
-        pred = nb_model.predict(X)[0]
-
-    elif model_name == "svm":
-        X = svm_vectorizer.transform([text])
-        pred = svm_model.predict(X)[0]
+    if model_name in ("nb", "svm"):
+        loaded = registry.get(model_name)
+        X = loaded.vectorizer.transform([text])
+        pred = loaded.predict_encoded(X)[0]
 
     elif model_name == "lstm":
-        seq = lstm_tokenizer.texts_to_sequences([text])
-        padded = pad_sequences(seq, maxlen=LSTM_MAXLEN)
-        prob = lstm_model.predict(padded, verbose=0)[0][0]
+        loaded = registry.get(model_name)
+        prob = loaded.predict_proba([text], max_len=LSTM_MAXLEN, padding="pre", truncating="pre")[0][0]
         pred = 1 if prob > 0.5 else 0
 
     else:
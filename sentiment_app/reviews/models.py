@@ -21,6 +21,9 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # id of the same product in the reviews database (src/db.py products.id / reviews.product_id);
+    # the review-based similarity index is keyed on it
+    catalog_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
 
     class Meta:
         db_table = "Product"
@@ -1,27 +1,21 @@
 # reviews/recommender.py
 
-import joblib
-import tensorflow as tf
 import pandas as pd
 from reviews.ml_predict import predict_sentiment
+from src.product_stats import recommend_from_stats
 
-# Load models and transformers
-# NB and SVM use the same TF-IDF vectorizer
-vectorizer = joblib.load(r"reviews\models\naive_bayes_tfidf.joblib")  # shared for NB/SVM
+# Models (NB/SVM TF-IDF, LSTM) are not loaded here: predict_sentiment pulls them
+# from the shared reviews.registry on first use.
 
-# LSTM
-lstm_model = tf.keras.models.load_model(r"reviews\models\lstm_model.h5")
-with open(r"reviews\models\lstm_tokenizer.pkl", "rb") as f:
-    lstm_tokenizer = joblib.load(f)
 
-
-def recommend_products(user_text: str, product_df: pd.DataFrame, ml_model="svm"):
+def recommend_products(user_text: str, product_df: pd.DataFrame = None, ml_model="svm"):
     """
     Returns top 5 product IDs to recommend based on user's review text.
 
     Parameters:
         user_text: str
-        product_df: pandas DataFrame with columns ["product_id", "review_text", "sentiment"]
+        product_df: pandas DataFrame with columns ["product_id", "review_text", "sentiment"],
+            or None to read the ranking from the precomputed product_sentiment_stats table
         ml_model: "nb", "svm", or "lstm" (controls which ML model to use for sentiment)
 
     Returns:
@@ -33,6 +27,11 @@ def recommend_products(user_text: str, product_df: pd.DataFrame, ml_model="svm")
     # 1) Predict sentiment
     user_sentiment = predict_sentiment(user_text, model_name=ml_model)
 
+    if product_df is None:
+        # same ranking as src/recommender.py: one indexed read of product_sentiment_stats
+        recommendations = recommend_from_stats(user_sentiment == "positive")
+        return {"user_sentiment": user_sentiment, "recommended_products": recommendations}
+
     # 2) Filter products based on sentiment
     if user_sentiment == "positive":
         filtered = product_df[product_df["sentiment"] == "positive"]
@@ -0,0 +1,18 @@
+# reviews/registry.py
+# Общий (один на процесс) реестр моделей для всего приложения reviews.
+# Модели загружаются лениво, TensorFlow импортируется только при первом обращении к LSTM.
+import os
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent  # папка reviews
+PROJECT_ROOT = BASE_DIR.parent.parent       # корень репозитория (там лежит src/)
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.model_registry import get_registry  # noqa: E402
+
+MODELS_DIR = Path(os.environ.get("SENTIMENT_MODELS_DIR") or BASE_DIR / "models")
+
+registry = get_registry(MODELS_DIR)
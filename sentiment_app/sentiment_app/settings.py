@@ -123,3 +123,12 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Sentiment prediction cache (reviews/ml.py)
+# BACKEND: 'local' = per-process LRU, 'django' = CACHES[ALIAS] shared by all workers, None = off
+SENTIMENT_PREDICTION_CACHE = {
+    'BACKEND': 'local',
+    'ALIAS': 'default',
+    'MAX_SIZE': 10000,
+    'TTL': 3600,
+}
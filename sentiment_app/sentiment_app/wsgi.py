@@ -14,3 +14,20 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sentiment_app.settings')
 
 application = get_wsgi_application()
+
+# Pre-fork model loading (run with `gunicorn --preload`): load the models once in the
+# master so forked workers share them copy-on-write.
+#   SENTIMENT_PRELOAD=1          -> every model whose artifacts exist
+#   SENTIMENT_PRELOAD=nb,svm     -> only these
+# Only NB/SVM and the NumPy LSTM backend (lstm_model_numpy.npz) can be pre-loaded: the keras
+# backend imports TensorFlow, whose threads do not survive fork(), so share_for_fork skips it
+# (LSTM_BACKEND=keras, or no NumPy export) and each worker loads it on first use instead.
+_preload = os.environ.get('SENTIMENT_PRELOAD', '').strip().lower()
+if _preload and _preload not in ('0', 'false', 'no'):
+    from reviews.registry import registry
+    from src.model_registry import memory_usage
+
+    _names = None if _preload in ('1', 'true', 'yes', 'all') else _preload.split(',')
+    _before = memory_usage()
+    _loaded = registry.share_for_fork(_names)
+    print(f"Pre-loaded models {_loaded} for fork; memory before {_before}, after {memory_usage()}")
@@ -1,10 +1,74 @@
+import os
 import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # repository root (contains src/)
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.product_similarity import SimilarityIndex, INDEX_DIR  # noqa: E402
+
+# The similarity index is keyed on the catalog product ids of the reviews database
+# (src/db.py: products.id / reviews.product_id). Django products are matched to it through
+# Product.catalog_id; products without one get the same-category fallback.
+
+# how often (seconds) meta.json is stat'ed to pick up a rebuilt index
+INDEX_CHECK_INTERVAL = float(os.environ.get("PRODUCT_SIMILARITY_CHECK_INTERVAL", "2.0"))
+
+_index_lock = threading.Lock()
+_index_state = {"index": None, "mtime": None, "checked": 0.0}
+
+
+def _meta_mtime(index_dir):
+    try:
+        return os.stat(os.path.join(index_dir, "meta.json")).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def similarity_index(interval=INDEX_CHECK_INTERVAL):
+    """
+    Product similarity index built by src/product_similarity.py (None until it exists).
+    SimilarityIndex.save writes meta.json last, so a changed mtime (checked at most every
+    `interval` seconds) means a complete new index; a failed load keeps the current one.
+    """
+    state = _index_state
+    if time.monotonic() - state["checked"] < interval:
+        return state["index"]
+    with _index_lock:
+        if time.monotonic() - state["checked"] < interval:
+            return state["index"]
+        mtime = _meta_mtime(INDEX_DIR)
+        if mtime != state["mtime"]:
+            try:
+                state["index"] = SimilarityIndex.load(INDEX_DIR) if mtime is not None else None
+                state["mtime"] = mtime
+            except (OSError, ValueError):
+                pass  # index being replaced: keep serving the old one, retry next interval
+        state["checked"] = time.monotonic()
+        return state["index"]
+
 
 class RecommendationService:
     @staticmethod
-    def recommend_for_product(product):
-        # Placeholder logic — replace with ML later
+    def recommend_for_product(product, k=3):
+        # Products whose positive reviews read most alike (precomputed neighbours, no DB scan)
+        index = similarity_index()
+        catalog_id = getattr(product, "catalog_id", None)
+        if index is not None and catalog_id:
+            # all stored neighbours: some may not be in the Django catalog
+            ids = [pid for pid, _ in index.similar(catalog_id, max(k, index.neighbors.shape[1]))]
+            if ids:
+                found = {p.catalog_id: p for p in type(product).objects.filter(catalog_id__in=ids)}
+                similar = [found[pid] for pid in ids if pid in found][:k]
+                if similar:
+                    return similar
+
+        # Fallback for products without reviews in the index: same category
         related = product.category.products.exclude(id=product.id)[:10]
         if not related:
             return []
-        return random.sample(list(related), min(3, len(related)))
+        return random.sample(list(related), min(k, len(related)))
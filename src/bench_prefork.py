@@ -0,0 +1,94 @@
+# src/bench_prefork.py
+# Per-worker memory with and without the registry's pre-fork sharing mode.
+# Each run starts a fresh "master" that loads the models, forks N workers
+# (like gunicorn --preload), lets every worker score a batch of reviews and
+# reports the worker's rss / uss / pss. Workers also score documents built from the
+# whole vocabulary and run a full gc pass, the way a long-lived worker eventually
+# touches every vocabulary entry. Linux / macOS only (uses os.fork).
+#
+#   python src/bench_prefork.py --workers 4 --models svm nb
+import os
+import gc
+import sys
+import json
+import argparse
+import subprocess
+
+try:
+    from src.model_registry import ModelRegistry, MODELS_DIR, memory_usage
+except ImportError:
+    from model_registry import ModelRegistry, MODELS_DIR, memory_usage
+
+SAMPLE_TEXTS = [
+    "This product arrived quickly and the battery life is excellent. Highly recommend!",
+    "Terrible quality, it broke after two days and support never answered.",
+    "It is okay for the price, nothing special but does the job.",
+] * 100
+
+
+def vocabulary_docs(vectorizer, words_per_doc=50):
+    if hasattr(vectorizer, "vocabulary_"):
+        terms = list(vectorizer.vocabulary_)
+    else:
+        terms = [t.decode("utf-8") for t in vectorizer.terms]
+    return [" ".join(terms[i:i + words_per_doc]) for i in range(0, len(terms), words_per_doc)]
+
+
+def run_master(mode, workers, names):
+    reg = ModelRegistry(MODELS_DIR)
+    if mode == "shared":
+        loaded = reg.share_for_fork(names)
+    else:
+        loaded = reg.warmup(names, ignore_missing=True)
+    results = {"mode": mode, "models": loaded, "master": memory_usage(), "workers": []}
+
+    pipes = []
+    for _ in range(workers):
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(r)
+            for name in loaded:
+                m = reg.get(name)
+                m.model.predict(m.vectorizer.transform(SAMPLE_TEXTS))
+                m.model.predict(m.vectorizer.transform(vocabulary_docs(m.vectorizer)))
+            gc.collect()
+            with os.fdopen(w, "w") as f:
+                json.dump(memory_usage(), f)
+            os._exit(0)
+        os.close(w)
+        pipes.append((pid, r))
+
+    for pid, r in pipes:
+        with os.fdopen(r) as f:
+            results["workers"].append(json.load(f))
+        os.waitpid(pid, 0)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--models", nargs="+", default=["nb", "svm"])
+    parser.add_argument("--mode", choices=["plain", "shared"])
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_master(args.mode, args.workers, args.models)))
+        return
+
+    # run each mode in a fresh interpreter so they don't share any state
+    for mode in ("plain", "shared"):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode,
+             "--workers", str(args.workers), "--models", *args.models],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        res = json.loads(out.strip().splitlines()[-1])
+        print(f"[{mode}] models={res['models']} master={res['master']}")
+        for i, mem in enumerate(res["workers"]):
+            print(f"\tworker {i}: {mem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# src/bench_vectorizers.py
+# Compare serving cost and accuracy of models trained with the vocabulary TF-IDF
+# vectorizer vs. the hashing vectorizer (VECTORIZER=hashing in train_nb.py / train_svm.py):
+#
+#   python src/train_svm.py                                           -> models/
+#   VECTORIZER=hashing MODELS_OUT_DIR=models_hashing python src/train_svm.py
+#   python src/bench_vectorizers.py --model svm --dirs models models_hashing
+#
+# For every directory: cold load time, RSS growth from loading, transform+predict
+# throughput, and accuracy / macro F1 from <model>_metrics.json.
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+
+try:
+    from src.model_registry import ModelRegistry, MODEL_PREFIXES, memory_usage
+    from src.processed_data import processed_path, load_processed
+except ImportError:
+    from model_registry import ModelRegistry, MODEL_PREFIXES, memory_usage
+    from processed_data import processed_path, load_processed
+
+DATA_PATH = processed_path("test_clean")
+
+FALLBACK_TEXTS = [
+    "This product arrived quickly and the battery life is excellent. Highly recommend!",
+    "Terrible quality, it broke after two days and support never answered.",
+    "It is okay for the price, nothing special but does the job.",
+]
+
+
+def load_texts(path, n):
+    try:
+        texts = load_processed(path, columns=["text"], max_samples=n)["text"].dropna().astype(str).tolist()
+    except Exception:
+        texts = []
+    if not texts:
+        texts = FALLBACK_TEXTS
+    return (texts * (n // len(texts) + 1))[:n]
+
+
+def measure(models_dir, model_name, texts, batch_size):
+    rss_before = memory_usage().get("rss", 0.0)
+    t0 = time.perf_counter()
+    loaded = ModelRegistry(models_dir).get(model_name)
+    load_s = time.perf_counter() - t0
+    rss_after = memory_usage().get("rss", 0.0)
+
+    t0 = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        loaded.model.predict(loaded.vectorizer.transform(chunk))
+    elapsed = time.perf_counter() - t0
+
+    metrics_path = os.path.join(models_dir, f"{MODEL_PREFIXES[model_name]}_metrics.json")
+    metrics = {}
+    if os.path.exists(metrics_path):
+        with open(metrics_path, "r", encoding="utf8") as f:
+            metrics = json.load(f)
+    return {
+        "dir": models_dir,
+        "vectorizer": loaded.config.get("vectorizer", "tfidf"),
+        "load_ms": round(load_s * 1000, 1),
+        "load_rss_mb": round(rss_after - rss_before, 1),
+        "docs_per_s": round(len(texts) / elapsed, 1),
+        "accuracy": metrics.get("accuracy"),
+        "macro_f1": metrics.get("macro avg", {}).get("f1-score"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="svm", choices=["nb", "svm"])
+    parser.add_argument("--dirs", nargs="+", default=["models", "models_hashing"])
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    texts = load_texts(args.data, args.n)
+    if args.single:
+        print(json.dumps(measure(args.single, args.model, texts, args.batch_size)))
+        return
+
+    # one fresh interpreter per directory so memory numbers don't overlap
+    for models_dir in args.dirs:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--model", args.model, "--single", models_dir,
+             "--data", args.data, "--n", str(args.n), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{models_dir}: failed\n{proc.stderr.strip().splitlines()[-1]}")
+            continue
+        print(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# src/bulk_load.py
+import os
+import csv
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+# Bulk INSERT helpers for seeding (seed_db_synthetic.py). Rows come in as DataFrames built
+# with vectorized pandas/NumPy and go to the database in as few round trips as the driver
+# allows:
+#   - MySQL + BULK_LOAD_INFILE=1: LOAD DATA LOCAL INFILE from a temporary TSV (needs
+#     local_infile enabled on the server and `connect_args={"local_infile": 1}` on the engine)
+#   - otherwise DB-API executemany() in batches of BATCH_SIZE rows; mysqlclient rewrites it
+#     into multi-row INSERT ... VALUES, sqlite3 runs it as one prepared statement
+# All batches of a call share the caller's transaction (engine.begin() / bulk_transaction()).
+
+BATCH_SIZE = 10000
+USE_INFILE = os.environ.get("BULK_LOAD_INFILE", "0") == "1"
+
+_PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+
+# Stand-in for the MySQL tables seed_db_synthetic.py writes to, for local SQLite runs
+SQLITE_STANDIN_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS Product (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, category TEXT, description TEXT)""",
+    """CREATE TABLE IF NOT EXISTS User (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT, language TEXT)""",
+    """CREATE TABLE IF NOT EXISTS Review (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, product_id INTEGER,
+        title TEXT, text TEXT, language TEXT, created_at TIMESTAMP)""",
+]
+
+
+def _insert_sql(table, columns, values, constants):
+    names = list(columns) + list(constants)
+    values = list(values) + list(constants.values())
+    return f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(values)})"
+
+
+def _load_data_infile(conn, table, df, constants):
+    # MySQL's default LOAD DATA format: tab separated, backslash escapes, \n line ends
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf8", newline="") as f:
+        df.to_csv(f, sep="\t", header=False, index=False, quoting=csv.QUOTE_NONE,
+                  escapechar="\\", lineterminator="\n", na_rep="\\N")
+        path = f.name
+    try:
+        set_clause = ""
+        if constants:
+            set_clause = " SET " + ", ".join(f"{k} = {v}" for k, v in constants.items())
+        conn.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}' INTO TABLE {table} "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(df.columns)}){set_clause}"
+        )
+    finally:
+        os.remove(path)
+    return len(df)
+
+
+def bulk_insert(conn, table, df, constants=None, batch_size=BATCH_SIZE, use_infile=USE_INFILE):
+    """
+    Insert every row of DataFrame `df` (columns = table columns) into `table`.
+    `constants` maps extra columns to SQL expressions applied to every row, e.g.
+    {"created_at": "CURRENT_TIMESTAMP"}. Returns the number of rows inserted.
+    """
+    constants = constants or {}
+    if not len(df):
+        return 0
+    if use_infile and conn.dialect.name == "mysql":
+        return _load_data_infile(conn, table, df, constants)
+
+    placeholder = _PLACEHOLDERS.get(conn.dialect.paramstyle)
+    if placeholder is None:
+        # named/numeric paramstyle drivers: let SQLAlchemy bind the batches (still executemany)
+        sql = text(_insert_sql(table, df.columns, [":" + c for c in df.columns], constants))
+        for start in range(0, len(df), batch_size):
+            conn.execute(sql, df.iloc[start:start + batch_size].to_dict("records"))
+        return len(df)
+
+    sql = _insert_sql(table, df.columns, [placeholder] * len(df.columns), constants)
+    # itertuples(name=None) yields plain Python scalars, which every DB-API driver accepts
+    rows = list(df.itertuples(index=False, name=None))
+    for start in range(0, len(rows), batch_size):
+        conn.exec_driver_sql(sql, rows[start:start + batch_size])
+    return len(rows)
+
+
+@contextmanager
+def bulk_transaction(engine):
+    """
+    Like engine.begin() for a bulk load. On SQLite the transaction runs with
+    synchronous=OFF (no fsync on commit), restored afterwards; the pragma can only be
+    changed outside a transaction.
+    """
+    with engine.connect() as conn:
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite:
+            previous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            conn.commit()
+        try:
+            with conn.begin():
+                yield conn
+        finally:
+            if sqlite:
+                conn.exec_driver_sql(f"PRAGMA synchronous = {previous}")
+                conn.commit()
@@ -0,0 +1,216 @@
+# src/compact_tfidf.py
+import os
+import re
+import json
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+# A fitted TfidfVectorizer flattened into plain NumPy arrays:
+#   <prefix>_tfidf_terms.npy    sorted UTF-8 terms (fixed-width bytes)
+#   <prefix>_tfidf_columns.npy  int32 column index of each sorted term
+#   <prefix>_tfidf_idf.npy      idf_ weights (same dtype as the vectorizer)
+#   <prefix>_tfidf_meta.json    analyzer params needed to reproduce tokenization
+# The arrays can be memory-mapped, so they load instantly and the pages are shared
+# between processes instead of living in a per-process Python dict.
+
+SUPPORTED_DEFAULTS = {
+    "analyzer": "word",
+    "binary": False,
+    "input": "content",
+    "preprocessor": None,
+    "tokenizer": None,
+    "stop_words": None,
+    "strip_accents": None,
+    "sublinear_tf": False,
+    "use_idf": True,
+}
+
+
+def _files(out_dir, prefix):
+    base = os.path.join(str(out_dir), f"{prefix}_tfidf")
+    return {
+        "terms": base + "_terms.npy",
+        "columns": base + "_columns.npy",
+        "idf": base + "_idf.npy",
+        "meta": base + "_meta.json",
+    }
+
+
+class CompactTfidfVectorizer:
+    """
+    Drop-in replacement for a fitted word-level TfidfVectorizer at serving time.
+    transform() returns the same CSR matrix as the original vectorizer.
+    """
+
+    def __init__(self, terms, columns, idf, token_pattern, ngram_range=(1, 1),
+                 lowercase=True, norm="l2", dtype="float64", meta_path=None):
+        self.meta_path = meta_path
+        self.terms = terms
+        self.columns = columns
+        self.idf_ = idf
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.norm = norm
+        self.dtype = np.dtype(dtype)
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer):
+        params = vectorizer.get_params()
+        for key, expected in SUPPORTED_DEFAULTS.items():
+            if params.get(key) != expected:
+                raise ValueError(f"Unsupported TfidfVectorizer setting {key}={params.get(key)!r}")
+        vocab = vectorizer.vocabulary_
+        encoded = np.array([t.encode("utf-8") for t in vocab], dtype=np.bytes_)
+        cols = np.fromiter(vocab.values(), dtype=np.int32, count=len(vocab))
+        order = np.argsort(encoded, kind="stable")
+        return cls(
+            terms=encoded[order],
+            columns=cols[order],
+            idf=np.asarray(vectorizer.idf_),
+            token_pattern=params["token_pattern"],
+            ngram_range=params["ngram_range"],
+            lowercase=params["lowercase"],
+            norm=params["norm"],
+            dtype=np.dtype(params["dtype"]).name,
+        )
+
+    # persistence
+    def save(self, out_dir, prefix):
+        os.makedirs(str(out_dir), exist_ok=True)
+        files = _files(out_dir, prefix)
+        np.save(files["terms"], self.terms)
+        np.save(files["columns"], self.columns)
+        np.save(files["idf"], self.idf_)
+        meta = {
+            "token_pattern": self.token_pattern,
+            "ngram_range": list(self.ngram_range),
+            "lowercase": self.lowercase,
+            "norm": self.norm,
+            "dtype": self.dtype.name,
+            "n_features": int(len(self.idf_)),
+        }
+        with open(files["meta"], "w", encoding="utf8") as f:
+            json.dump(meta, f, indent=2)
+        return files
+
+    @classmethod
+    def load(cls, out_dir, prefix, mmap=True):
+        files = _files(out_dir, prefix)
+        if not os.path.exists(files["meta"]):
+            raise FileNotFoundError(f"Compact TF-IDF artifact not found: {files['meta']}")
+        with open(files["meta"], "r", encoding="utf8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        return cls(
+            terms=np.load(files["terms"], mmap_mode=mode),
+            columns=np.load(files["columns"], mmap_mode=mode),
+            idf=np.load(files["idf"], mmap_mode=mode),
+            token_pattern=meta["token_pattern"],
+            ngram_range=meta["ngram_range"],
+            lowercase=meta["lowercase"],
+            norm=meta["norm"],
+            dtype=meta["dtype"],
+            meta_path=files["meta"],
+        )
+
+    @classmethod
+    def exists(cls, out_dir, prefix):
+        return os.path.exists(_files(out_dir, prefix)["meta"])
+
+    # transform
+    def analyze(self, doc):
+        """Same tokens / n-grams as TfidfVectorizer.build_analyzer()."""
+        if self.lowercase:
+            doc = doc.lower()
+        tokens = self._token_re.findall(doc)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        original = tokens
+        if min_n == 1:
+            tokens = list(original)
+            min_n += 1
+        else:
+            tokens = []
+        n_original = len(original)
+        for n in range(min_n, min(max_n + 1, n_original + 1)):
+            for i in range(n_original - n + 1):
+                tokens.append(" ".join(original[i:i + n]))
+        return tokens
+
+    def _lookup(self, grams):
+        """Column index for each n-gram, -1 if out of vocabulary."""
+        if not grams:
+            return np.empty(0, dtype=np.int64)
+        width = self.terms.dtype.itemsize
+        encoded = [g.encode("utf-8") for g in grams]
+        # terms longer than the table width can't be in the vocabulary (and would be truncated)
+        too_long = np.fromiter((len(b) > width for b in encoded), dtype=bool, count=len(encoded))
+        queries = np.array(encoded, dtype=self.terms.dtype)
+        pos = np.searchsorted(self.terms, queries)
+        np.minimum(pos, len(self.terms) - 1, out=pos)
+        hit = (self.terms[pos] == queries) & ~too_long
+        return np.where(hit, self.columns[pos], -1)
+
+    def transform(self, raw_documents):
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+        grams, rows = [], []
+        n_docs = 0
+        for i, doc in enumerate(raw_documents):
+            if isinstance(doc, bytes):
+                doc = doc.decode("utf-8")
+            doc_grams = self.analyze(doc)
+            grams.extend(doc_grams)
+            rows.append(np.full(len(doc_grams), i, dtype=np.int64))
+            n_docs = i + 1
+
+        cols = self._lookup(grams)
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        keep = cols >= 0
+        counts = sp.csr_matrix(
+            (np.ones(int(keep.sum()), dtype=self.dtype), (rows[keep], cols[keep])),
+            shape=(n_docs, len(self.idf_)),
+            dtype=self.dtype,
+        )
+        counts.sum_duplicates()
+        counts.sort_indices()
+        counts.data *= self.idf_[counts.indices]
+        if self.norm is not None:
+            counts = normalize(counts, norm=self.norm, copy=False)
+        return counts
+
+
+def export_vectorizer(vectorizer, out_dir, prefix):
+    """Write the compact, memory-mappable copy of a fitted TfidfVectorizer next to its joblib."""
+    return CompactTfidfVectorizer.from_vectorizer(vectorizer).save(out_dir, prefix)
+
+
+# Convert already-trained <prefix>_tfidf.joblib artifacts and compare cold-load time:
+#   python src/compact_tfidf.py models svm naive_bayes
+if __name__ == "__main__":
+    import sys
+    import time
+    import joblib
+
+    models_dir = sys.argv[1] if len(sys.argv) > 1 else "models"
+    prefixes = sys.argv[2:] or ["svm", "naive_bayes"]
+    for prefix in prefixes:
+        path = os.path.join(models_dir, f"{prefix}_tfidf.joblib")
+        if not os.path.exists(path):
+            print(f"{path} not found, skipping")
+            continue
+        t0 = time.perf_counter()
+        vec = joblib.load(path)
+        t_joblib = time.perf_counter() - t0
+        export_vectorizer(vec, models_dir, prefix)
+        t0 = time.perf_counter()
+        compact = CompactTfidfVectorizer.load(models_dir, prefix, mmap=True)
+        t_compact = time.perf_counter() - t0
+        sample = ["This product arrived quickly and the battery life is excellent."]
+        same = (vec.transform(sample) != compact.transform(sample)).nnz == 0
+        print(f"{prefix}: joblib load {t_joblib * 1000:.1f} ms, compact load {t_compact * 1000:.2f} ms, "
+              f"identical output: {same}")
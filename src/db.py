@@ -1,25 +1,85 @@
+import os
+from contextlib import contextmanager
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float, Text, ForeignKey
+    create_engine, Column, Integer, String, Float, Text, DateTime, ForeignKey, MetaData, Index,
+    func
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 
-# CONFIG
+# CONFIG — everything comes from the environment (no credentials in the code).
+# DB_URL takes precedence; otherwise the MySQL URL is assembled from the MYSQL_* variables.
 
-MYSQL_USER = "root"
-MYSQL_PASS = "new_password"
-MYSQL_HOST = "localhost"
-MYSQL_PORT = "3306"
-MYSQL_DB   = "sentiment_db"
+MYSQL_USER = os.environ.get("MYSQL_USER", "root")
+MYSQL_PASS = os.environ.get("MYSQL_PASSWORD", "")
+MYSQL_HOST = os.environ.get("MYSQL_HOST", "localhost")
+MYSQL_PORT = os.environ.get("MYSQL_PORT", "3306")
+MYSQL_DB   = os.environ.get("MYSQL_DB", "sentiment_db")
 
 # mysqlclient driver:
-DB_URL = (
+DB_URL = os.environ.get("DB_URL") or (
     f"mysql+mysqldb://{MYSQL_USER}:{MYSQL_PASS}"
     f"@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
     "?charset=utf8mb4"
 )
+# optional read-only replica for reporting/recommendation reads (session_scope(readonly=True))
+DB_REPLICA_URL = os.environ.get("DB_REPLICA_URL") or None
 
-engine = create_engine(DB_URL, echo=False, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# connection pool
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))       # seconds to wait for a connection
+POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))     # below MySQL's wait_timeout
+POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"  # drop dead connections on checkout
+ECHO = os.environ.get("DB_ECHO", "0") == "1"
+# allow LOAD DATA LOCAL INFILE (bulk_load.py with BULK_LOAD_INFILE=1)
+LOCAL_INFILE = os.environ.get("DB_LOCAL_INFILE", "0") == "1"
+
+
+def create_pooled_engine(url, **overrides):
+    """Engine with the pool settings above (keyword arguments override them)."""
+    url = make_url(url)
+    kwargs = {"echo": ECHO, "future": True, "pool_pre_ping": POOL_PRE_PING, "pool_recycle": POOL_RECYCLE}
+    # SQLite (local runs / tests) picks its own pool class, which takes no size/overflow
+    if url.get_backend_name() != "sqlite":
+        kwargs.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT)
+    if LOCAL_INFILE and url.get_backend_name() == "mysql":
+        kwargs["connect_args"] = {"local_infile": 1}
+    kwargs.update(overrides)
+    return create_engine(url, **kwargs)
+
+
+# one engine (= one pool) per URL and process, created on first use
+_engines = {}
+
+
+def get_engine(readonly=False):
+    """The primary engine, or the replica engine for readonly=True when DB_REPLICA_URL is set."""
+    url = DB_REPLICA_URL if readonly and DB_REPLICA_URL else DB_URL
+    if url not in _engines:
+        _engines[url] = create_pooled_engine(url)
+    return _engines[url]
+
+
+def _dispose_after_fork():
+    # pooled connections must not be shared with forked workers: the child starts with
+    # empty pools (close=False leaves the parent's connections alone)
+    for eng in _engines.values():
+        eng.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def __getattr__(name):
+    # `from db import engine` keeps working, but connects lazily on first access
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+SessionLocal = sessionmaker(autoflush=False, autocommit=False)
 
 Base = declarative_base()
 
@@ -30,11 +90,14 @@ class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    product_id = Column(String(255), index=True)
+    product_id = Column(String(255), ForeignKey("products.id"), index=True)
     user_id = Column(String(255), index=True)
     rating = Column(Float)
     review_text = Column(Text)
-    sentiment = Column(Integer, nullable=True)  # 1 = pos, 0 = neg, None = not processed
+    sentiment = Column(Integer, nullable=True)  # 1 = pos, 0 = neg, 2 = neutral, None = not processed
+
+    # keyset scans of unprocessed rows (sentiment IS NULL AND id > :last ORDER BY id)
+    __table_args__ = (Index("ix_reviews_sentiment_id", "sentiment", "id"),)
 
 
 class Product(Base):
@@ -48,18 +111,87 @@ class Product(Base):
     reviews = relationship("Review", backref="product")
 
 
+class ProductSentimentStats(Base):
+    """Per-product review sentiment counts, kept up to date by product_stats.py."""
+    __tablename__ = "product_sentiment_stats"
+
+    product_id = Column(String(255), primary_key=True)
+    positive = Column(Integer, nullable=False, default=0)
+    neutral = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    mean_rating = Column(Float, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # top-K by positive count is a backward scan of this index
+    __table_args__ = (Index("ix_product_sentiment_stats_positive", "positive", "product_id"),)
+
+
+class BackfillCheckpoint(Base):
+    """Last review id scored by each sentiment backfill shard (sentiment_backfill.py)."""
+    __tablename__ = "backfill_checkpoints"
+
+    shard = Column(String(64), primary_key=True)  # e.g. "svm:2/4"
+    last_id = Column(Integer, nullable=False, default=0)
+    rows = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
 # INIT FUNCTION — creates tables if missing
 
 def init_db():
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine())
+
 
+# SESSIONS
 
-# SESSION GENERATOR
+@contextmanager
+def session_scope(readonly=False):
+    """
+    Transactional session: commits on success, rolls back on error, always closes.
+    readonly=True reads from the replica (if configured) and never commits.
+    """
+    session = SessionLocal(bind=get_engine(readonly))
+    try:
+        yield session
+        if readonly:
+            session.rollback()
+        else:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
 
+
+@contextmanager
 def get_session():
-    """Context manager for DB session."""
-    session = SessionLocal()
+    """Context manager for DB session (no implicit commit; see session_scope)."""
+    session = SessionLocal(bind=get_engine())
     try:
         yield session
     finally:
         session.close()
+
+
+# REFLECTION — reflect the (Django-created) schema once per process and engine
+
+_reflected = {}
+
+
+def reflected_metadata(readonly=False, refresh=False):
+    """MetaData of the existing database, reflected on first use and then cached."""
+    eng = get_engine(readonly)
+    key = str(eng.url)
+    if refresh or key not in _reflected:
+        meta = MetaData()
+        meta.reflect(bind=eng)
+        _reflected[key] = meta
+    return _reflected[key]
+
+
+def reflected_table(name, readonly=False):
+    """A table of the existing database from the cached reflection (KeyError if missing)."""
+    return reflected_metadata(readonly).tables[name]
@@ -0,0 +1,170 @@
+# src/dedup.py
+import os
+import zlib
+import numpy as np
+import pandas as pd
+
+# Corpus-wide deduplication for preprocessing.
+#   - exact: 64-bit hash per cleaned text, kept in sorted uint64 runs (8 bytes per kept row)
+#   - near-duplicate (optional): MinHash over word 3-grams + LSH banding; a text is dropped
+#     when any of its band keys was seen before (8 bytes per band per kept row)
+# Keys of kept rows can be appended to a binary file so an interrupted run can resume.
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def text_hashes(texts):
+    """Deterministic 64-bit hash per text (vectorized, stable across processes and runs)."""
+    return pd.util.hash_pandas_object(pd.Series(texts, dtype=object), index=False).to_numpy(np.uint64)
+
+
+class HashSet64:
+    """
+    Compact set of uint64 values: a few sorted NumPy runs merged log-structured style,
+    so inserts stay cheap and lookups are a searchsorted per run.
+    """
+
+    def __init__(self, values=None):
+        self._runs = []
+        if values is not None and len(values):
+            self._runs.append(np.unique(np.asarray(values, dtype=np.uint64)))
+
+    def __len__(self):
+        return sum(len(r) for r in self._runs)
+
+    def contains(self, values):
+        values = np.asarray(values, dtype=np.uint64)
+        found = np.zeros(len(values), dtype=bool)
+        for run in self._runs:
+            pos = np.searchsorted(run, values)
+            pos[pos == len(run)] = 0
+            found |= run[pos] == values
+        return found
+
+    def add(self, values):
+        values = np.unique(np.asarray(values, dtype=np.uint64))
+        values = values[~self.contains(values)]
+        if not len(values):
+            return
+        self._runs.append(values)
+        # merge the newest runs while they are of similar size (amortized O(n log n));
+        # runs are disjoint, so a merge is a plain concatenate + sort
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            last = self._runs.pop()
+            merged = np.concatenate([self._runs[-1], last])
+            merged.sort()
+            self._runs[-1] = merged
+
+    def first_seen(self, values):
+        """Mask of values that are neither in the set nor repeated earlier in `values`."""
+        values = np.asarray(values, dtype=np.uint64)
+        keep = np.zeros(len(values), dtype=bool)
+        _, first = np.unique(values, return_index=True)
+        keep[first] = True
+        keep &= ~self.contains(values)
+        return keep
+
+
+class MinHashLSH:
+    """MinHash signatures of word n-gram shingles, split into `bands` LSH keys per text."""
+
+    def __init__(self, num_perm=64, bands=8, ngram=3, seed=0):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.ngram = ngram
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._mult = rng.randint(1, 2 ** 62, size=num_perm // bands, dtype=np.int64).astype(np.uint64) | 1
+
+    def _shingles(self, text):
+        words = text.lower().split()
+        n = min(self.ngram, len(words)) or 1
+        grams = {" ".join(words[i:i + n]) for i in range(max(len(words) - n + 1, 1))}
+        return np.fromiter((zlib.crc32(g.encode("utf8")) % MERSENNE_PRIME for g in grams),
+                           dtype=np.uint64, count=len(grams))
+
+    def signatures(self, texts):
+        sig = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            x = self._shingles(text)
+            sig[i] = ((np.outer(self._a, x) + self._b[:, None]) % MERSENNE_PRIME).min(axis=1)
+        return sig
+
+    def band_keys(self, texts):
+        sig = self.signatures(texts).reshape(len(texts), self.bands, -1)
+        with np.errstate(over="ignore"):
+            return (sig * self._mult).sum(axis=2, dtype=np.uint64)
+
+
+class Deduplicator:
+    """
+    Streaming exact (+ optional near-duplicate) filter; feed chunks in corpus order,
+    the first occurrence is kept. Counters: rows_seen, exact_dropped, near_dropped.
+    """
+
+    def __init__(self, near_duplicates=False, num_perm=64, bands=8):
+        self.exact = HashSet64()
+        self.lsh = MinHashLSH(num_perm, bands) if near_duplicates else None
+        self.band_sets = [HashSet64() for _ in range(bands)] if near_duplicates else []
+        self.width = 1 + len(self.band_sets)
+        self.rows_seen = 0
+        self.exact_dropped = 0
+        self.near_dropped = 0
+
+    def filter(self, texts):
+        """
+        Returns (keep_mask, keys): keys holds one row of uint64 keys per kept text
+        (exact hash, then band keys) for append_keys().
+        """
+        texts = list(texts)
+        hashes = text_hashes(texts)
+        keep = self.exact.first_seen(hashes)
+        self.rows_seen += len(texts)
+        self.exact_dropped += int((~keep).sum())
+        keys = hashes[keep][:, None]
+
+        if self.lsh is not None and not keep.any():
+            # nothing left for LSH; rows still carry one column per band set
+            keys = np.empty((0, self.width), dtype=np.uint64)
+        elif self.lsh is not None:
+            idx = np.flatnonzero(keep)
+            bands = self.lsh.band_keys([texts[i] for i in idx])
+            near = np.zeros(len(idx), dtype=bool)
+            for j, band_set in enumerate(self.band_sets):
+                near |= ~band_set.first_seen(bands[:, j])
+            keep[idx[near]] = False
+            self.near_dropped += int(near.sum())
+            keys = np.hstack([hashes[idx[~near]][:, None], bands[~near]])
+
+        self._add(keys)
+        return keep, keys
+
+    def _add(self, keys):
+        self.exact.add(keys[:, 0])
+        for j, band_set in enumerate(self.band_sets):
+            band_set.add(keys[:, j + 1])
+
+    # persistence: raw uint64 rows of width 1 + bands
+    def append_keys(self, path, keys):
+        with open(path, "ab") as f:
+            f.write(np.ascontiguousarray(keys, dtype=np.uint64).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_keys(self, path, n_rows):
+        """Restore the first `n_rows` committed keys (anything after them is discarded)."""
+        if not os.path.exists(path):
+            if n_rows:
+                raise FileNotFoundError(path)
+            return
+        with open(path, "r+b") as f:
+            f.truncate(n_rows * self.width * 8)
+        keys = np.fromfile(path, dtype=np.uint64).reshape(-1, self.width)
+        self._add(keys)
+
+    def report(self):
+        return {"rows_seen": self.rows_seen, "exact_dropped": self.exact_dropped,
+                "near_dropped": self.near_dropped}
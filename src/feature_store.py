@@ -0,0 +1,166 @@
+# src/feature_store.py
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+import scipy.sparse as sp
+import sklearn
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+try:
+    from src.dedup import text_hashes
+    from src.parallel_tfidf import parallel_fit_transform, parallel_transform, limit_features, fit_from_counts
+except ImportError:
+    from dedup import text_hashes
+    from parallel_tfidf import parallel_fit_transform, parallel_transform, limit_features, fit_from_counts
+
+# Tokenize once, weight many times. The raw n-gram counts of a train/validation split
+# (full vocabulary: no max_features / df limits) are cached as
+#   <cache_dir>/<key>.npz    train/val CSR count matrices + sorted UTF-8 terms (blob + offsets)
+#   <cache_dir>/<key>.json   metadata (row/term counts, tokenizer params, build time)
+# keyed on the hash of the train and validation texts and the tokenizer params. A trainer then
+# builds its TfidfVectorizer by column selection (max_features, min_df, max_df; see
+# parallel_tfidf.limit_features) and idf reweighting of the cached counts: the result is a
+# TfidfVectorizer(vocabulary=<kept terms>) with the same vocabulary_ and idf_ as a fresh fit,
+# at the cost of a few sparse matrix operations instead of re-tokenizing the corpus. Trainers
+# share an entry only when they train on the same split (same MAX_SAMPLES and seed).
+
+FEATURE_CACHE_DIR = os.environ.get("FEATURE_CACHE_DIR", os.path.join("data", "features"))
+
+# TfidfVectorizer params applied on top of the counts; everything else defines tokenization
+WEIGHTING_PARAMS = frozenset({"max_df", "min_df", "max_features", "binary", "dtype",
+                              "norm", "use_idf", "smooth_idf", "sublinear_tf"})
+
+
+def tokenizer_params(params):
+    """The tokenization part of TfidfVectorizer `params` (all defaults filled in)."""
+    full = TfidfVectorizer(**params).get_params()
+    if full["vocabulary"] is not None:
+        raise ValueError("The feature store builds its own vocabulary; `vocabulary=` is not supported")
+    out = {k: v for k, v in full.items() if k not in WEIGHTING_PARAMS and k != "vocabulary"}
+    out["ngram_range"] = list(out["ngram_range"])
+    try:
+        json.dumps(out)
+    except TypeError:
+        raise ValueError("Feature store needs JSON-serializable tokenizer params (no callables)")
+    return out
+
+
+def _texts_digest(texts):
+    return hashlib.sha1(text_hashes(list(texts)).tobytes()).hexdigest()
+
+
+def cache_key(train_texts, val_texts, params):
+    payload = json.dumps({
+        "train": _texts_digest(train_texts),
+        "val": _texts_digest(val_texts),
+        "tokenizer": tokenizer_params(params),
+        "sklearn": sklearn.__version__,
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf8")).hexdigest()[:20]
+
+
+class CountFeatures:
+    """Cached n-gram counts of one split; .tfidf(params) derives a fitted TfidfVectorizer."""
+
+    def __init__(self, X_train, X_val, terms_blob, terms_offsets, meta):
+        self.X_train = X_train
+        self.X_val = X_val
+        self.terms_blob = terms_blob
+        self.terms_offsets = terms_offsets
+        self.meta = meta
+
+    @property
+    def n_terms(self):
+        return len(self.terms_offsets) - 1
+
+    def terms(self, indices):
+        blob, off = self.terms_blob, self.terms_offsets
+        return [blob[off[i]:off[i + 1]].tobytes().decode("utf8") for i in indices]
+
+    def tfidf(self, params):
+        """
+        (vectorizer, X_train, X_val) for TfidfVectorizer(**params) fitted on the train texts.
+        The tokenizer part of `params` must match the cached counts.
+        """
+        if tokenizer_params(params) != self.meta["tokenizer"]:
+            raise ValueError("Tokenizer params differ from the cached counts; build new features")
+        vec = TfidfVectorizer(**params)
+        Xtr, Xv = self.X_train, self.X_val
+        if vec.binary:
+            Xtr, Xv = Xtr.copy(), Xv.copy()
+            Xtr.data.fill(1)
+            Xv.data.fill(1)
+
+        # pruning (ranked on the integer counts) and idf fit through sklearn's public API
+        kept = limit_features(Xtr, vec.max_df, vec.min_df, vec.max_features)
+        Xtr, Xv = Xtr[:, kept].astype(vec.dtype), Xv[:, kept].astype(vec.dtype)
+        transformer = fit_from_counts(vec, self.terms(kept), Xtr)
+        return vec, transformer.transform(Xtr, copy=False), transformer.transform(Xv, copy=False)
+
+    # persistence
+    def save(self, cache_dir, key):
+        os.makedirs(cache_dir, exist_ok=True)
+        base = os.path.join(cache_dir, key)
+        arrays = {"terms_blob": self.terms_blob, "terms_offsets": self.terms_offsets}
+        for name, X in (("train", self.X_train), ("val", self.X_val)):
+            arrays.update({f"{name}_data": X.data, f"{name}_indices": X.indices,
+                           f"{name}_indptr": X.indptr, f"{name}_shape": np.array(X.shape)})
+        with open(base + ".npz.tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(base + ".npz.tmp", base + ".npz")
+        # the metadata file is written last: its presence marks a complete entry
+        with open(base + ".json.tmp", "w", encoding="utf8") as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(base + ".json.tmp", base + ".json")
+
+    @classmethod
+    def load(cls, cache_dir, key):
+        base = os.path.join(cache_dir, key)
+        with open(base + ".json", "r", encoding="utf8") as f:
+            meta = json.load(f)
+        with np.load(base + ".npz") as z:
+            mats = [sp.csr_matrix((z[f"{n}_data"], z[f"{n}_indices"], z[f"{n}_indptr"]),
+                                  shape=tuple(z[f"{n}_shape"])) for n in ("train", "val")]
+            return cls(mats[0], mats[1], z["terms_blob"], z["terms_offsets"], meta)
+
+
+def build_features(train_texts, val_texts, params, cache_dir=FEATURE_CACHE_DIR, n_jobs=None):
+    """
+    Count features for TfidfVectorizer(**params) on this split: loaded from `cache_dir`
+    when an entry for the same texts and tokenizer params exists, else counted (in
+    `n_jobs` processes, see parallel_tfidf.py) and stored. meta["cache_hit"] tells which.
+    """
+    train_texts, val_texts = list(train_texts), list(val_texts)
+    key = cache_key(train_texts, val_texts, params)
+    if cache_dir and os.path.exists(os.path.join(cache_dir, key + ".json")):
+        features = CountFeatures.load(cache_dir, key)
+        features.meta["cache_hit"] = True
+        return features
+
+    t0 = time.perf_counter()
+    tokenizer = tokenizer_params(params)
+    counter = CountVectorizer(dtype=np.int32, **{**tokenizer, "ngram_range": tuple(tokenizer["ngram_range"])})
+    X_train = parallel_fit_transform(counter, train_texts, n_jobs=n_jobs)
+    X_val = parallel_transform(counter, val_texts, n_jobs=n_jobs)
+    # CountVectorizer sorts its features, so column i is the i-th term in sorted order
+    encoded = [t.encode("utf8") for t in sorted(counter.vocabulary_)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    meta = {
+        "key": key,
+        "n_train": X_train.shape[0],
+        "n_val": X_val.shape[0],
+        "n_terms": len(encoded),
+        "tokenizer": tokenizer,
+        "sklearn": sklearn.__version__,
+        "build_seconds": round(time.perf_counter() - t0, 2),
+    }
+    features = CountFeatures(X_train, X_val, blob, offsets, meta)
+    if cache_dir:
+        features.save(cache_dir, key)
+    features.meta["cache_hit"] = False
+    return features
@@ -0,0 +1,104 @@
+# src/hashed_tfidf.py
+import os
+import json
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.preprocessing import normalize
+
+# TF-IDF over a fixed-size feature-hashing space. Only the idf vector is learned,
+# so the served model needs no vocabulary at all:
+#   <prefix>_hashing_idf.npy    idf weight per hashed column
+#   <prefix>_hashing_meta.json  hashing / tokenization params
+
+DEFAULT_N_FEATURES = 2 ** 20
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+def _files(out_dir, prefix):
+    base = os.path.join(str(out_dir), f"{prefix}_hashing")
+    return {"idf": base + "_idf.npy", "meta": base + "_meta.json"}
+
+
+class HashedTfidfVectorizer:
+    """
+    fit / transform / fit_transform like TfidfVectorizer, but terms are hashed into
+    `n_features` columns (non-negative counts, so it also works for MultinomialNB).
+    """
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, ngram_range=(1, 2), lowercase=True,
+                 token_pattern=TOKEN_PATTERN, norm="l2", idf=None):
+        self.n_features = int(n_features)
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self.norm = norm
+        self.idf_ = idf
+        # document frequencies accumulated by partial_fit()
+        self.df_ = None
+        self.n_docs_ = 0
+        self._hasher = HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=self.ngram_range,
+            lowercase=lowercase,
+            token_pattern=token_pattern,
+            alternate_sign=False,
+            norm=None,
+        )
+
+    def _counts(self, raw_documents):
+        return self._hasher.transform(raw_documents)
+
+    def fit(self, raw_documents):
+        self.idf_ = TfidfTransformer().fit(self._counts(raw_documents)).idf_
+        return self
+
+    def partial_fit(self, raw_documents):
+        """
+        Streaming fit: add one batch to the document-frequency counts and recompute idf_
+        (smooth idf, identical to fit() on all batches at once).
+        """
+        X = self._counts(raw_documents)
+        if self.df_ is None:
+            self.df_ = np.zeros(self.n_features, dtype=np.int64)
+        self.df_ += np.bincount(X.indices, minlength=self.n_features)
+        self.n_docs_ += X.shape[0]
+        self.idf_ = np.log((1 + self.n_docs_) / (1 + self.df_)) + 1
+        return self
+
+    def transform(self, raw_documents):
+        if self.idf_ is None:
+            raise ValueError("HashedTfidfVectorizer is not fitted (no idf vector)")
+        X = self._counts(raw_documents)
+        X.data *= self.idf_[X.indices]
+        if self.norm is not None:
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
+    def fit_transform(self, raw_documents):
+        raw_documents = list(raw_documents)
+        return self.fit(raw_documents).transform(raw_documents)
+
+    # persistence
+    def save(self, out_dir, prefix):
+        os.makedirs(str(out_dir), exist_ok=True)
+        files = _files(out_dir, prefix)
+        np.save(files["idf"], np.asarray(self.idf_))
+        meta = {
+            "n_features": self.n_features,
+            "ngram_range": list(self.ngram_range),
+            "lowercase": self.lowercase,
+            "token_pattern": self.token_pattern,
+            "norm": self.norm,
+        }
+        with open(files["meta"], "w", encoding="utf8") as f:
+            json.dump(meta, f, indent=2)
+        return files
+
+    @classmethod
+    def load(cls, out_dir, prefix, mmap=True):
+        files = _files(out_dir, prefix)
+        if not os.path.exists(files["meta"]):
+            raise FileNotFoundError(f"Hashing vectorizer artifact not found: {files['meta']}")
+        with open(files["meta"], "r", encoding="utf8") as f:
+            meta = json.load(f)
+        return cls(idf=np.load(files["idf"], mmap_mode="r" if mmap else None), **meta)
@@ -0,0 +1,132 @@
+# src/lstm_data.py
+import re
+import time
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import layers
+
+try:
+    from src.dedup import text_hashes
+    from src.processed_data import iter_processed
+except ImportError:
+    from dedup import text_hashes
+    from processed_data import iter_processed
+
+# Input pipeline for train_lstm.py. The vocabulary still comes from the keras Tokenizer
+# (its pickle/JSON export is what serving uses), but training tokenizes inside the tf.data
+# graph with a TextVectorization layer that reproduces Tokenizer.texts_to_sequences, so
+# no Python token lists or padded arrays are built: raw texts (in memory or streamed from
+# the processed file) -> token ids per batch of texts -> cache -> shuffle -> length buckets
+# padded per batch -> prefetch.
+
+VECTORIZE_BATCH = 1024
+
+
+def configure_threads(intra_op=0, inter_op=0):
+    """TensorFlow op thread pools (0 = TF default, all cores). Call before any TF op runs."""
+    if intra_op:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    if inter_op:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+
+def _split_on_space(text):
+    # Tokenizer splits on " " and drops empty strings (runs of separators)
+    tokens = tf.strings.split(text, sep=" ")
+    return tf.ragged.boolean_mask(tokens, tf.strings.length(tokens) > 0)
+
+
+def text_vectorizer(tokenizer):
+    """
+    TextVectorization layer giving the same ids as `tokenizer.texts_to_sequences`
+    (word-level keras Tokenizer with an oov_token; ids >= num_words become the OOV id 1).
+    """
+    if tokenizer.char_level or tokenizer.split != " " or not tokenizer.oov_token:
+        raise ValueError("Only word-level Tokenizers split on ' ' with an oov_token are supported")
+    pattern = "[" + re.escape(tokenizer.filters) + "]" if tokenizer.filters else None
+    lower = tokenizer.lower
+
+    def standardize(text):
+        if lower:
+            text = tf.strings.lower(text, encoding="utf-8")
+        if pattern:
+            text = tf.strings.regex_replace(text, pattern, " ")
+        return text
+
+    # id 0 = padding, 1 = OOV in both; the Tokenizer's words 2..num_words-1 follow in order
+    n = len(tokenizer.word_index) + 1
+    if tokenizer.num_words:
+        n = min(n, tokenizer.num_words)
+    vocabulary = [tokenizer.index_word[i] for i in range(2, n)]
+    return layers.TextVectorization(standardize=standardize, split=_split_on_space,
+                                    vocabulary=vocabulary or None, ragged=True)
+
+
+def processed_texts(path, label_encoder, val_fraction, validation, batch_size=20000):
+    """
+    Dataset of (text, label) streamed from a processed CSV/Parquet file in chunks. Rows are
+    assigned to validation by text hash (same rule as train_streaming.py), so the split is
+    stable across passes without keeping an index.
+    """
+    cutoff = np.uint64(int(val_fraction * 1000))
+
+    def chunks():
+        for df in iter_processed(path, columns=["text", "sentiment"], batch_size=batch_size):
+            df = df.dropna(subset=["text", "sentiment"])
+            texts = df["text"].astype(str).tolist()
+            is_val = text_hashes(texts) % np.uint64(1000) < cutoff
+            keep = is_val if validation else ~is_val
+            yield (np.asarray(texts, dtype=object)[keep],
+                   label_encoder.transform(df["sentiment"].astype(str))[keep].astype(np.int32))
+
+    return tf.data.Dataset.from_generator(chunks, output_signature=(
+        tf.TensorSpec([None], tf.string), tf.TensorSpec([None], tf.int32))).unbatch()
+
+
+def token_dataset(texts, vectorizer, max_len, batch_size, length_buckets, shuffle_buffer=0,
+                  cache="memory", seed=42, threads=0):
+    """
+    (token ids, label) batches from a dataset of (text, label): ids truncated to max_len,
+    grouped by length and padded to their bucket width. cache: "memory", a file path
+    prefix (token ids spill to disk) or None; shuffle_buffer=0 keeps the input order.
+    """
+    def vectorize(t, y):
+        ids = tf.cast(vectorizer(t)[:, :max_len], tf.int32)
+        return ids.to_tensor(), ids.row_lengths(), y
+
+    # tokenize a batch of texts at a time, then back to one unpadded sequence per example
+    ds = (texts.batch(VECTORIZE_BATCH)
+          .map(vectorize, num_parallel_calls=tf.data.AUTOTUNE)
+          .unbatch()
+          .map(lambda x, n, y: (x[:n], y)))
+    if cache == "memory":
+        ds = ds.cache()
+    elif cache:
+        ds = ds.cache(cache)
+    if shuffle_buffer:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.bucket_by_sequence_length(
+        element_length_func=lambda x, y: tf.shape(x)[0],
+        bucket_boundaries=[b + 1 for b in length_buckets],
+        bucket_batch_sizes=[batch_size] * (len(length_buckets) + 1),
+        padded_shapes=([None], []),
+        pad_to_bucket_boundary=True,
+    )
+    if threads:
+        options = tf.data.Options()
+        options.threading.private_threadpool_size = threads
+        ds = ds.with_options(options)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+class EpochTimer(tf.keras.callbacks.Callback):
+    """Wall time per training epoch (seconds, in `epoch_seconds`)."""
+
+    def on_train_begin(self, logs=None):
+        self.epoch_seconds = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._t0 = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epoch_seconds.append(time.perf_counter() - self._t0)
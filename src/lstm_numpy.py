@@ -0,0 +1,283 @@
+# src/lstm_numpy.py
+import os
+import json
+import numpy as np
+
+# TensorFlow-free serving backend for the train_lstm.py architecture
+# (Embedding -> [Bidirectional] LSTM -> Dropout -> Dense ... -> Dense softmax).
+# export_lstm() (needs TensorFlow, run once after training) writes:
+#   lstm_model_numpy.npz   layer weights, optionally float16 / int8 quantized
+#   lstm_tokenizer.json    word index + settings of the keras Tokenizer
+# NumpyLSTM / JsonTokenizer load them with nothing but NumPy.
+
+NUMPY_MODEL_FILE = "lstm_model_numpy.npz"
+TOKENIZER_JSON_FILE = "lstm_tokenizer.json"
+
+QUANTIZE_MODES = (None, "float16", "int8")
+
+
+# ---------- export (TensorFlow side) ----------
+
+def _quantize(name, w, quantize, arrays):
+    """Store `w` under `name` (float32, float16 or int8 with per-row scales)."""
+    w = np.asarray(w, dtype=np.float32)
+    if quantize == "float16":
+        arrays[name] = w.astype(np.float16)
+    elif quantize == "int8" and w.ndim == 2:
+        scale = np.abs(w).max(axis=1, keepdims=True) / 127.0
+        scale[scale == 0] = 1.0
+        arrays[name] = np.round(w / scale).astype(np.int8)
+        arrays[name + "__scale"] = scale.astype(np.float32)
+    else:
+        arrays[name] = w
+
+
+def _lstm_spec(lstm, prefix, quantize, arrays):
+    if lstm.return_sequences or getattr(lstm, "go_backwards", False) and not prefix.endswith("bwd"):
+        raise ValueError("Only last-state LSTM layers are supported")
+    kernel, recurrent, bias = lstm.get_weights()
+    _quantize(prefix + "_kernel", kernel, quantize, arrays)
+    _quantize(prefix + "_recurrent", recurrent, quantize, arrays)
+    arrays[prefix + "_bias"] = np.asarray(bias, dtype=np.float32)
+    return {
+        "units": int(lstm.units),
+        "activation": lstm.activation.__name__,
+        "recurrent_activation": lstm.recurrent_activation.__name__,
+    }
+
+
+def export_lstm(model, tokenizer, out_dir, quantize=None):
+    """Write the NumPy weights of a trained Keras LSTM model and its tokenizer as JSON."""
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"quantize must be one of {QUANTIZE_MODES}")
+    arrays, layers = {}, []
+    for i, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        name = f"l{i}"
+        if kind == "Embedding":
+            _quantize(name + "_embeddings", layer.get_weights()[0], quantize, arrays)
+            layers.append({"type": "embedding", "name": name, "mask_zero": bool(layer.mask_zero)})
+        elif kind == "LSTM":
+            spec = _lstm_spec(layer, name + "_fwd", quantize, arrays)
+            layers.append(dict(spec, type="lstm", name=name, bidirectional=False))
+        elif kind == "Bidirectional":
+            if layer.merge_mode != "concat":
+                raise ValueError(f"Unsupported Bidirectional merge_mode {layer.merge_mode!r}")
+            spec = _lstm_spec(layer.forward_layer, name + "_fwd", quantize, arrays)
+            _lstm_spec(layer.backward_layer, name + "_bwd", quantize, arrays)
+            layers.append(dict(spec, type="lstm", name=name, bidirectional=True))
+        elif kind == "Dense":
+            kernel, bias = layer.get_weights()
+            _quantize(name + "_kernel", kernel, quantize, arrays)
+            arrays[name + "_bias"] = np.asarray(bias, dtype=np.float32)
+            layers.append({"type": "dense", "name": name, "activation": layer.activation.__name__})
+        elif kind in ("Dropout", "InputLayer"):
+            continue
+        else:
+            raise ValueError(f"Unsupported layer type for NumPy export: {kind}")
+
+    arrays["__spec__"] = np.array(json.dumps({"layers": layers, "quantize": quantize}))
+    os.makedirs(str(out_dir), exist_ok=True)
+    np.savez(os.path.join(str(out_dir), NUMPY_MODEL_FILE), **arrays)
+
+    tok = {
+        "word_index": tokenizer.word_index,
+        "num_words": tokenizer.num_words,
+        "oov_token": tokenizer.oov_token,
+        "filters": tokenizer.filters,
+        "lower": tokenizer.lower,
+        "split": tokenizer.split,
+    }
+    with open(os.path.join(str(out_dir), TOKENIZER_JSON_FILE), "w", encoding="utf8") as f:
+        json.dump(tok, f)
+
+
+# ---------- serving (NumPy only) ----------
+
+class JsonTokenizer:
+    """texts_to_sequences() of the keras Tokenizer, restored from lstm_tokenizer.json."""
+
+    def __init__(self, word_index, num_words=None, oov_token=None,
+                 filters='!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n', lower=True, split=" "):
+        self.word_index = word_index
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.lower = lower
+        self.split = split
+        self._table = str.maketrans({c: split for c in filters})
+        self._oov_index = word_index.get(oov_token)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf8") as f:
+            return cls(**json.load(f))
+
+    def texts_to_sequences(self, texts):
+        out = []
+        for text in texts:
+            if self.lower:
+                text = text.lower()
+            seq = []
+            for w in text.translate(self._table).split(self.split):
+                if not w:
+                    continue
+                i = self.word_index.get(w)
+                if i is not None:
+                    if self.num_words and i >= self.num_words:
+                        if self._oov_index is not None:
+                            seq.append(self._oov_index)
+                    else:
+                        seq.append(i)
+                elif self.oov_token is not None:
+                    seq.append(self._oov_index)
+            out.append(seq)
+        return out
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "sigmoid": _sigmoid,
+    "softmax": _softmax,
+}
+
+
+class NumpyLSTM:
+    """
+    Inference-only NumPy implementation of the exported model; called like the Keras
+    model: model(x_int_ids, training=False) -> probabilities (batch, classes).
+    """
+
+    def __init__(self, arrays):
+        self.spec = json.loads(str(arrays["__spec__"]))
+        self.weights = {}
+        for key in arrays.files:
+            if key == "__spec__" or key.endswith("__scale"):
+                continue
+            w = arrays[key]
+            scale_key = key + "__scale"
+            if key.endswith("_embeddings") and scale_key in arrays.files:
+                # keep the (largest) embedding matrix int8; rows are dequantized on lookup
+                self.weights[key] = (w, arrays[scale_key])
+            elif scale_key in arrays.files:
+                self.weights[key] = w.astype(np.float32) * arrays[scale_key]
+            else:
+                self.weights[key] = w.astype(np.float32)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(arrays)
+
+    def _embed(self, name, x):
+        w = self.weights[name + "_embeddings"]
+        if isinstance(w, tuple):
+            q, scale = w
+            return q[x].astype(np.float32) * scale[x]
+        return w[x]
+
+    def _run_lstm(self, prefix, h_seq, mask, spec, reverse=False):
+        kernel = self.weights[prefix + "_kernel"]
+        recurrent = self.weights[prefix + "_recurrent"]
+        bias = self.weights[prefix + "_bias"]
+        act = ACTIVATIONS[spec["activation"]]
+        rec_act = ACTIVATIONS[spec["recurrent_activation"]]
+        units = spec["units"]
+        batch, steps, _ = h_seq.shape
+        # input projection for all time steps in one matmul
+        z_in = h_seq @ kernel + bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        order = range(steps - 1, -1, -1) if reverse else range(steps)
+        for t in order:
+            z = z_in[:, t] + h @ recurrent
+            i = rec_act(z[:, :units])
+            f = rec_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = rec_act(z[:, 3 * units:])
+            c_new = f * c + i * g
+            h_new = o * act(c_new)
+            # masked (padding) steps keep the previous state, as in Keras
+            m = mask[:, t:t + 1]
+            c = np.where(m, c_new, c)
+            h = np.where(m, h_new, h)
+        return h
+
+    def __call__(self, x, training=False):
+        x = np.asarray(x, dtype=np.int64)
+        out = None
+        mask = np.ones(x.shape, dtype=bool)
+        for layer in self.spec["layers"]:
+            name = layer["name"]
+            if layer["type"] == "embedding":
+                out = self._embed(name, x)
+                if layer["mask_zero"]:
+                    mask = x != 0
+            elif layer["type"] == "lstm":
+                h = self._run_lstm(name + "_fwd", out, mask, layer)
+                if layer["bidirectional"]:
+                    h_bwd = self._run_lstm(name + "_bwd", out, mask, layer, reverse=True)
+                    h = np.concatenate([h, h_bwd], axis=1)
+                out = h
+            elif layer["type"] == "dense":
+                out = ACTIVATIONS[layer["activation"]](out @ self.weights[name + "_kernel"]
+                                                       + self.weights[name + "_bias"])
+        return out
+
+
+def numpy_artifacts_exist(models_dir):
+    return (os.path.exists(os.path.join(str(models_dir), NUMPY_MODEL_FILE))
+            and os.path.exists(os.path.join(str(models_dir), TOKENIZER_JSON_FILE)))
+
+
+# Export an already-trained model, or compare cold start of both backends:
+#   python src/lstm_numpy.py export models [float16|int8]
+#   python src/lstm_numpy.py bench models
+if __name__ == "__main__":
+    import sys
+    import subprocess
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "bench"
+    models_dir = sys.argv[2] if len(sys.argv) > 2 else "models"
+
+    if cmd == "export":
+        import pickle
+        import tensorflow as tf
+        quantize = sys.argv[3] if len(sys.argv) > 3 else None
+        path = os.path.join(models_dir, "lstm_model.h5")
+        if not os.path.exists(path):
+            path = os.path.join(models_dir, "lstm_model.keras")
+        with open(os.path.join(models_dir, "lstm_tokenizer.pkl"), "rb") as f:
+            tokenizer = pickle.load(f)
+        export_lstm(tf.keras.models.load_model(path), tokenizer, models_dir, quantize=quantize)
+        print("Exported", os.path.join(models_dir, NUMPY_MODEL_FILE), f"(quantize={quantize})")
+
+    elif cmd == "bench":
+        here = os.path.dirname(os.path.abspath(__file__))
+        probe = (
+            "import sys, time; t0 = time.perf_counter(); sys.path.insert(0, {here!r});"
+            "from model_registry import ModelRegistry, memory_usage;"
+            "m = ModelRegistry({models_dir!r}, lstm_backend={backend!r}).get('lstm');"
+            "m.predict_proba(['This product arrived quickly and works great']);"
+            "print(round(time.perf_counter() - t0, 2), memory_usage().get('rss'), 'tensorflow' in sys.modules)"
+        )
+        for backend in ("keras", "numpy"):
+            out = subprocess.run(
+                [sys.executable, "-c", probe.format(here=here, models_dir=models_dir, backend=backend)],
+                capture_output=True, text=True,
+            )
+            if out.returncode != 0:
+                print(f"{backend}: failed: {out.stderr.strip().splitlines()[-1]}")
+                continue
+            secs, rss, tf_loaded = out.stdout.split()[-3:]
+            print(f"{backend}: startup + first prediction {secs} s, rss {rss} MB, tensorflow imported: {tf_loaded}")
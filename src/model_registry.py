@@ -0,0 +1,510 @@
+# src/model_registry.py
+import os
+import gc
+import sys
+import json
+import pickle
+import shutil
+import tempfile
+import threading
+import hashlib
+import logging
+import time
+import joblib
+import numpy as np
+
+try:
+    from src.compact_tfidf import CompactTfidfVectorizer
+    from src.hashed_tfidf import HashedTfidfVectorizer
+    from src.linear_scorer import LinearScorer
+    from src.lstm_numpy import NumpyLSTM, JsonTokenizer, NUMPY_MODEL_FILE, TOKENIZER_JSON_FILE
+except ImportError:
+    from compact_tfidf import CompactTfidfVectorizer
+    from hashed_tfidf import HashedTfidfVectorizer
+    from linear_scorer import LinearScorer
+    from lstm_numpy import NumpyLSTM, JsonTokenizer, NUMPY_MODEL_FILE, TOKENIZER_JSON_FILE
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Default artifacts directory (project_root/models), overridable per process
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.normpath(
+    os.environ.get("SENTIMENT_MODELS_DIR") or os.path.join(HERE, "..", "models")
+)
+
+# model name -> artifact file prefix used by the training scripts
+MODEL_PREFIXES = {
+    "nb": "naive_bayes",
+    "svm": "svm",
+    "lstm": "lstm",
+}
+
+DEFAULT_LSTM_MAX_LEN = 200
+# LSTM sequence-length buckets; the last bucket is always the model's max_len
+DEFAULT_LENGTH_BUCKETS = (32, 64, 128, 200)
+# "numpy" serves lstm_model_numpy.npz without importing TensorFlow, "keras" loads the
+# .h5/.keras model, "auto" uses the NumPy export when it exists
+LSTM_BACKEND = os.environ.get("LSTM_BACKEND", "auto").lower()
+LSTM_BACKENDS = ("auto", "numpy", "keras")
+
+# How often (seconds) reload_if_changed() re-stats a model's artifact files
+ARTIFACT_CHECK_INTERVAL = float(os.environ.get("SENTIMENT_ARTIFACT_CHECK_INTERVAL", "2.0"))
+
+logger = logging.getLogger(__name__)
+
+# Estimator arrays moved to memory-mapped .npy files in pre-fork mode
+SHARED_ARRAY_ATTRS = ("coef_", "intercept_", "feature_log_prob_", "class_log_prior_")
+
+
+class LoadedModel:
+    """
+    Artifacts of one trained model: estimator, TF-IDF vectorizer or tokenizer,
+    label encoder and the saved *_config.json.
+    `labels` is the index -> label array used to decode encoded predictions.
+    `scorer` is the LinearScorer fast path for NB / SVM (None for the LSTM).
+    `backend` is "keras" or "numpy" for the LSTM, None otherwise.
+    `fingerprint` identifies the artifact files it was loaded from (set by the registry).
+    """
+
+    def __init__(self, name, model, label_enc, vectorizer=None, tokenizer=None, config=None,
+                 backend=None):
+        self.name = name
+        self.backend = backend
+        self.fingerprint = None
+        self.model = model
+        self.label_enc = label_enc
+        self.vectorizer = vectorizer
+        self.tokenizer = tokenizer
+        self.config = config or {}
+        classes = getattr(label_enc, "classes_", None)
+        self.labels = None if classes is None else np.asarray(classes)
+        self.max_len = int(self.config.get("max_len", DEFAULT_LSTM_MAX_LEN))
+        # Length bucketing is only exact when the model masks padding (mask_zero=True in
+        # train_lstm.py); older models keep padding every request to max_len.
+        self.bucketed = bool(self.config.get("mask_zero", False))
+        buckets = self.config.get("length_buckets") or DEFAULT_LENGTH_BUCKETS
+        self.length_buckets = sorted({int(b) for b in buckets if int(b) < self.max_len} | {self.max_len})
+        self._graphs = {}
+        self.scorer = None
+        if vectorizer is not None:
+            try:
+                self.scorer = LinearScorer.from_estimator(model)
+            except TypeError:
+                pass
+
+    def predict_encoded(self, X):
+        """Encoded predictions for a vectorized batch (fast path when available)."""
+        if self.scorer is not None:
+            return self.scorer.predict(X)
+        return self.model.predict(X)
+
+    def pad(self, texts, max_len=None, padding="post", truncating="post"):
+        """Tokenize and pad texts for the LSTM (only valid for tokenizer-based models)."""
+        return pad_int_sequences(self.tokenizer.texts_to_sequences(texts), max_len or self.max_len,
+                                 padding=padding, truncating=truncating)
+
+    def bucket_for(self, length):
+        """Smallest bucket width that fits a sequence of `length` tokens."""
+        pos = np.searchsorted(self.length_buckets, min(length, self.max_len))
+        return self.length_buckets[pos]
+
+    def _graph(self, width):
+        # one pre-traced graph per bucket width; the batch dimension stays dynamic
+        if self.backend == "numpy":
+            return self.model
+        fn = self._graphs.get(width)
+        if fn is None:
+            import tensorflow as tf
+            fn = tf.function(lambda x: self.model(x, training=False), reduce_retracing=True,
+                             input_signature=[tf.TensorSpec([None, width], tf.int32)])
+            self._graphs[width] = fn
+        return fn
+
+    def trace_buckets(self):
+        """Trace every bucket graph up front so no request pays for tracing."""
+        if self.backend == "numpy":
+            return
+        widths = self.length_buckets if self.bucketed else [self.max_len]
+        for width in widths:
+            self._graph(width)(np.zeros((1, width), dtype=np.int32))
+
+    def predict_proba(self, texts, max_len=None, padding="post", truncating="post"):
+        """
+        LSTM output probabilities for a batch of texts. With bucketing, texts are
+        grouped by token count and each group is padded only to its bucket width,
+        one forward pass per bucket; rows come back in input order.
+        """
+        seqs = self.tokenizer.texts_to_sequences(texts)
+        if not self.bucketed or max_len not in (None, self.max_len):
+            width = max_len or self.max_len
+            x = pad_int_sequences(seqs, width, padding=padding, truncating=truncating)
+            return np.asarray(self._graph(width)(x))
+
+        widths = np.array([self.bucket_for(len(s)) for s in seqs], dtype=np.int64)
+        out = None
+        for width in np.unique(widths):
+            idx = np.flatnonzero(widths == width)
+            x = pad_int_sequences([seqs[i] for i in idx], int(width),
+                                  padding=padding, truncating=truncating)
+            probs = np.asarray(self._graph(int(width))(x))
+            if out is None:
+                out = np.empty((len(seqs),) + probs.shape[1:], dtype=probs.dtype)
+            out[idx] = probs
+        return out if out is not None else np.empty((0, 0 if self.labels is None else len(self.labels)))
+
+
+def pad_int_sequences(seqs, max_len, padding="post", truncating="post"):
+    """NumPy equivalent of keras pad_sequences for int token ids (pads with 0)."""
+    x = np.zeros((len(seqs), max_len), dtype=np.int32)
+    for i, s in enumerate(seqs):
+        if not len(s):
+            continue
+        s = s[:max_len] if truncating == "post" else s[-max_len:]
+        if padding == "post":
+            x[i, :len(s)] = s
+        else:
+            x[i, -len(s):] = s
+    return x
+
+
+class ModelRegistry:
+    """
+    Lazily loads NB / SVM / LSTM artifacts from `models_dir` on first use.
+    Loading is thread-safe (one lock per model, so a slow LSTM load never blocks NB),
+    and TensorFlow is only imported when the keras LSTM backend is actually loaded.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, prefer_compact=True, lstm_backend=LSTM_BACKEND):
+        if lstm_backend not in LSTM_BACKENDS:
+            raise ValueError(f"Unknown lstm_backend {lstm_backend!r}. Use one of {LSTM_BACKENDS}.")
+        self.models_dir = os.path.normpath(str(models_dir))
+        # use the memory-mapped <prefix>_tfidf_* export instead of unpickling the vectorizer
+        self.prefer_compact = prefer_compact
+        self.lstm_backend = lstm_backend
+        self._models = {}
+        self._locks = {name: threading.Lock() for name in MODEL_PREFIXES}
+        self._last_checked = {}
+        self.shared_dir = None  # set by share_for_fork()
+
+    # artifact helpers
+    def _path(self, name):
+        return os.path.join(self.models_dir, name)
+
+    def _load_joblib(self, name):
+        path = self._path(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Required model artifact not found: {path}")
+        return joblib.load(path)
+
+    def _load_pickle(self, name):
+        path = self._path(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Required artifact not found: {path}")
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _load_json(self, name):
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf8") as f:
+            return json.load(f)
+
+    # loaders
+    def _load_vectorizer(self, prefix, config):
+        # models trained with VECTORIZER = "hashing" only ship an idf vector
+        if config.get("vectorizer") == "hashing":
+            return HashedTfidfVectorizer.load(self.models_dir, prefix, mmap=True)
+        pickled = self._path(f"{prefix}_tfidf.joblib")
+        if self.prefer_compact and CompactTfidfVectorizer.exists(self.models_dir, prefix):
+            compact = CompactTfidfVectorizer.load(self.models_dir, prefix, mmap=True)
+            # ignore a stale export left behind by an older training run
+            if not os.path.exists(pickled) or os.path.getmtime(compact.meta_path) >= os.path.getmtime(pickled):
+                return compact
+        return self._load_joblib(f"{prefix}_tfidf.joblib")
+
+    def _load_tfidf_model(self, name):
+        prefix = MODEL_PREFIXES[name]
+        config = self._load_json(f"{prefix}_config.json") or {}
+        return LoadedModel(
+            name,
+            model=self._load_joblib(f"{prefix}_model.joblib"),
+            vectorizer=self._load_vectorizer(prefix, config),
+            label_enc=self._load_joblib(f"{prefix}_label_encoder.joblib"),
+            config=config,
+        )
+
+    def lstm_backend_to_load(self):
+        """"numpy" or "keras": the backend _load_lstm() picks for the current artifacts."""
+        has_numpy = os.path.exists(self._path(NUMPY_MODEL_FILE)) and os.path.exists(self._path(TOKENIZER_JSON_FILE))
+        if self.lstm_backend == "numpy" or (self.lstm_backend == "auto" and has_numpy):
+            return "numpy"
+        return "keras"
+
+    def _load_lstm(self, name):
+        if self.lstm_backend_to_load() == "numpy":
+            return self._load_lstm_numpy(name, self._path(NUMPY_MODEL_FILE))
+
+        # training saved `lstm_model.h5` (or .keras), tokenizer pickle and label encoder joblib
+        model_path = self._path("lstm_model.h5")
+        if not os.path.exists(model_path):
+            model_path = self._path("lstm_model.keras")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"LSTM model file not found (checked .h5 and .keras) in {self.models_dir}"
+            )
+        import tensorflow as tf
+        loaded = LoadedModel(
+            name,
+            model=tf.keras.models.load_model(model_path),
+            tokenizer=self._load_pickle("lstm_tokenizer.pkl"),
+            label_enc=self._load_joblib("lstm_label_encoder.joblib"),
+            config=self._load_json("lstm_config.json"),
+            backend="keras",
+        )
+        loaded.trace_buckets()
+        return loaded
+
+    def _load_lstm_numpy(self, name, numpy_path):
+        # lstm_model_numpy.npz + lstm_tokenizer.json written by lstm_numpy.export_lstm()
+        if not os.path.exists(numpy_path):
+            raise FileNotFoundError(f"NumPy LSTM export not found: {numpy_path}")
+        tokenizer_path = self._path(TOKENIZER_JSON_FILE)
+        if not os.path.exists(tokenizer_path):
+            raise FileNotFoundError(f"Required artifact not found: {tokenizer_path}")
+        return LoadedModel(
+            name,
+            model=NumpyLSTM.load(numpy_path),
+            tokenizer=JsonTokenizer.load(tokenizer_path),
+            label_enc=self._load_joblib("lstm_label_encoder.joblib"),
+            config=self._load_json("lstm_config.json"),
+            backend="numpy",
+        )
+
+    def _load(self, name):
+        fingerprint = self.artifact_fingerprint(name)
+        if name == "lstm":
+            loaded = self._load_lstm(name)
+        else:
+            loaded = self._load_tfidf_model(name)
+        loaded.fingerprint = fingerprint
+        self._last_checked[name] = time.monotonic()
+        return loaded
+
+    def artifact_fingerprint(self, name):
+        """
+        Short hash of the name, size and mtime of every `<prefix>_*` file in models_dir;
+        it changes whenever a retrained model is copied over the old artifacts.
+        """
+        prefix = MODEL_PREFIXES[self._check_name(name)] + "_"
+        h = hashlib.sha1(prefix.encode("utf8"))
+        try:
+            entries = sorted((e for e in os.scandir(self.models_dir) if e.name.startswith(prefix)),
+                             key=lambda e: e.name)
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            st = entry.stat()
+            h.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns};".encode("utf8"))
+        return h.hexdigest()[:16]
+
+    # public API
+    def _check_name(self, name):
+        name = str(name).lower()
+        if name not in MODEL_PREFIXES:
+            raise ValueError("Unknown model_name. Use 'nb', 'svm', or 'lstm'.")
+        return name
+
+    def get(self, name):
+        """Return the LoadedModel for 'nb' | 'svm' | 'lstm', loading it on first use."""
+        name = self._check_name(name)
+        loaded = self._models.get(name)
+        if loaded is not None:
+            return loaded
+        with self._locks[name]:
+            # another thread may have finished loading while we waited
+            loaded = self._models.get(name)
+            if loaded is None:
+                loaded = self._load(name)
+                self._models[name] = loaded
+        return loaded
+
+    def reload_if_changed(self, name, interval=ARTIFACT_CHECK_INTERVAL):
+        """
+        Like get(), but if the artifacts on disk changed since the model was loaded
+        (checked at most every `interval` seconds) the new version is loaded and swapped in.
+        If the new version fails to load (e.g. a deploy is still copying files) the loaded
+        one keeps serving and the reload is retried after the next interval.
+        """
+        name = self._check_name(name)
+        loaded = self.get(name)
+        now = time.monotonic()
+        if now - self._last_checked.get(name, 0.0) < interval:
+            return loaded
+        # throttles concurrent checks; a successful _load() moves it to the load time, a
+        # failed one leaves it at the start of this attempt
+        self._last_checked[name] = now
+        if self.artifact_fingerprint(name) == loaded.fingerprint:
+            return loaded
+        with self._locks[name]:
+            current = self._models.get(name)
+            if current is loaded:
+                try:
+                    current = self._load(name)
+                except Exception:
+                    logger.warning("Reloading %s from %s failed; serving the loaded version",
+                                   name, self.models_dir, exc_info=True)
+                    return loaded
+                self._models[name] = current
+        return current if current is not None else self.get(name)
+
+    def is_loaded(self, name):
+        return self._check_name(name) in self._models
+
+    def warmup(self, names=None, ignore_missing=False):
+        """
+        Eagerly load the given models (default: all). With ignore_missing=True,
+        models whose artifacts are absent are skipped instead of raising.
+        Returns the list of model names that are loaded.
+        """
+        for name in names or MODEL_PREFIXES:
+            try:
+                self.get(name)
+            except FileNotFoundError:
+                if not ignore_missing:
+                    raise
+        return [name for name in MODEL_PREFIXES if name in self._models]
+
+    def unload(self, names=None):
+        """Drop loaded models (default: all) so their memory can be reclaimed."""
+        names = [self._check_name(n) for n in (names or MODEL_PREFIXES)]
+        for name in names:
+            with self._locks[name]:
+                self._models.pop(name, None)
+        if "lstm" in names and "tensorflow" in sys.modules:
+            sys.modules["tensorflow"].keras.backend.clear_session()
+        gc.collect()
+
+    def share_for_fork(self, names=None, shared_dir=None):
+        """
+        Pre-fork mode (e.g. gunicorn --preload): load models in the master process and
+        move the large arrays out of refcounted Python objects so forked workers share
+        the pages copy-on-write instead of copying them on first touch:
+          - TF-IDF vocabulary dict  -> CompactTfidfVectorizer over memory-mapped arrays
+            (exported / hashing vectorizers are already memory-mapped)
+          - coef_ / feature_log_prob_ etc. and the LinearScorer weights -> read-only np.memmap
+        Finally gc.freeze() keeps the garbage collector from writing to the
+        surviving objects' headers in the children.
+        The files go into a new pid<master pid>-* directory under `shared_dir` (stored as
+        self.shared_dir); directories left by masters that have exited are deleted.
+        The keras LSTM is skipped (with a warning): TensorFlow's runtime threads do not
+        survive fork(), so it must be loaded in the workers; the NumPy LSTM backend is shared.
+        Returns the list of model names that are loaded.
+        """
+        names = [self._check_name(n) for n in (names or MODEL_PREFIXES)]
+        if "lstm" in names:
+            current = self._models.get("lstm")
+            backend = current.backend if current is not None else self.lstm_backend_to_load()
+            if backend == "keras":
+                logger.warning("Not pre-loading lstm for fork: the keras backend (TensorFlow) is not "
+                               "fork-safe; export lstm_model_numpy.npz to share it, or load it in the workers")
+                names.remove("lstm")
+        loaded_names = self.warmup(names, ignore_missing=True) if names else []
+        if shared_dir is None:
+            key = hashlib.sha1(self.models_dir.encode("utf8")).hexdigest()[:12]
+            shared_dir = os.environ.get("SENTIMENT_SHARED_DIR") or os.path.join(
+                tempfile.gettempdir(), "sentiment_shared", key
+            )
+        # Every call writes into a fresh directory: workers of an earlier (or parallel) master
+        # may still have the previous files memory-mapped, and rewriting those in place would
+        # truncate pages under them (SIGBUS / wrong weights). Unlinking them is safe.
+        os.makedirs(shared_dir, exist_ok=True)
+        remove_stale_shared_dirs(shared_dir)
+        shared_dir = tempfile.mkdtemp(prefix=f"pid{os.getpid()}-", dir=shared_dir)
+        self.shared_dir = shared_dir
+
+        for name in loaded_names:
+            loaded = self._models[name]
+            prefix = MODEL_PREFIXES[name]
+            if hasattr(loaded.vectorizer, "vocabulary_"):
+                CompactTfidfVectorizer.from_vectorizer(loaded.vectorizer).save(shared_dir, prefix)
+                loaded.vectorizer = CompactTfidfVectorizer.load(shared_dir, prefix, mmap=True)
+            for attr in SHARED_ARRAY_ATTRS:
+                value = getattr(loaded.model, attr, None)
+                if isinstance(value, np.ndarray) and not isinstance(value, np.memmap):
+                    path = os.path.join(shared_dir, f"{prefix}_{attr.rstrip('_')}.npy")
+                    np.save(path, np.ascontiguousarray(value))
+                    setattr(loaded.model, attr, np.load(path, mmap_mode="r"))
+            if loaded.scorer is not None and not isinstance(loaded.scorer.W, np.memmap):
+                path = os.path.join(shared_dir, f"{prefix}_scorer_weights.npy")
+                np.save(path, loaded.scorer.W)
+                loaded.scorer.W = np.load(path, mmap_mode="r")
+
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+        return loaded_names
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_stale_shared_dirs(base_dir):
+    """Delete share_for_fork() directories under base_dir whose master process has exited."""
+    removed = []
+    for entry in os.scandir(base_dir):
+        pid = entry.name.split("-", 1)[0]
+        if not (entry.is_dir() and pid.startswith("pid") and pid[3:].isdigit()):
+            continue
+        if int(pid[3:]) != os.getpid() and not _pid_alive(int(pid[3:])):
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed.append(entry.path)
+    return removed
+
+
+def memory_usage():
+    """
+    Memory of the current process in MB. rss counts shared pages too; uss (unique)
+    and pss (proportional) show what a forked worker really costs. psutil gives all
+    three, otherwise only rss is read from /proc.
+    """
+    if psutil is not None:
+        try:
+            info = psutil.Process().memory_full_info()
+            return {k: round(getattr(info, k) / 2**20, 1)
+                    for k in ("rss", "uss", "pss") if hasattr(info, k)}
+        except psutil.Error:
+            pass
+    try:
+        with open("/proc/self/status", "r", encoding="utf8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return {"rss": round(int(line.split()[1]) / 1024, 1)}
+    except OSError:
+        pass
+    return {}
+
+
+# One registry per artifacts directory per process
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(models_dir=None):
+    """Return the process-wide ModelRegistry for `models_dir` (default: MODELS_DIR)."""
+    key = os.path.normpath(str(models_dir or MODELS_DIR))
+    registry = _registries.get(key)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.setdefault(key, ModelRegistry(key))
+    return registry
@@ -0,0 +1,211 @@
+# src/parallel_tfidf.py
+import os
+from numbers import Integral
+
+import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer, TfidfTransformer
+
+# Multi-core fit/transform for a vocabulary-based TfidfVectorizer (or CountVectorizer).
+#   fit: documents are split into contiguous shards; every worker counts its shard with an
+#        unpruned CountVectorizer (same tokenizer params). The parent merges the shard columns
+#        onto the sorted union of terms, applies min_df / max_df / max_features with sklearn's
+#        rules (limit_features) and fits the caller's vectorizer on the result through public
+#        API only: vocabulary= for the kept terms, TfidfTransformer for idf_.
+#   transform: rows are independent, so shards are transformed in the workers and stacked.
+# vocabulary_ and idf_ equal a plain fit_transform() and so does the tf-idf matrix (up to the
+# last bit of the l2 norms, which are summed in a different order); the fitted object is an
+# ordinary sklearn vectorizer (joblib / compact_tfidf export unchanged) whose `vocabulary`
+# param holds the learned vocabulary.
+
+N_JOBS = os.cpu_count() or 1
+MIN_DOCS_PER_JOB = 2000  # below this the pool start-up costs more than it saves
+
+# CountVectorizer params that only prune the vocabulary (applied after merging the shards)
+PRUNING_PARAMS = {"max_df": 1.0, "min_df": 1, "max_features": None, "vocabulary": None}
+
+_worker_vectorizer = None
+
+
+def _init_worker(vectorizer):
+    global _worker_vectorizer
+    _worker_vectorizer = vectorizer
+
+
+def _count_shard(docs):
+    """Sorted terms and count matrix of one shard (unpruned vocabulary)."""
+    try:
+        X = _worker_vectorizer.fit_transform(docs)
+    except ValueError:
+        # shard of stop words only; the merged vocabulary decides whether that is an error
+        return np.empty(0, dtype=object), sp.csr_matrix((len(docs), 0), dtype=_worker_vectorizer.dtype)
+    return _worker_vectorizer.get_feature_names_out(), X
+
+
+def _transform_shard(docs):
+    return _worker_vectorizer.transform(docs)
+
+
+def _shards(docs, n):
+    bounds = np.linspace(0, len(docs), n + 1).astype(int)
+    return [docs[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _n_shards(docs, n_jobs):
+    n_jobs = N_JOBS if n_jobs is None or n_jobs < 1 else n_jobs
+    return max(1, min(n_jobs, len(docs) // MIN_DOCS_PER_JOB))
+
+
+def shard_counter(vectorizer):
+    """Unpruned CountVectorizer with the tokenizer params (and dtype/binary) of `vectorizer`."""
+    count_keys = CountVectorizer().get_params()
+    params = {k: v for k, v in vectorizer.get_params().items() if k in count_keys}
+    return CountVectorizer(**{**params, **PRUNING_PARAMS})
+
+
+def merge_counts(results, dtype):
+    """
+    Merge [(sorted terms, X)] shard results (in document order) into (terms, X): X has one
+    column per term of the sorted union, as an unpruned CountVectorizer on all documents.
+    """
+    terms = np.unique(np.concatenate([np.asarray(t, dtype=object) for t, _ in results]))
+    if not len(terms):
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+    data, indices, indptr, offset = [], [], [np.zeros(1, dtype=np.int64)], 0
+    for shard_terms, X in results:
+        mapping = np.searchsorted(terms, np.asarray(shard_terms, dtype=object)).astype(np.int64)
+        data.append(X.data)
+        indices.append(mapping[X.indices])
+        indptr.append(X.indptr[1:].astype(np.int64) + offset)
+        offset += X.nnz
+
+    indices_dtype = np.int64 if offset > np.iinfo(np.int32).max else np.int32
+    indptr = np.concatenate(indptr).astype(indices_dtype)
+    X = sp.csr_matrix(
+        (np.concatenate(data), np.concatenate(indices).astype(indices_dtype), indptr),
+        shape=(len(indptr) - 1, len(terms)),
+        dtype=dtype,
+    )
+    X.sort_indices()
+    return terms, X
+
+
+def limit_features(X, max_df=1.0, min_df=1, max_features=None):
+    """
+    Indices of the columns of count matrix X (columns = alphabetically sorted terms) that
+    CountVectorizer.fit keeps: document frequency within [min_df, max_df], then the
+    max_features largest total counts, ranked like sklearn (argsort of the negated totals).
+    """
+    n_doc = X.shape[0]
+    high = max_df if isinstance(max_df, Integral) else max_df * n_doc
+    low = min_df if isinstance(min_df, Integral) else min_df * n_doc
+    if high < low:
+        raise ValueError("max_df corresponds to < documents than min_df")
+    dfs = np.bincount(X.indices, minlength=X.shape[1])
+    mask = (dfs <= high) & (dfs >= low)
+    if max_features is not None and mask.sum() > max_features:
+        tfs = np.asarray(X.sum(axis=0)).ravel()
+        ranked = np.where(mask)[0][(-tfs[mask]).argsort()[:max_features]]
+        mask = np.zeros(len(dfs), dtype=bool)
+        mask[ranked] = True
+    kept = np.where(mask)[0]
+    if len(kept) == 0:
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    return kept
+
+
+def weighting(vectorizer):
+    """Unfitted TfidfTransformer with the weighting params of TfidfVectorizer `vectorizer`."""
+    return TfidfTransformer(norm=vectorizer.norm, use_idf=vectorizer.use_idf,
+                            smooth_idf=vectorizer.smooth_idf, sublinear_tf=vectorizer.sublinear_tf)
+
+
+def fit_from_counts(vectorizer, terms, X):
+    """
+    Fit `vectorizer` (CountVectorizer / TfidfVectorizer) to the pruned count matrix X whose
+    columns are `terms`, without re-tokenizing. Returns the TfidfTransformer fitted on X that
+    turns counts into the vectorizer's output (None for a CountVectorizer).
+    """
+    vectorizer.set_params(vocabulary={term: j for j, term in enumerate(terms)})
+    transformer = weighting(vectorizer).fit(X) if isinstance(vectorizer, TfidfVectorizer) else None
+    if transformer is not None and transformer.use_idf:
+        vectorizer.idf_ = transformer.idf_  # public setter; validates the vocabulary
+    else:
+        # fixed vocabulary and no idf: nothing is learned from the documents
+        vectorizer.fit([""])
+    return transformer
+
+
+def parallel_fit_transform(vectorizer, docs, n_jobs=None):
+    """
+    vectorizer.fit_transform(docs) with tokenizing and counting spread over `n_jobs`
+    processes (default: all cores). Same vocabulary_, idf_ and output as the sequential call.
+    Vectorizers that are not vocabulary-based (e.g. HashedTfidfVectorizer) or a fixed
+    `vocabulary=` are fitted sequentially.
+    """
+    docs = list(docs)
+    n = _n_shards(docs, n_jobs)
+    if n < 2 or not isinstance(vectorizer, CountVectorizer) or vectorizer.vocabulary is not None:
+        return vectorizer.fit_transform(docs)
+
+    with ProcessPoolExecutor(max_workers=n, initializer=_init_worker,
+                             initargs=(shard_counter(vectorizer),)) as pool:
+        terms, X = merge_counts(list(pool.map(_count_shard, _shards(docs, n))), vectorizer.dtype)
+
+    kept = limit_features(X, vectorizer.max_df, vectorizer.min_df, vectorizer.max_features)
+    X = X[:, kept]
+    transformer = fit_from_counts(vectorizer, terms[kept], X)
+    return X if transformer is None else transformer.transform(X, copy=False)
+
+
+def parallel_transform(vectorizer, docs, n_jobs=None):
+    """vectorizer.transform(docs), shard by shard in `n_jobs` processes (rows are independent)."""
+    docs = list(docs)
+    n = _n_shards(docs, n_jobs)
+    if n < 2:
+        return vectorizer.transform(docs)
+    with ProcessPoolExecutor(max_workers=n, initializer=_init_worker, initargs=(vectorizer,)) as pool:
+        return sp.vstack(list(pool.map(_transform_shard, _shards(docs, n))), format="csr")
+
+
+# Speedup against core count (checks every run against the sequential result):
+#   python src/parallel_tfidf.py [data/processed/train_clean.csv] [n_rows]
+if __name__ == "__main__":
+    import sys
+    import time
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    try:
+        from src.processed_data import processed_path, load_processed
+    except ImportError:
+        from processed_data import processed_path, load_processed
+
+    path = sys.argv[1] if len(sys.argv) > 1 else processed_path("train_clean")
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    params = {"max_features": 10000, "ngram_range": (1, 2)}
+    texts = load_processed(path, columns=["text"], max_samples=n_rows)["text"].fillna("").astype(str).tolist()
+    print(f"{len(texts)} documents, {os.cpu_count()} cores, params {params}")
+
+    t0 = time.perf_counter()
+    reference = TfidfVectorizer(**params)
+    X_ref = reference.fit_transform(texts)
+    t_seq = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    Xt_ref = reference.transform(texts)
+    t_seq_tr = time.perf_counter() - t0
+    print(f"sequential      : fit_transform {t_seq:.2f}s, transform {t_seq_tr:.2f}s")
+
+    jobs = sorted({j for j in (1, 2, 4, 8, 16, os.cpu_count() or 1) if j <= max(os.cpu_count() or 1, 2)})
+    for n_jobs in jobs:
+        vec = TfidfVectorizer(**params)
+        t0 = time.perf_counter()
+        X = parallel_fit_transform(vec, texts, n_jobs=n_jobs)
+        t_fit = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        Xt = parallel_transform(vec, texts, n_jobs=n_jobs)
+        t_tr = time.perf_counter() - t0
+        same = (vec.vocabulary_ == reference.vocabulary_ and np.array_equal(vec.idf_, reference.idf_)
+                and abs(X - X_ref).max() < 1e-12 and (Xt != Xt_ref).nnz == 0)
+        print(f"n_jobs={n_jobs:<2}        : fit_transform {t_fit:.2f}s ({t_seq / t_fit:.2f}x), "
+              f"transform {t_tr:.2f}s ({t_seq_tr / t_tr:.2f}x), identical={same}")
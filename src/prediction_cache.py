@@ -0,0 +1,145 @@
+# src/prediction_cache.py
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    from src.preprocessing import clean_text
+except ImportError:
+    from preprocessing import clean_text
+
+# Cache of sentiment predictions keyed on (model name, artifact fingerprint, clean_text(text)).
+# The fingerprint comes from ModelRegistry.reload_if_changed(), so deploying retrained
+# artifacts to models/ reloads the model and old entries simply stop matching.
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 3600  # seconds, None = no expiry
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with an optional per-entry TTL."""
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = int(max_size)
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item is None:
+                    continue
+                value, expires = item
+                if expires is not None and expires <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, mapping):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (value, expires)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCache:
+    """Shared backend on top of Django's cache framework (settings.CACHES[alias])."""
+
+    def __init__(self, alias="default", ttl=DEFAULT_TTL):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+        self.ttl = ttl
+
+    def get_many(self, keys):
+        return self.cache.get_many(list(keys))
+
+    def set_many(self, mapping):
+        self.cache.set_many(mapping, timeout=self.ttl)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class PredictionCache:
+    """
+    Wraps a batch predict function with a result cache. `backend` is anything with
+    get_many(keys) -> dict and set_many(mapping) (LRUCache, DjangoCache, ...).
+    `version_fn(model_name)` returns the current artifact fingerprint of the model.
+    """
+
+    def __init__(self, version_fn, backend=None, namespace="sentiment", normalize=clean_text):
+        self.version_fn = version_fn
+        self.backend = backend if backend is not None else LRUCache()
+        self.namespace = namespace
+        self.normalize = normalize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, model_name, version, text):
+        digest = hashlib.sha1(text.encode("utf8")).hexdigest()
+        return f"{self.namespace}:{model_name}:{version}:{digest}"
+
+    def predict(self, texts, model_name, predict_fn):
+        """
+        Predictions for `texts`; only normalized texts missing from the cache are
+        passed (once each) to predict_fn(list_of_texts) -> list of labels.
+        """
+        model_name = str(model_name).lower()
+        version = self.version_fn(model_name)
+        norm = [self.normalize(t) for t in texts]
+        keys = [self.key(model_name, version, t) for t in norm]
+        found = self.backend.get_many(set(keys))
+
+        missing = {}
+        for key, text in zip(keys, norm):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            results = predict_fn(list(missing.values()))
+            computed = dict(zip(missing.keys(), results))
+            self.backend.set_many(computed)
+            found.update(computed)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+        return [found[key] for key in keys]
+
+    def stats(self):
+        total = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+        if hasattr(self.backend, "__len__"):
+            stats["size"] = len(self.backend)
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def clear(self):
+        self.backend.clear()
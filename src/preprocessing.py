@@ -1,10 +1,23 @@
 import pandas as pd
 import os
 import re
-from langdetect import detect, DetectorFactory
-DetectorFactory.seed = 0
+import json
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-CHUNKSIZE = 300  # adjust based on RAM
+try:
+    from src.language_id import LanguageIdentifier
+    from src.dedup import Deduplicator
+    from src.processed_data import is_parquet, write_part, remove_parts_from
+except ImportError:
+    from language_id import LanguageIdentifier
+    from dedup import Deduplicator
+    from processed_data import is_parquet, write_part, remove_parts_from
+
+CHUNKSIZE = 20000  # rows per chunk handed to a worker; adjust based on RAM
+ITERATION_ROWS = 300  # rows per `iterations` step (the chunk size before CHUNKSIZE grew)
+WORKERS = os.cpu_count() or 1
 
 def clean_text(s):
     if not isinstance(s, str):
@@ -22,42 +35,181 @@ def map_score_to_sentiment(score):
     else:
         return "positive"
 
-def preprocess_file(input_path, output_path, iterations=None):
-    if os.path.exists(output_path):
-        raise FileExistsError()
-    print("Processing", output_path + ":")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    first = True
-    for i, chunk in enumerate(pd.read_csv(input_path, header=None, names=['score','title','text'],
-                                         chunksize=CHUNKSIZE, quoting=1, engine='python')):
-        # combine title+text
-        chunk['text'] = (chunk['title'].fillna('') + ". " + chunk['text'].fillna('')).apply(clean_text)
-        chunk = chunk[['score','text']]
-        # deduplicate
-        chunk = chunk.drop_duplicates(subset=['text'])
-        # detect language
-        langs = []
-        for txt in chunk['text'].tolist():
-            try:
-                langs.append(detect(txt) if txt.strip() else 'unknown')
-            except Exception:
-                langs.append('unknown')
-        chunk['language'] = langs
-        # map sentiment
-        chunk['sentiment'] = chunk['score'].apply(map_score_to_sentiment)
-        chunk = chunk[['text','language','score','sentiment']]
-        # write
-        chunk.to_csv(output_path, index=False, mode='a', header=first)
-        first = False
-        print(f"\tProcessed chunk {i+1}" + (f"/{iterations}" if iterations else ""), f"({(i+1)*CHUNKSIZE} rows)", end='\r')
-        if iterations and (i+1 >= iterations):
-            break
-    print(f"\nFinished processing {input_path}")
+# one per process: the pre-filter handles plain English, langdetect only the ambiguous rest,
+# and texts seen before (duplicates across chunks) are answered from its hash memo
+_language_id = LanguageIdentifier()
+
+def detect_languages(texts):
+    return _language_id.detect_batch(texts)
+
+def clean_chunk(chunk):
+    """Combine title+text, clean it and drop duplicates within the chunk."""
+    chunk['text'] = (chunk['title'].fillna('') + ". " + chunk['text'].fillna('')).apply(clean_text)
+    chunk = chunk[['score','text']]
+    return chunk.drop_duplicates(subset=['text'])
+
+def process_chunk(chunk):
+    """Language-tag and label one cleaned chunk (runs in the worker processes)."""
+    chunk = chunk.copy()
+    # detect language
+    chunk['language'] = detect_languages(chunk['text'].tolist())
+    # map sentiment
+    chunk['sentiment'] = chunk['score'].apply(map_score_to_sentiment)
+    return chunk[['text','language','score','sentiment']]
+
+# Checkpoint next to the output: chunks already written and the output size after the
+# last finished chunk, so an interrupted run can truncate a half-written chunk and resume.
+# <output>.dedup.bin holds the dedup keys of the rows written so far.
+def _checkpoint_path(output_path):
+    return output_path + ".checkpoint.json"
+
+def _dedup_path(output_path):
+    return output_path + ".dedup.bin"
+
+def _read_checkpoint(output_path, input_path, settings):
+    path = _checkpoint_path(output_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf8") as f:
+        state = json.load(f)
+    if state.get("input") != os.path.abspath(input_path) or state.get("settings") != settings:
+        raise ValueError(f"Checkpoint {path} belongs to a different input/settings; delete it to start over")
+    return state
+
+def _write_checkpoint(output_path, state):
+    path = _checkpoint_path(output_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+def _read_chunks(input_path, chunksize):
+    # C parser: an order of magnitude faster than engine='python' on large chunks
+    return pd.read_csv(input_path, header=None, names=['score','title','text'],
+                       chunksize=chunksize, quoting=1, engine='c', dtype={'title': str, 'text': str})
+
+def preprocess_file(input_path, output_path, iterations=None, max_rows=None,
+                    chunksize=CHUNKSIZE, workers=WORKERS, near_duplicates=False):
+    """
+    Preprocess a raw (score, title, text) CSV into output_path: a CSV file, or a Parquet
+    dataset directory (one part per chunk) when output_path ends with `.parquet`.
+    Chunks of `chunksize` rows are cleaned in a pool of `workers` processes, deduplicated
+    in this process against everything written before (exact text hash; MinHash/LSH
+    near-duplicates too if near_duplicates=True), then language-tagged in the pool and
+    written in input order. Stops after `max_rows` rows (`iterations` is deprecated: it
+    counts ITERATION_ROWS-row steps, whatever `chunksize` is). Progress is checkpointed
+    after every chunk; re-running an interrupted call resumes after the last finished chunk.
+    Returns the checkpoint state (row counts, duplicates dropped).
+    """
+    if iterations is not None:
+        warnings.warn("preprocess_file(iterations=...) is deprecated, pass max_rows instead "
+                      f"(iterations={iterations} means max_rows={iterations * ITERATION_ROWS})",
+                      DeprecationWarning, stacklevel=2)
+        max_rows = min(max_rows, iterations * ITERATION_ROWS) if max_rows else iterations * ITERATION_ROWS
+    settings = {"chunksize": chunksize, "near_duplicates": near_duplicates}
+    state = _read_checkpoint(output_path, input_path, settings)
+    if state is None and os.path.exists(output_path):
+        # not written by us (or an old run without checkpoint) - don't touch it
+        raise FileExistsError(output_path)
+    if state is not None and state["finished"]:
+        print(f"{output_path} is already complete ({state['rows_out']} rows)")
+        return state
+    dedup = Deduplicator(near_duplicates=near_duplicates)
+    if state is None:
+        state = {"input": os.path.abspath(input_path), "settings": settings, "chunks_done": 0,
+                 "rows_in": 0, "rows_out": 0, "bytes": 0, "dedup_keys": 0,
+                 "duplicates_dropped": 0, "near_duplicates_dropped": 0, "finished": False}
+        if os.path.exists(_dedup_path(output_path)):
+            os.remove(_dedup_path(output_path))
+        print("Processing", output_path + ":")
+    else:
+        dedup.load_keys(_dedup_path(output_path), state["dedup_keys"])
+        if is_parquet(output_path):
+            remove_parts_from(output_path, state["chunks_done"])
+        print("Resuming", output_path, f"after chunk {state['chunks_done']}:")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    n_chunks = -(-max_rows // chunksize) if max_rows else None
+
+    def chunks():
+        for i, chunk in enumerate(_read_chunks(input_path, chunksize)):
+            if n_chunks and i >= n_chunks:
+                break
+            if max_rows and i * chunksize + len(chunk) > max_rows:
+                chunk = chunk.iloc[:max_rows - i * chunksize].copy()
+            if i < state["chunks_done"]:
+                continue
+            yield i, chunk
+
+    def deduplicate(i, rows_in, chunk):
+        # corpus-wide dedup (in input order) before the expensive language detection
+        exact, near = dedup.exact_dropped, dedup.near_dropped
+        keep, keys = dedup.filter(chunk['text'])
+        dropped = (rows_in - len(chunk) + dedup.exact_dropped - exact, dedup.near_dropped - near)
+        return i, (rows_in, keys, dropped), chunk[keep]
+
+    def write(i, info, chunk):
+        rows_in, keys, (exact, near) = info
+        if is_parquet(output_path):
+            write_part(chunk, output_path, i)
+        else:
+            with open(output_path, "a", encoding="utf8", newline="") as f:
+                f.truncate(state["bytes"])  # drop a chunk that was half-written when interrupted
+                chunk.to_csv(f, index=False, header=(i == 0))
+                f.flush()
+                os.fsync(f.fileno())
+                state["bytes"] = f.tell()
+        dedup.append_keys(_dedup_path(output_path), keys)
+        state["dedup_keys"] += len(keys)
+        state["chunks_done"] = i + 1
+        state["rows_in"] += rows_in
+        state["rows_out"] += len(chunk)
+        state["duplicates_dropped"] += exact
+        state["near_duplicates_dropped"] += near
+        _write_checkpoint(output_path, state)
+        print(f"\tProcessed chunk {i+1}" + (f"/{n_chunks}" if n_chunks else ""),
+              f"({state['rows_in']} rows)", end='\r')
+
+    if workers and workers > 1:
+        # ordered two-stage fan-out: clean in the pool, dedup here, language-tag in the pool;
+        # at most `workers` chunks being cleaned and 2 per worker being tagged bounds memory
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cleaning, tagging = deque(), deque()
+
+            def tag_next():
+                i0, rows_in, fut = cleaning.popleft()
+                i0, info, chunk = deduplicate(i0, rows_in, fut.result())
+                tagging.append((i0, info, pool.submit(process_chunk, chunk)))
+
+            def write_next():
+                i0, info, fut = tagging.popleft()
+                write(i0, info, fut.result())
+
+            for i, chunk in chunks():
+                cleaning.append((i, len(chunk), pool.submit(clean_chunk, chunk)))
+                if len(cleaning) >= workers:
+                    tag_next()
+                if len(tagging) >= 2 * workers:
+                    write_next()
+            while cleaning:
+                tag_next()
+            while tagging:
+                write_next()
+    else:
+        for i, chunk in chunks():
+            i, info, chunk = deduplicate(i, len(chunk), clean_chunk(chunk))
+            write(i, info, process_chunk(chunk))
+
+    state["finished"] = True
+    _write_checkpoint(output_path, state)
+    print(f"\nFinished processing {input_path}: {state['rows_out']} of {state['rows_in']} rows kept,",
+          f"{state['duplicates_dropped']} duplicates and {state['near_duplicates_dropped']}",
+          "near-duplicates dropped")
+    return state
 
 if __name__ == "__main__":
     files_to_process = [
-        {"input": r"..\data\raw\train.csv", "output": r"..\data\processed\train_clean.csv", "iterations": 80},
-        {"input": r"..\data\raw\test.csv",  "output": r"..\data\processed\test_clean.csv",  "iterations": 20},
+        {"input": r"..\data\raw\train.csv", "output": r"..\data\processed\train_clean.parquet", "max_rows": 24000},
+        {"input": r"..\data\raw\test.csv",  "output": r"..\data\processed\test_clean.parquet",  "max_rows": 6000},
     ]
     for file in files_to_process:
-        preprocess_file(file['input'], file['output'], file['iterations'])
+        preprocess_file(file['input'], file['output'], max_rows=file['max_rows'])
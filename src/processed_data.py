@@ -0,0 +1,166 @@
+# src/processed_data.py
+import os
+import glob
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Processed review data is either the legacy CSV (text,language,score,sentiment) or a
+# Parquet dataset directory `<name>.parquet/part-NNNNN.parquet` (one part per preprocessing
+# chunk) with dictionary-encoded language/sentiment and an int8 score.
+# load_processed() reads only the requested columns and samples whole row groups, so the
+# training scripts no longer parse the full file to keep 20k-200k rows.
+
+PROCESSED_DIR = os.path.join("data", "processed")
+ROW_GROUP_SIZE = 20000
+
+if pa is not None:
+    SCHEMA = pa.schema([
+        ("text", pa.string()),
+        ("language", pa.dictionary(pa.int8(), pa.string())),
+        ("score", pa.int8()),
+        ("sentiment", pa.dictionary(pa.int8(), pa.string())),
+    ])
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("Parquet support needs pyarrow (pip install pyarrow)")
+
+
+def is_parquet(path):
+    return str(path).endswith(".parquet")
+
+
+def processed_path(name, processed_dir=PROCESSED_DIR):
+    """`<name>.parquet` when it exists (and pyarrow is available), else `<name>.csv`."""
+    parquet = os.path.join(processed_dir, name + ".parquet")
+    if pq is not None and os.path.exists(parquet):
+        return parquet
+    return os.path.join(processed_dir, name + ".csv")
+
+
+def part_path(dataset_dir, index):
+    return os.path.join(dataset_dir, f"part-{index:05d}.parquet")
+
+
+def _part_files(path):
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "part-*.parquet")))
+    return [path]
+
+
+def write_part(df, dataset_dir, index, row_group_size=ROW_GROUP_SIZE):
+    """Write one chunk of processed rows as part `index` (atomically: tmp file + rename)."""
+    _require_pyarrow()
+    os.makedirs(dataset_dir, exist_ok=True)
+    df = df[["text", "language", "score", "sentiment"]].astype({
+        "text": str, "language": "category", "score": np.int8, "sentiment": "category",
+    })
+    table = pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False)
+    path = part_path(dataset_dir, index)
+    pq.write_table(table, path + ".tmp", row_group_size=row_group_size)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def remove_parts_from(dataset_dir, index):
+    """Delete parts >= index (left behind by an interrupted run)."""
+    for path in glob.glob(os.path.join(dataset_dir, "part-*.parquet*")):
+        name = os.path.basename(path)
+        if int(name[5:10]) >= index:
+            os.remove(path)
+
+
+def row_groups(path):
+    """[(file, row_group_index, num_rows)] of a Parquet file or dataset directory."""
+    _require_pyarrow()
+    out = []
+    for file in _part_files(path):
+        meta = pq.ParquetFile(file).metadata
+        out.extend((file, i, meta.row_group(i).num_rows) for i in range(meta.num_row_groups))
+    return out
+
+
+def load_processed(path, columns=("text", "sentiment"), max_samples=None, random_state=42):
+    """
+    Load processed reviews with only `columns`. With max_samples, Parquet input is
+    sampled at row-group level (random row groups until enough rows, then an exact
+    row sample); CSV input is read fully and sampled as before.
+    """
+    columns = list(columns)
+    if not is_parquet(path):
+        df = pd.read_csv(path, usecols=columns)
+        if max_samples and len(df) > max_samples:
+            df = df.sample(n=max_samples, random_state=random_state)
+        return df
+
+    _require_pyarrow()
+    groups = row_groups(path)
+    if max_samples:
+        rng = np.random.RandomState(random_state)
+        picked, total = [], 0
+        for k in rng.permutation(len(groups)):
+            if total >= max_samples:
+                break
+            picked.append(groups[k])
+            total += groups[k][2]
+        groups = sorted(picked)
+
+    tables = []
+    by_file = {}
+    for file, i, _ in groups:
+        by_file.setdefault(file, []).append(i)
+    for file, indices in by_file.items():
+        tables.append(pq.ParquetFile(file).read_row_groups(indices, columns=columns))
+    if not tables:
+        return pd.DataFrame({c: [] for c in columns})
+    df = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    if max_samples and len(df) > max_samples:
+        df = df.sample(n=max_samples, random_state=random_state)
+    return df
+
+
+def iter_processed(path, columns=("text", "sentiment"), batch_size=ROW_GROUP_SIZE):
+    """Yield DataFrames of at most `batch_size` rows with `columns`, in file order."""
+    columns = list(columns)
+    if not is_parquet(path):
+        yield from pd.read_csv(path, usecols=columns, chunksize=batch_size)
+        return
+    _require_pyarrow()
+    for file in _part_files(path):
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+
+
+def csv_to_parquet(csv_path, dataset_dir, chunksize=ROW_GROUP_SIZE):
+    """Convert an existing processed CSV into a Parquet dataset directory."""
+    for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunksize)):
+        chunk["text"] = chunk["text"].fillna("")
+        write_part(chunk, dataset_dir, i)
+    return dataset_dir
+
+
+# Convert the processed CSVs and compare training-load time:
+#   python src/processed_data.py [data/processed/train_clean.csv] [max_samples]
+if __name__ == "__main__":
+    import sys
+    import time
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(PROCESSED_DIR, "train_clean.csv")
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    if not os.path.exists(parquet_path):
+        csv_to_parquet(csv_path, parquet_path)
+    size = lambda p: sum(os.path.getsize(f) for f in _part_files(p)) / 2**20
+    print(f"csv {os.path.getsize(csv_path) / 2**20:.1f} MB, parquet {size(parquet_path):.1f} MB")
+    for label, path in (("csv", csv_path), ("parquet", parquet_path)):
+        t0 = time.perf_counter()
+        df = load_processed(path, max_samples=n)
+        print(f"{label:>8}: {len(df)} rows in {(time.perf_counter() - t0) * 1000:.0f} ms")
@@ -0,0 +1,231 @@
+# src/product_similarity.py
+# Content-based "products like this one" index built from review text:
+#   - every positive review (Review.sentiment == 1) is vectorized with the served svm_tfidf
+#     vectorizer and averaged per product; rows are L2-normalized, so a dot product is the
+#     cosine similarity (averaging before normalizing is the same as summing)
+#   - optionally reduced to N dense dimensions with TruncatedSVD (--components)
+#   - the TOP_K nearest products of every product are precomputed with blocked matrix
+#     multiplies (BLOCK_SIZE rows x all products at a time), so a request is one array lookup
+#   - everything is stored under INDEX_DIR and memory-mapped on load (shared by forked workers)
+# Products are identified by their reviews-database id (products.id / reviews.product_id); the
+# Django catalog maps its products onto these through Product.catalog_id.
+#
+#   python src/product_similarity.py --components 256
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+from sqlalchemy import select
+
+try:
+    from src.db import Review, session_scope
+except ImportError:
+    from db import Review, session_scope
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+INDEX_DIR = os.path.normpath(
+    os.environ.get("PRODUCT_SIMILARITY_INDEX") or os.path.join(HERE, "..", "models", "product_similarity")
+)
+TOP_K = 20           # neighbours stored per product
+BLOCK_SIZE = 1024    # products scored per block (BLOCK_SIZE x n_products dense similarities)
+READ_CHUNK = 20000   # reviews read and vectorized at a time
+MODEL_NAME = "svm"   # whose TF-IDF vectorizer defines the vector space
+
+
+def iter_positive_reviews(chunk_rows=READ_CHUNK):
+    """(product_ids, texts) of positively scored reviews, keyset-paginated on id."""
+    last_id = 0
+    while True:
+        with session_scope(readonly=True) as session:
+            rows = session.execute(
+                select(Review.id, Review.product_id, Review.review_text)
+                .where(Review.sentiment == 1, Review.id > last_id, Review.product_id.is_not(None))
+                .order_by(Review.id)
+                .limit(chunk_rows)
+            ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield [r.product_id for r in rows], ["" if r.review_text is None else r.review_text for r in rows]
+
+
+def product_vectors(chunks, vectorizer):
+    """
+    Sum the vectorized texts of each product over (product_ids, texts) chunks.
+    Returns (product ids in first-seen order, CSR matrix of L2-normalized rows, reviews per product).
+    """
+    rows_of = {}
+    total = None
+    counts = []
+    for product_ids, texts in chunks:
+        X = sp.csr_matrix(vectorizer.transform(texts), dtype=np.float32)
+        rows = np.fromiter((rows_of.setdefault(p, len(rows_of)) for p in product_ids),
+                           dtype=np.int64, count=len(product_ids))
+        counts.append(rows)
+        # indicator matrix (products x reviews) sums each product's rows in one sparse product
+        P = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, np.arange(len(rows)))),
+                          shape=(len(rows_of), len(rows)))
+        part = (P @ X).tocsr()
+        if total is not None:
+            total.resize(part.shape)
+            part = part + total
+        total = part
+    if total is None:
+        raise ValueError("no reviews to build the similarity index from")
+    n_reviews = np.bincount(np.concatenate(counts), minlength=len(rows_of))
+    return list(rows_of), normalize(total, norm="l2", copy=False), n_reviews
+
+
+def blocked_top_k(vectors, k=TOP_K, block_size=BLOCK_SIZE):
+    """
+    Indices and cosine scores of the k most similar other rows for every row of `vectors`
+    (L2-normalized, sparse or dense), ordered by decreasing score.
+    """
+    n = vectors.shape[0]
+    k = min(k, n - 1)
+    neighbors = np.empty((n, max(k, 0)), dtype=np.int32)
+    scores = np.empty((n, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return neighbors, scores
+    vectors_t = vectors.T.tocsr() if sp.issparse(vectors) else vectors.T
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = vectors[start:stop] @ vectors_t
+        block = block.toarray() if sp.issparse(block) else np.asarray(block)
+        block = block.astype(np.float32, copy=False)
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # not its own neighbour
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+    return neighbors, scores
+
+
+class SimilarityIndex:
+    """Per-product review vectors plus their precomputed nearest neighbours."""
+
+    def __init__(self, product_ids, vectors, neighbors, scores, meta=None):
+        self.product_ids = np.asarray(product_ids, dtype=object)
+        self.vectors = vectors
+        self.neighbors = neighbors
+        self.scores = scores
+        self.meta = meta or {}
+        self._row = {pid: i for i, pid in enumerate(self.product_ids)}
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    def __contains__(self, product_id):
+        return product_id in self._row
+
+    @classmethod
+    def build(cls, chunks, vectorizer, n_components=None, top_k=TOP_K, block_size=BLOCK_SIZE, seed=42):
+        t0 = time.perf_counter()
+        product_ids, vectors, n_reviews = product_vectors(chunks, vectorizer)
+        if n_components:
+            n_components = min(n_components, vectors.shape[1] - 1, max(len(product_ids) - 1, 1))
+            svd = TruncatedSVD(n_components=n_components, random_state=seed)
+            vectors = normalize(svd.fit_transform(vectors).astype(np.float32), norm="l2", copy=False)
+        neighbors, scores = blocked_top_k(vectors, top_k, block_size)
+        meta = {
+            "products": len(product_ids),
+            "reviews": int(n_reviews.sum()),
+            "dimensions": int(vectors.shape[1]),
+            "svd_components": int(n_components) if n_components else None,
+            "top_k": int(neighbors.shape[1]),
+            "build_seconds": round(time.perf_counter() - t0, 3),
+        }
+        return cls(product_ids, vectors, neighbors, scores, meta)
+
+    def similar(self, product_id, k=5):
+        """[(product_id, cosine)] of the k products most similar to `product_id` ([] if unknown)."""
+        row = self._row.get(product_id)
+        if row is None:
+            return []
+        if k <= self.neighbors.shape[1]:
+            idx, sims = self.neighbors[row, :k], self.scores[row, :k]
+        else:
+            # more than was precomputed: score this one row against all products
+            sims = self.vectors[row] @ self.vectors.T
+            sims = (sims.toarray() if sp.issparse(sims) else np.asarray(sims)).ravel()
+            sims[row] = -np.inf
+            idx = np.argsort(-sims, kind="stable")[:k]
+            sims = sims[idx]
+        return [(self.product_ids[i], float(s)) for i, s in zip(idx, sims) if s > 0]
+
+    def save(self, index_dir=INDEX_DIR):
+        os.makedirs(index_dir, exist_ok=True)
+
+        def replace(name, write):
+            path = os.path.join(index_dir, name)
+            with open(path + ".tmp", "wb") as f:
+                write(f)
+            os.replace(path + ".tmp", path)
+
+        sparse = sp.issparse(self.vectors)
+        vectors_file, stale_file = ("vectors.npz", "vectors.npy") if sparse else ("vectors.npy", "vectors.npz")
+        if sparse:
+            replace(vectors_file, lambda f: sp.save_npz(f, self.vectors.tocsr()))
+        else:
+            replace(vectors_file, lambda f: np.save(f, self.vectors))
+        replace("neighbors.npy", lambda f: np.save(f, self.neighbors))
+        replace("scores.npy", lambda f: np.save(f, self.scores))
+        replace("product_ids.json", lambda f: f.write(json.dumps([str(p) for p in self.product_ids]).encode("utf8")))
+        # the metadata file is written last: its presence marks a complete index, and it
+        # names the vectors file, so a previous build's other format is never picked up
+        self.meta["vectors_file"] = vectors_file
+        replace("meta.json", lambda f: f.write(json.dumps(self.meta, indent=2).encode("utf8")))
+        try:
+            os.remove(os.path.join(index_dir, stale_file))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR, mmap=True):
+        """Load a saved index (FileNotFoundError if there is none); arrays are memory-mapped."""
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf8") as f:
+            meta = json.load(f)
+        with open(os.path.join(index_dir, "product_ids.json"), "r", encoding="utf8") as f:
+            product_ids = json.load(f)
+        mmap_mode = "r" if mmap else None
+        vectors_file = meta.get("vectors_file")
+        if vectors_file is None:  # written before meta.json recorded it
+            has_dense = os.path.exists(os.path.join(index_dir, "vectors.npy"))
+            vectors_file = "vectors.npy" if has_dense else "vectors.npz"
+        vectors_path = os.path.join(index_dir, vectors_file)
+        if vectors_file.endswith(".npy"):
+            vectors = np.load(vectors_path, mmap_mode=mmap_mode)
+        else:
+            vectors = sp.load_npz(vectors_path).tocsr()
+        neighbors = np.load(os.path.join(index_dir, "neighbors.npy"), mmap_mode=mmap_mode)
+        scores = np.load(os.path.join(index_dir, "scores.npy"), mmap_mode=mmap_mode)
+        return cls(product_ids, vectors, neighbors, scores, meta)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=INDEX_DIR)
+    parser.add_argument("--components", type=int, default=0, help="TruncatedSVD dimensions (0 = sparse TF-IDF)")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    args = parser.parse_args()
+
+    try:
+        from src.model_registry import get_registry
+    except ImportError:
+        from model_registry import get_registry
+    vectorizer = get_registry().get(MODEL_NAME).vectorizer
+    index = SimilarityIndex.build(iter_positive_reviews(), vectorizer, n_components=args.components or None,
+                                  top_k=args.top_k, block_size=args.block_size)
+    index.save(args.out)
+    print(f"Product similarity index saved to {args.out}: {json.dumps(index.meta)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# src/product_stats.py
+# Materialized per-product sentiment aggregates (product_sentiment_stats) so recommendations
+# read a pre-sorted top-K instead of grouping every review on every request:
+#   - record_scored() adds the counts of a batch of newly scored reviews with one upsert
+#     (INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE); sentiment_backfill.py calls it in the
+#     same transaction that writes Review.sentiment, so the table never drifts from the reviews
+#   - rebuild_product_stats() recomputes the table from scratch (first deployment / repair)
+#   - top_products() returns product ids ordered by positive review count; recommend_from_stats()
+#     is the ranking both recommenders (src/recommender.py, reviews/recommender.py) serve
+# The table is maintained by sentiment_backfill.py only (no triggers). Any other write to
+# reviews.sentiment must keep it in step: call record_scored() for reviews scored elsewhere, and
+# run rebuild_product_stats() (python src/product_stats.py) after reviews were re-scored, reset
+# to NULL for re-scoring, or deleted - their old counts cannot be subtracted incrementally.
+import random
+from collections import defaultdict
+
+from sqlalchemy import select, delete, insert, func, case
+
+try:
+    from src.db import Review, ProductSentimentStats, session_scope
+except ImportError:
+    from db import Review, ProductSentimentStats, session_scope
+
+# reviews.sentiment code -> stats column (see sentiment_backfill.SENTIMENT_CODES)
+SENTIMENT_COLUMNS = {1: "positive", 2: "neutral", 0: "negative"}
+COUNT_COLUMNS = ("positive", "neutral", "negative", "rating_sum", "rating_count")
+
+# databases with an upsert statement record_scored() can use
+UPSERT_DIALECTS = ("mysql", "postgresql", "sqlite")
+
+# Number of products recommended, and the top-N they are sampled from for non-positive users
+TOP_K = 5
+SAMPLE_POOL = 100
+
+
+def check_dialect(dialect_name):
+    """Raise ValueError unless record_scored() can upsert on this database dialect."""
+    if dialect_name not in UPSERT_DIALECTS:
+        raise ValueError(f"product_sentiment_stats upsert is not supported on {dialect_name!r}; "
+                         f"supported dialects: {', '.join(UPSERT_DIALECTS)}")
+
+
+def _upsert(dialect_name):
+    check_dialect(dialect_name)
+    table = ProductSentimentStats.__table__
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    stmt = dialect_insert(table)
+    new = stmt.inserted if dialect_name == "mysql" else stmt.excluded
+    total_count = table.c.rating_count + new.rating_count
+    # mean_rating comes first: MySQL evaluates ON DUPLICATE KEY UPDATE assignments left to
+    # right with already-updated values, PostgreSQL/SQLite against the old row
+    updates = [
+        ("mean_rating", (table.c.rating_sum + new.rating_sum) / func.nullif(total_count, 0)),
+        *[(c, table.c[c] + new[c]) for c in COUNT_COLUMNS],
+        ("updated_at", func.now()),
+    ]
+    if dialect_name == "mysql":
+        return stmt.on_duplicate_key_update(updates)
+    return stmt.on_conflict_do_update(index_elements=[table.c.product_id], set_=dict(updates))
+
+
+def record_scored(session, product_ids, ratings, codes):
+    """
+    Add newly scored reviews (parallel sequences of product id, rating, sentiment code)
+    to product_sentiment_stats. Each review must be counted exactly once: a review whose
+    sentiment changes afterwards needs rebuild_product_stats().
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(COUNT_COLUMNS, 0))
+    for product_id, rating, code in zip(product_ids, ratings, codes):
+        delta = deltas[product_id]
+        delta[SENTIMENT_COLUMNS[code]] += 1
+        if rating is not None:
+            delta["rating_sum"] += rating
+            delta["rating_count"] += 1
+    if not deltas:
+        return 0
+    # sorted, so concurrent backfill workers lock product rows in the same order
+    rows = [
+        dict(delta, product_id=pid,
+             mean_rating=delta["rating_sum"] / delta["rating_count"] if delta["rating_count"] else None)
+        for pid, delta in sorted(deltas.items(), key=lambda item: str(item[0]))
+    ]
+    # executemany of one prepared upsert (no bound-parameter limit for large batches)
+    session.execute(_upsert(session.get_bind().dialect.name), rows)
+    return len(rows)
+
+
+def rebuild_product_stats(session):
+    """Recompute product_sentiment_stats from all scored reviews; returns the number of products."""
+    count = lambda code: func.sum(case((Review.sentiment == code, 1), else_=0))
+    aggregates = (
+        select(
+            Review.product_id,
+            count(1), count(2), count(0),
+            func.coalesce(func.sum(Review.rating), 0.0),
+            func.count(Review.rating),
+            func.avg(Review.rating),
+        )
+        .where(Review.sentiment.is_not(None), Review.product_id.is_not(None))
+        .group_by(Review.product_id)
+    )
+    session.execute(delete(ProductSentimentStats))
+    session.execute(insert(ProductSentimentStats).from_select(
+        ["product_id", *COUNT_COLUMNS, "mean_rating"], aggregates))
+    return session.scalar(select(func.count()).select_from(ProductSentimentStats))
+
+
+def top_products(session, k=5, min_positive=1):
+    """Ids of the k products with the most positive reviews (ties: higher product id first)."""
+    stats = ProductSentimentStats
+    return session.scalars(
+        select(stats.product_id)
+        .where(stats.positive >= min_positive)
+        .order_by(stats.positive.desc(), stats.product_id.desc())
+        .limit(k)
+    ).all()
+
+
+def sample_top_products(session, k=5, pool=100, rng=random):
+    """k products drawn at random from the `pool` most positively reviewed ones."""
+    candidates = top_products(session, pool)
+    return rng.sample(candidates, min(k, len(candidates)))
+
+
+def recommend_from_stats(positive, k=TOP_K, pool=SAMPLE_POOL):
+    """
+    Product ids for a user: the k most positively reviewed products if `positive`, else k
+    drawn from the `pool` most positively reviewed (one indexed read, no review scan).
+    """
+    with session_scope(readonly=True) as session:
+        if positive:
+            return list(top_products(session, k))
+        return list(sample_top_products(session, k, pool))
+
+
+if __name__ == "__main__":
+    try:
+        from src.db import init_db
+    except ImportError:
+        from db import init_db
+    init_db()
+    with session_scope() as session:
+        print(f"product_sentiment_stats rebuilt: {rebuild_product_stats(session)} products.")
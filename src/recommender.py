@@ -1,73 +1,109 @@
 # src/recommender.py
 import os
-import json
-import joblib
-import pickle
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+try:
+    from src.model_registry import get_registry
+    from src.lstm_batcher import process_batcher
+    from src.prediction_cache import PredictionCache, LRUCache
+    from src.product_stats import recommend_from_stats, TOP_K, SAMPLE_POOL
+except ImportError:
+    from model_registry import get_registry
+    from lstm_batcher import process_batcher
+    from prediction_cache import PredictionCache, LRUCache
+    from product_stats import recommend_from_stats, TOP_K, SAMPLE_POOL
 
 # Determine models directory relative to this file (works when script is run from anywhere)
 HERE = os.path.dirname(os.path.abspath(__file__))
 MODELS_DIR = os.path.normpath(os.path.join(HERE, "..", "models"))
 
-# Helpers to load artifacts safely
-def _load_joblib(name):
-    path = os.path.join(MODELS_DIR, name)
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Required model artifact not found: {path}")
-    return joblib.load(path)
-
-def _load_pickle(name):
-    path = os.path.join(MODELS_DIR, name)
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Required artifact not found: {path}")
-    with open(path, "rb") as f:
-        return pickle.load(f)
-
-def _load_json(name):
-    path = os.path.join(MODELS_DIR, name)
-    if not os.path.exists(path):
-        return None
-    with open(path, "r", encoding="utf8") as f:
-        return json.load(f)
-
-
-# Load Naive Bayes artifacts
-try:
-    nb_model = _load_joblib("naive_bayes_model.joblib")
-    nb_tfidf = _load_joblib("naive_bayes_tfidf.joblib")
-    nb_label_enc = _load_joblib("naive_bayes_label_encoder.joblib")
-except FileNotFoundError as e:
-    # Re-raise with clearer message if you want, or keep None to allow partial operation
-    raise
-
-# Load SVM artifacts
-try:
-    svm_model = _load_joblib("svm_model.joblib")
-    svm_tfidf = _load_joblib("svm_tfidf.joblib")
-    svm_label_enc = _load_joblib("svm_label_encoder.joblib")
-except FileNotFoundError as e:
-    raise
+# Artifacts are loaded lazily (and shared per process) by the model registry;
+# TensorFlow is only imported the first time the LSTM is used.
+registry = get_registry(MODELS_DIR)
+
+# Default number of texts vectorized / forwarded together in predict_sentiment_batch
+BATCH_SIZE = 1024
+
+# Concurrent single-text LSTM requests are micro-batched into one forward pass
+LSTM_MICRO_BATCHING = os.environ.get("LSTM_MICRO_BATCHING", "1") != "0"
+LSTM_BATCH_MAX_SIZE = 64
+LSTM_BATCH_MAX_DELAY_MS = 5.0
+
+# Repeated texts (after clean_text) are answered from an in-process LRU cache; keys include
+# the artifact fingerprint, so a retrained model deployed to models/ is picked up automatically
+PREDICTION_CACHE = os.environ.get("PREDICTION_CACHE", "1") != "0"
+PREDICTION_CACHE_SIZE = 10000
+PREDICTION_CACHE_TTL = 3600
+prediction_cache = PredictionCache(
+    lambda name: registry.reload_if_changed(name).fingerprint,
+    LRUCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL),
+)
+
+
+# labels are the index -> label arrays precomputed by the registry, so decoding a batch
+# is a single fancy-index instead of an inverse_transform call per prediction
+def _decode(pred_enc, labels):
+    pred_enc = np.asarray(pred_enc)
+    if labels is None:
+        # if label encoder isn't available or mapping is numeric
+        return pred_enc.astype(str)
+    return labels[pred_enc.astype(np.intp)]
+
+
+def _lstm_predict_encoded(lstm, texts):
+    # one pre-traced forward pass per length bucket (skips the per-call overhead of model.predict)
+    probs = lstm.predict_proba(texts, padding="post", truncating="post")
+    # If binary output of shape (n, ) or (n,1) interpret sigmoid; else argmax
+    if probs.ndim == 1 or (probs.ndim == 2 and probs.shape[1] == 1):
+        return (probs.reshape(-1) > 0.5).astype(np.intp)
+    return np.argmax(probs, axis=1)
+
+
+def _predict_uncached(texts, model_name, batch_size):
+    loaded = registry.get(model_name)
+    out = []
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        if loaded.vectorizer is not None:
+            pred_enc = loaded.predict_encoded(loaded.vectorizer.transform(chunk))
+        else:
+            pred_enc = _lstm_predict_encoded(loaded, chunk)
+        out.append(_decode(pred_enc, loaded.labels))
+    return np.concatenate(out) if out else np.empty(0, dtype=object)
+
 
-# Load LSTM artifacts
-# training saved `lstm_model.h5` (or .h5) and tokenizer pickle and label encoder joblib
-lstm_model_path_h5 = os.path.join(MODELS_DIR, "lstm_model.h5")
-if not os.path.exists(lstm_model_path_h5):
-    # fall back to commonly used alternative filename (if any)
-    lstm_model_path_h5 = os.path.join(MODELS_DIR, "lstm_model.keras")
+# Batched prediction
+def predict_sentiment_batch(texts, model_name: str = "nb", batch_size: int = BATCH_SIZE,
+                            return_array: bool = False, use_cache: bool = PREDICTION_CACHE):
+    """
+    Predict sentiment for many texts at once using NB, SVM, or LSTM.
+    Each batch of `batch_size` texts is vectorized together and scored with a single
+    sparse-dense product through the registry's LinearScorer (NB/SVM) or one forward
+    pass (LSTM). With use_cache, only texts not already in prediction_cache are scored.
+    Returns a list of label strings aligned with `texts` (or a NumPy array if return_array).
+    """
+    registry.get(model_name)
+
+    if batch_size is None or batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
 
-if not os.path.exists(lstm_model_path_h5):
-    raise FileNotFoundError(f"LSTM model file not found (checked .h5 and .keras) in {MODELS_DIR}")
+    texts = ["" if t is None else str(t) for t in texts]
+    if use_cache:
+        result = np.asarray(prediction_cache.predict(
+            texts, model_name, lambda miss: _predict_uncached(miss, model_name, batch_size)
+        ), dtype=object)
+    else:
+        result = _predict_uncached(texts, model_name, batch_size)
+    return result if return_array else result.tolist()
 
-lstm_model = tf.keras.models.load_model(lstm_model_path_h5)
-lstm_tokenizer = _load_pickle("lstm_tokenizer.pkl")
-lstm_label_enc = _load_joblib("lstm_label_encoder.joblib")
 
-# optionally read config for LSTM max_len
-lstm_cfg = _load_json("lstm_config.json") or {}
-LSTM_MAX_LEN = int(lstm_cfg.get("max_len", 200))
+# Process-wide MicroBatcher in front of the LSTM (re-created after fork)
+get_lstm_batcher = process_batcher(
+    lambda texts: _predict_uncached(texts, "lstm", LSTM_BATCH_MAX_SIZE),
+    max_batch_size=LSTM_BATCH_MAX_SIZE,
+    max_delay_ms=LSTM_BATCH_MAX_DELAY_MS,
+)
 
 
 # Prediction function
@@ -76,83 +112,105 @@ def predict_sentiment(text: str, model_name: str = "nb"):
     Predict sentiment using NB, SVM, or LSTM.
     Returns the label string (e.g., 'positive'/'neutral'/'negative').
     """
-    model_name = model_name.lower()
-
-    if model_name == "nb":
-        X = nb_tfidf.transform([text])
-        pred_enc = nb_model.predict(X)[0]
-        # invert encoded label to string
-        try:
-            label = nb_label_enc.inverse_transform([pred_enc])[0]
-        except Exception:
-            # if label encoder isn't available or mapping is numeric
-            label = str(pred_enc)
-
-    elif model_name == "svm":
-        X = svm_tfidf.transform([text])
-        pred_enc = svm_model.predict(X)[0]
-        try:
-            label = svm_label_enc.inverse_transform([pred_enc])[0]
-        except Exception:
-            label = str(pred_enc)
-
-    elif model_name == "lstm":
-        seq = lstm_tokenizer.texts_to_sequences([text])
-        seq = pad_sequences(seq, maxlen=LSTM_MAX_LEN, padding="post", truncating="post")
-        probs = lstm_model.predict(seq, verbose=0)
-        # If binary output of shape (1, ) or (1,1) interpret sigmoid; else argmax
-        if probs.ndim == 1 or (probs.ndim == 2 and probs.shape[1] == 1):
-            prob = float(probs.reshape(-1)[0])
-            pred_enc = 1 if prob > 0.5 else 0
-        else:
-            pred_enc = int(np.argmax(probs, axis=1)[0])
+    if LSTM_MICRO_BATCHING and str(model_name).lower() == "lstm":
+        if not PREDICTION_CACHE:
+            return get_lstm_batcher().predict(text)
+        registry.get("lstm")
+        return prediction_cache.predict(
+            ["" if text is None else str(text)], "lstm",
+            lambda miss: [get_lstm_batcher().predict(t) for t in miss],
+        )[0]
+    return predict_sentiment_batch([text], model_name=model_name)[0]
 
-        try:
-            label = lstm_label_enc.inverse_transform([pred_enc])[0]
-        except Exception:
-            label = str(pred_enc)
 
-    else:
-        raise ValueError("Unknown model_name. Use 'nb', 'svm', or 'lstm'.")
+# product_db sentiment values counted as positive: numeric 1 (1 <= v < 2) or one of these strings
+POSITIVE_VALUES = {"positive", "pos", "1", "true", "yes"}
 
-    return label
+
+def _is_positive_label(label):
+    return bool(label) and str(label).strip().lower() in {"positive", "pos"}
+
+
+def _is_positive_value(v):
+    if pd.isna(v):
+        return False
+    if isinstance(v, (int, float, np.integer, np.floating)):
+        return 1 <= v < 2  # same as int(v) == 1, without overflowing on inf
+    return str(v).strip().lower() in POSITIVE_VALUES
+
+
+def _check_normalized(dtype):
+    if not (pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype)):
+        raise TypeError("normalized sentiment must be a boolean or integer column")
+
+
+def positive_mask(sentiment: pd.Series, normalized: bool = False) -> np.ndarray:
+    """
+    Boolean NumPy mask of the positive rows of a product_db sentiment column.
+    Dispatched on dtype instead of a per-row Python call: bool/numeric columns are compared
+    directly; categorical and string/object columns classify each distinct value once and map
+    the result back through the category / factorize codes.
+    normalized=True declares the column already holds booleans or integer sentiment codes
+    (1 positive, 0 negative, 2 neutral as in the reviews table; e.g. int8): only 1/True is positive.
+    """
+    dtype = sentiment.dtype
+    if normalized:
+        _check_normalized(dtype)
+        return (sentiment == 1).to_numpy(dtype=bool, na_value=False)
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = sentiment.cat.codes.to_numpy()
+        categories = sentiment.cat.categories
+    elif pd.api.types.is_bool_dtype(dtype):
+        return sentiment.to_numpy(dtype=bool, na_value=False)
+    elif pd.api.types.is_integer_dtype(dtype):
+        return (sentiment == 1).to_numpy(dtype=bool, na_value=False)
+    elif pd.api.types.is_float_dtype(dtype):
+        values = sentiment.to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            return (values >= 1) & (values < 2)
+    else:
+        codes, categories = pd.factorize(sentiment)
+    # one extra False entry for code -1 (missing values)
+    lookup = np.array([_is_positive_value(v) for v in categories] + [False], dtype=bool)
+    return lookup[codes]
 
 
 # Recommender
-def recommend_products(user_text: str, product_db: pd.DataFrame, model_name: str = "svm"):
+def recommend_products(user_text: str, product_db: pd.DataFrame = None, model_name: str = "svm",
+                       normalized_sentiment: bool = False):
     """
     Recommend products based on:
       - predicted sentiment of user_text
       - product_db: pandas DataFrame with columns 'product_id', 'review_text', 'sentiment'
-    product_db sentiment column may contain numeric flags (1/0) or strings ('positive', 'negative').
+    product_db sentiment column may contain numeric flags (1/0), strings ('positive', 'negative')
+    or a categorical of either; normalized_sentiment=True takes a boolean / integer-code column as is.
+    Without product_db the ranking is read from the precomputed product_sentiment_stats table.
     Returns a dict: {"user_sentiment": label, "recommended_products": [product_ids]}
     """
+    if product_db is None:
+        user_sentiment = predict_sentiment(user_text, model_name=model_name)
+        return {"user_sentiment": user_sentiment,
+                "recommended_products": recommend_from_stats(_is_positive_label(user_sentiment))}
     if not isinstance(product_db, pd.DataFrame):
         raise TypeError("product_db must be a pandas DataFrame")
 
-    user_sentiment = predict_sentiment(user_text, model_name=model_name)
+    if normalized_sentiment and "sentiment" in product_db:
+        _check_normalized(product_db["sentiment"].dtype)
 
-    # Normalize sentiment column for matching: accept numeric 1, 'positive', 'pos'
-    def is_positive_val(v):
-        if pd.isna(v):
-            return False
-        if isinstance(v, (int, float, np.integer, np.floating)):
-            return int(v) == 1
-        sv = str(v).strip().lower()
-        return sv in {"positive", "pos", "1", "true", "yes"}
+    user_sentiment = predict_sentiment(user_text, model_name=model_name)
 
     # Filter positive reviews
     try:
-        positives = product_db[product_db["sentiment"].apply(is_positive_val)]
-    except Exception:
-        # if column missing or unusual, default to empty
+        positives = product_db[positive_mask(product_db["sentiment"], normalized=normalized_sentiment)]
+    except KeyError:
+        # no sentiment column: nothing to recommend from
         positives = product_db.iloc[0:0]
 
-    if user_sentiment and str(user_sentiment).strip().lower() in {"positive", "pos"}:
+    if _is_positive_label(user_sentiment):
         matches = positives
     else:
         # For negative users, recommend popular positive products (sample if needed)
-        matches = positives.sample(n=min(100, len(positives))) if len(positives) > 0 else positives
+        matches = positives.sample(n=min(SAMPLE_POOL, len(positives))) if len(positives) > 0 else positives
 
     if matches.empty:
         return {"user_sentiment": user_sentiment, "recommended_products": []}
@@ -162,7 +220,7 @@ def recommend_products(user_text: str, product_db: pd.DataFrame, model_name: str
         matches.groupby("product_id")
         .size()
         .sort_values(ascending=False)
-        .head(5)
+        .head(TOP_K)
         .index.tolist()
     )
 
@@ -176,6 +234,7 @@ if __name__ == "__main__":
     print("NB:", predict_sentiment(sample, "nb"))
     print("SVM:", predict_sentiment(sample, "svm"))
     print("LSTM:", predict_sentiment(sample, "lstm"))
+    print("SVM batch:", predict_sentiment_batch([sample, "Terrible, broke after a day."], "svm"))
 
     # example recommender (toy)
     df = pd.DataFrame({
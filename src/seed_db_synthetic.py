@@ -1,121 +1,115 @@
 import os
-import random
+import sys
+import time
+import numpy as np
 import pandas as pd
-from sqlalchemy import text
-from sqlalchemy.orm import sessionmaker
-from db import engine, Base  # db.py must define Base + ORM models mapped to your MySQL schema
+from sqlalchemy import create_engine, text
+from db import get_engine, Base  # db.py must define Base + ORM models mapped to your MySQL schema
+from processed_data import processed_path, iter_processed
+from bulk_load import bulk_insert, bulk_transaction, SQLITE_STANDIN_SCHEMA
 
-# Ensure tables exist
-Base.metadata.create_all(engine)
-
-Session = sessionmaker(bind=engine)
-
-PROCESSED = os.path.join("data", "processed", "train_clean.csv")
+PROCESSED = processed_path("train_clean")
 
 NUM_PRODUCTS = 2000
 NUM_USERS = 5000
 SEED = 42
-random.seed(SEED)
+CHUNK_ROWS = 50000  # reviews generated and committed per transaction
 
 
-# Synthetic Generators
-def gen_product_list(n):
-    products = []
-    for i in range(n):
-        products.append({
-            "name": f"Synth Product {i}",
-            "category": "misc",
-            "description": f"Auto-generated product description {i}"
-        })
-    return products
+# Synthetic Generators (vectorized: one DataFrame per table / chunk)
+def gen_products(n):
+    i = pd.Series(np.arange(n)).astype(str)
+    return pd.DataFrame({
+        "name": "Synth Product " + i,
+        "category": "misc",
+        "description": "Auto-generated product description " + i,
+    })
 
 
 def gen_users(n):
-    users = []
-    for i in range(n):
-        users.append({
-            "username": f"user_{i}",
-            "language": "unknown"
-        })
-    return users
-
+    i = pd.Series(np.arange(n)).astype(str)
+    return pd.DataFrame({
+        "username": "user_" + i,
+        "language": "unknown",
+    })
 
-# Seeding Logic
-def seed_synthetic():
-    session = Session()
 
-    # 1. Insert Products
-    print("Inserting products...")
-    products = gen_product_list(NUM_PRODUCTS)
+def gen_reviews(chunk, user_ids, product_ids, rng):
+    """Reviews for one chunk of processed rows, each with a random user and product."""
+    chunk = chunk.dropna(subset=["text"])
+    texts = chunk["text"].astype(str)
+    language = chunk["language"].astype(object) if "language" in chunk else pd.Series(None, index=chunk.index)
+    return pd.DataFrame({
+        "user_id": rng.choice(user_ids, size=len(chunk)),
+        "product_id": rng.choice(product_ids, size=len(chunk)),
+        "title": texts.str[:80],
+        "text": texts,
+        "language": language.where(language.notna(), "unknown"),
+    })
 
-    insert_product_sql = text("""
-        INSERT INTO Product (name, category, description)
-        VALUES (:name, :category, :description)
-    """)
 
-    for p in products:
-        session.execute(insert_product_sql, p)
-
-    session.commit()
-
-    # Fetch assigned AUTO_INCREMENT IDs
-    product_ids = [row[0] for row in session.execute(text("SELECT id FROM Product")).fetchall()]
-    print(f"Inserted {len(product_ids)} products.")
-
-    # 2. Insert Users
-    print("Inserting users...")
-    users = gen_users(NUM_USERS)
+def _insert(engine, table, df, constants=None):
+    # one transaction per call; SQLite skips the fsync on commit while loading
+    with bulk_transaction(engine) as conn:
+        return bulk_insert(conn, table, df, constants)
 
-    insert_user_sql = text("""
-        INSERT INTO User (username, language)
-        VALUES (:username, :language)
-    """)
 
-    for u in users:
-        session.execute(insert_user_sql, u)
+def _ids(engine, table):
+    with engine.connect() as conn:
+        return np.array(conn.execute(text(f"SELECT id FROM {table}")).scalars().all())
 
-    session.commit()
 
-    user_ids = [row[0] for row in session.execute(text("SELECT id FROM User")).fetchall()]
-    print(f"Inserted {len(user_ids)} users.")
-
-    # 3. Insert Reviews
-    print("Loading processed reviews...")
-    df = pd.read_csv(PROCESSED)
-    df = df.dropna(subset=["text"]).reset_index(drop=True)
-
-    insert_review_sql = text("""
-        INSERT INTO Review (user_id, product_id, title, text, language, created_at)
-        VALUES (:user_id, :product_id, :title, :text, :language, NOW())
-    """)
-
-    for idx, row in df.iterrows():
-        user_id = random.choice(user_ids)
-        product_id = random.choice(product_ids)
-
-        title = row["text"][:80]
-        language = row.get("language", "unknown")
-
-        session.execute(
-            insert_review_sql,
-            {
-                "user_id": user_id,
-                "product_id": product_id,
-                "title": title,
-                "text": row["text"],
-                "language": language
-            }
-        )
+# Seeding Logic
+def seed_synthetic(engine=None, processed=PROCESSED, chunk_rows=CHUNK_ROWS):
+    """Insert products, users and one review per processed row; returns rows/sec per table."""
+    engine = engine or get_engine()
+    # Ensure tables exist
+    Base.metadata.create_all(engine)
+    rng = np.random.default_rng(SEED)
+    report = {}
+
+    def timed(table, rows, seconds):
+        entry = report.setdefault(table, {"rows": 0, "seconds": 0.0})
+        entry["rows"] += rows
+        entry["seconds"] += seconds
+        entry["rows_per_second"] = round(entry["rows"] / max(entry["seconds"], 1e-9), 1)
+        return entry
 
-        if (idx + 1) % 5000 == 0:
-            session.commit()
-            print(f"Inserted {idx + 1} reviews...")
+    # 1. Insert Products
+    print("Inserting products...")
+    t0 = time.perf_counter()
+    entry = timed("Product", _insert(engine, "Product", gen_products(NUM_PRODUCTS)), time.perf_counter() - t0)
+    product_ids = _ids(engine, "Product")
+    print(f"Inserted {entry['rows']} products ({entry['rows_per_second']:,.0f} rows/s).")
 
-    session.commit()
-    session.close()
+    # 2. Insert Users
+    print("Inserting users...")
+    t0 = time.perf_counter()
+    entry = timed("User", _insert(engine, "User", gen_users(NUM_USERS)), time.perf_counter() - t0)
+    user_ids = _ids(engine, "User")
+    print(f"Inserted {entry['rows']} users ({entry['rows_per_second']:,.0f} rows/s).")
+
+    # 3. Insert Reviews, streamed from the processed file chunk by chunk
+    print("Inserting reviews...")
+    for chunk in iter_processed(processed, columns=["text", "language"], batch_size=chunk_rows):
+        t0 = time.perf_counter()
+        reviews = gen_reviews(chunk, user_ids, product_ids, rng)
+        rows = _insert(engine, "Review", reviews, {"created_at": "CURRENT_TIMESTAMP"})
+        entry = timed("Review", rows, time.perf_counter() - t0)
+        print(f"Inserted {entry['rows']} reviews ({entry['rows_per_second']:,.0f} rows/s)...")
 
     print("Synthetic database seeding complete.")
+    return report
 
 
+# python src/seed_db_synthetic.py                 -> the database configured in db.py
+# python src/seed_db_synthetic.py path/to/bench.db -> local SQLite stand-in (rows/sec benchmark)
 if __name__ == "__main__":
-    seed_synthetic()
+    if len(sys.argv) > 1:
+        target = create_engine(f"sqlite:///{os.path.abspath(sys.argv[1])}", future=True)
+        with target.begin() as conn:
+            for ddl in SQLITE_STANDIN_SCHEMA:
+                conn.exec_driver_sql(ddl)
+        print(seed_synthetic(target))
+    else:
+        seed_synthetic()
@@ -0,0 +1,193 @@
+# src/sentiment_backfill.py
+# Background job that fills in Review.sentiment (None = not processed) for existing and newly
+# arriving reviews:
+#   - unprocessed rows are read in keyset-paginated batches (sentiment IS NULL AND id > :last
+#     ORDER BY id LIMIT :batch, served by ix_reviews_sentiment_id)
+#   - each batch is scored with one predict_sentiment_batch call
+#   - results go back in a single UPDATE reviews SET sentiment = CASE id WHEN ... END
+#   - product_sentiment_stats gets the batch's per-product counts (product_stats.record_scored)
+#   - the shard's checkpoint (BackfillCheckpoint.last_id) is advanced in the same transaction,
+#     so a restarted worker resumes after the last committed batch
+#   - once caught up, every pass restarts from id 0: ids are assigned at insert, not commit, so
+#     a review committed late (or reset to NULL) can sit below the checkpoint; the index makes
+#     these rescans cheap since they only visit rows that are still NULL; re-scoring reviews by
+#     resetting them to NULL counts them again in product_sentiment_stats, so run
+#     rebuild_product_stats() (python src/product_stats.py) once the backfill has caught up
+# Parallel workers split the table either by id modulo (shard k of N only sees id % N == k,
+# one checkpoint per shard) or, with --skip-locked (MySQL 8 / PostgreSQL), by claiming batches
+# with SELECT ... FOR UPDATE SKIP LOCKED; claimed rows leave the NULL set on commit, so that mode
+# keeps its cursor in memory and always scans from the start instead of checkpointing.
+#
+#   python src/sentiment_backfill.py --model svm --workers 4            # one pass, then exit
+#   python src/sentiment_backfill.py --model svm --workers 4 --follow   # keep up with new reviews
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sqlalchemy import select, update, case
+
+try:
+    from src.db import Review, BackfillCheckpoint, session_scope, init_db, get_engine
+    from src.product_stats import record_scored, check_dialect
+except ImportError:
+    from db import Review, BackfillCheckpoint, session_scope, init_db, get_engine
+    from product_stats import record_scored, check_dialect
+
+BATCH_SIZE = 1000        # reviews scored and written per transaction
+POLL_INTERVAL = 10.0     # seconds to wait for new reviews in follow mode
+MODEL_NAME = os.environ.get("BACKFILL_MODEL", "svm")
+
+# label predicted by the models -> value stored in reviews.sentiment
+SENTIMENT_CODES = {"negative": 0, "positive": 1, "neutral": 2}
+
+
+def encode_sentiments(labels):
+    """Map predicted label strings to the integer codes stored in reviews.sentiment."""
+    try:
+        return [SENTIMENT_CODES[str(label).strip().lower()] for label in labels]
+    except KeyError as e:
+        raise ValueError(f"unknown sentiment label {e.args[0]!r}") from None
+
+
+def model_scorer(model_name=MODEL_NAME, batch_size=BATCH_SIZE):
+    """texts -> labels with the served model; the prediction cache is bypassed (texts are unique)."""
+    try:
+        from src.recommender import predict_sentiment_batch
+    except ImportError:
+        from recommender import predict_sentiment_batch
+
+    def score(texts):
+        return predict_sentiment_batch(texts, model_name=model_name, batch_size=batch_size,
+                                       use_cache=False)
+    return score
+
+
+def shard_key(model_name, shard, shards):
+    return f"{model_name}:{shard}/{shards}"
+
+
+def _unprocessed(last_id, limit, shard, shards, skip_locked):
+    stmt = (
+        select(Review.id, Review.review_text, Review.product_id, Review.rating)
+        .where(Review.sentiment.is_(None), Review.id > last_id)
+        .order_by(Review.id)
+        .limit(limit)
+    )
+    if shards > 1:
+        stmt = stmt.where(Review.id % shards == shard)
+    if skip_locked:
+        stmt = stmt.with_for_update(skip_locked=True)
+    return stmt
+
+
+def write_sentiments(session, ids, codes):
+    """One UPDATE ... SET sentiment = CASE id WHEN ... END for the whole batch."""
+    session.execute(
+        update(Review)
+        .where(Review.id.in_(ids), Review.sentiment.is_(None))
+        .values(sentiment=case(dict(zip(ids, codes)), value=Review.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def backfill(model_name=MODEL_NAME, batch_size=BATCH_SIZE, shard=0, shards=1, skip_locked=False,
+             follow=False, poll_interval=POLL_INTERVAL, max_batches=None, score=None):
+    """
+    Score unprocessed reviews of one shard until none are left (or forever with follow=True).
+    `score` maps a list of texts to labels (defaults to model_scorer(model_name)).
+    Returns {"rows", "batches", "seconds", "rows_per_second", "last_id"}.
+    """
+    if not 0 <= shard < shards:
+        raise ValueError("shard must be in range(shards)")
+    # fail before loading the model or scoring anything if the stats upsert cannot run
+    check_dialect(get_engine().dialect.name)
+    score = score or model_scorer(model_name, batch_size)
+    key = shard_key(model_name, shard, shards)
+    stats = {"rows": 0, "batches": 0, "seconds": 0.0, "rows_per_second": 0.0, "last_id": 0}
+    cursor = None
+    from_zero = skip_locked  # does the current pass cover the whole table?
+
+    while max_batches is None or stats["batches"] < max_batches:
+        t0 = time.perf_counter()
+        with session_scope() as session:
+            checkpoint = None
+            if not skip_locked:
+                checkpoint = session.get(BackfillCheckpoint, key)
+                if checkpoint is None:
+                    checkpoint = BackfillCheckpoint(shard=key, last_id=0, rows=0)
+                    session.add(checkpoint)
+            if cursor is None:
+                cursor = checkpoint.last_id if checkpoint is not None else 0
+            rows = session.execute(_unprocessed(cursor, batch_size, shard, shards, skip_locked)).all()
+            if rows:
+                ids = [r.id for r in rows]
+                codes = encode_sentiments(np.asarray(score([r.review_text for r in rows])).tolist())
+                write_sentiments(session, ids, codes)
+                record_scored(session, [r.product_id for r in rows], [r.rating for r in rows], codes)
+                cursor = ids[-1]
+                if checkpoint is not None:
+                    checkpoint.last_id = max(checkpoint.last_id, cursor)
+                    checkpoint.rows += len(ids)
+
+        if not rows:
+            # rescan from the start: rows committed late, reset to NULL, or skipped because
+            # another worker held them locked
+            cursor = 0
+            if not from_zero:
+                from_zero = True
+                continue
+            if not follow:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        stats["rows"] += len(rows)
+        stats["batches"] += 1
+        stats["seconds"] += time.perf_counter() - t0
+        stats["rows_per_second"] = round(stats["rows"] / max(stats["seconds"], 1e-9), 1)
+        stats["last_id"] = max(stats["last_id"], cursor)
+        print(f"[{key}] {stats['rows']} reviews scored, last id {cursor} "
+              f"({stats['rows_per_second']:,.0f} rows/s)")
+    return stats
+
+
+def _run_shard(kwargs):
+    return backfill(**kwargs)
+
+
+def run_workers(workers, skip_locked=False, **kwargs):
+    """Run `workers` backfill processes (id-modulo shards, or all SKIP LOCKED on the full table)."""
+    if workers <= 1:
+        return [backfill(skip_locked=skip_locked, **kwargs)]
+    jobs = [
+        dict(kwargs, skip_locked=skip_locked, shard=0 if skip_locked else k, shards=1 if skip_locked else workers)
+        for k in range(workers)
+    ]
+    # db.py resets the connection pools in each forked worker
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_shard, jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=MODEL_NAME, choices=["nb", "svm", "lstm"])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--skip-locked", action="store_true",
+                        help="claim batches with FOR UPDATE SKIP LOCKED instead of id-modulo shards")
+    parser.add_argument("--follow", action="store_true", help="keep polling for new reviews")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+
+    init_db()  # creates backfill_checkpoints / product_sentiment_stats if missing
+    results = run_workers(args.workers, skip_locked=args.skip_locked, model_name=args.model,
+                          batch_size=args.batch_size, follow=args.follow,
+                          poll_interval=args.poll_interval)
+    print(f"Backfill done: {sum(r['rows'] for r in results)} reviews scored.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
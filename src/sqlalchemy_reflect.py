@@ -1,14 +1,17 @@
-from sqlalchemy import create_engine, MetaData, Table, select
-from sqlalchemy.orm import Session
-from db import engine  # if db.py uses create_engine with same URL, import it
+from sqlalchemy import select
+from db import reflected_table, session_scope
 
-meta = MetaData()
-meta.reflect(bind=engine)  # reflect existing DB (created by Django migrations)
-
-User = Table('reviews_user', meta, autoload_with=engine)  # modify names if Django uses app_label_modelname
+# Reflection of the existing DB (created by Django migrations) is cached in db.py,
+# so importing this module no longer runs a full schema reflection every time.
+USER_TABLE = 'reviews_user'  # modify names if Django uses app_label_modelname
 # But recommended: keep table names simple (see below)
 
-with Session(engine) as session:
-    stmt = select(User).limit(5)
-    rows = session.execute(stmt).all()
-    print(rows)
+
+def sample_users(limit=5):
+    User = reflected_table(USER_TABLE)
+    with session_scope(readonly=True) as session:
+        return session.execute(select(User).limit(limit)).all()
+
+
+if __name__ == "__main__":
+    print(sample_users())
@@ -0,0 +1,193 @@
+# src/sweep_svm.py
+# Hyperparameter sweep for the linear sentiment model (train_svm.py) without re-running it
+# per setting. The data is loaded and split exactly like train_svm.py, tokenized once per
+# ngram_range (feature_store.py; max_features is only a column selection on the cached
+# counts) and the trials run in a process pool:
+#   - SGDClassifier (hinge): one job per max_iter walks the C path from strong to weak
+#     regularization, each fit warm-started from the previous coefficients
+#   - LinearSVC: liblinear has no warm start in sklearn, so every (C, max_iter) is its own job
+# The leaderboard (macro F1, accuracy, train/predict time, iterations per trial) is written
+# to models/svm_sweep_leaderboard.csv and .json; copy the winner into SVM_PARAMS/TFIDF_PARAMS.
+#   python src/sweep_svm.py
+import os
+import json
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.svm import LinearSVC
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.preprocessing import LabelEncoder
+from sklearn.exceptions import ConvergenceWarning
+
+try:
+    from src.processed_data import processed_path, load_processed
+    from src.feature_store import build_features, FEATURE_CACHE_DIR
+except ImportError:
+    from processed_data import processed_path, load_processed
+    from feature_store import build_features, FEATURE_CACHE_DIR
+
+# === Config (data settings match train_svm.py so the feature cache is shared) ===
+DATA_PATH = os.environ.get("DATA_PATH") or processed_path("train_clean")
+OUT_DIR = os.environ.get("MODELS_OUT_DIR", os.path.join("models"))
+N_JOBS = int(os.environ.get("SWEEP_N_JOBS", os.cpu_count() or 1))
+
+RANDOM_STATE = 42
+MAX_SAMPLES = int(os.environ.get("TRAIN_MAX_SAMPLES", 200_000)) or None  # 0 = use all (as train_svm.py)
+TEST_SIZE = 0.1
+
+GRID = {
+    "estimator": ["linear_svc", "sgd"],
+    "ngram_range": [(1, 1), (1, 2)],
+    "max_features": [20_000, 100_000],
+    "C": [0.03, 0.1, 0.3, 1.0, 3.0],   # sorted ascending = strongest regularization first
+    "max_iter": [1000, 5000],
+}
+
+ESTIMATOR_PARAMS = {
+    "linear_svc": {"class_weight": "balanced", "random_state": RANDOM_STATE},
+    "sgd": {"loss": "hinge", "class_weight": "balanced", "random_state": RANDOM_STATE, "tol": 1e-3},
+}
+# a warm-started SGD fit starts next to its optimum: stop after 2 epochs without improvement
+# instead of the default 5 (7 -> 4 epochs per step, same macro F1 to 3 decimals)
+WARM_N_ITER_NO_CHANGE = 2
+
+_data = None
+
+
+def _init_worker(data):
+    global _data
+    _data = data
+
+
+def _score(clf, fit_seconds, **params):
+    Xv, y_val = _data["Xv"], _data["y_val"]
+    t0 = time.perf_counter()
+    y_pred = clf.predict(Xv)
+    predict_seconds = time.perf_counter() - t0
+    n_iter = int(np.max(clf.n_iter_))
+    return {
+        **params,
+        "macro_f1": f1_score(y_val, y_pred, average="macro"),
+        "accuracy": accuracy_score(y_val, y_pred),
+        "train_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "predict_us_per_row": predict_seconds / max(len(y_val), 1) * 1e6,
+        "n_iter": n_iter,
+        "converged": n_iter < params["max_iter"],
+    }
+
+
+def _run_job(job):
+    """One trial (LinearSVC) or one warm-started C path (SGD) -> list of leaderboard rows."""
+    Xtr, y_train = _data["Xtr"], _data["y_train"]
+    base = {"ngram_range": str(tuple(_data["ngram_range"])), "max_features": _data["max_features"],
+            "estimator": job["estimator"], "max_iter": job["max_iter"]}
+    rows = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        if job["estimator"] == "linear_svc":
+            clf = LinearSVC(C=job["C"], max_iter=job["max_iter"], **ESTIMATOR_PARAMS["linear_svc"])
+            t0 = time.perf_counter()
+            clf.fit(Xtr, y_train)
+            rows.append(_score(clf, time.perf_counter() - t0, C=job["C"], warm_start=False, **base))
+        else:
+            clf = SGDClassifier(max_iter=job["max_iter"], warm_start=True, **ESTIMATOR_PARAMS["sgd"])
+            for i, C in enumerate(sorted(job["C"])):
+                # same objective scale as LinearSVC: alpha = 1 / (C * n_samples)
+                clf.set_params(alpha=1.0 / (C * Xtr.shape[0]))
+                if i > 0:
+                    clf.set_params(n_iter_no_change=WARM_N_ITER_NO_CHANGE)
+                t0 = time.perf_counter()
+                clf.fit(Xtr, y_train)
+                rows.append(_score(clf, time.perf_counter() - t0, C=C, warm_start=i > 0, **base))
+    return rows
+
+
+def _jobs(grid):
+    for estimator in grid["estimator"]:
+        for max_iter in grid["max_iter"]:
+            if estimator == "sgd":
+                yield {"estimator": estimator, "max_iter": max_iter, "C": list(grid["C"])}
+            else:
+                for C in grid["C"]:
+                    yield {"estimator": estimator, "max_iter": max_iter, "C": C}
+
+
+def run_sweep(X_train, y_train, X_val, y_val, grid=GRID, n_jobs=N_JOBS, cache_dir=FEATURE_CACHE_DIR):
+    """
+    Run every trial of `grid` and return the leaderboard DataFrame (best macro F1 first).
+    Texts are tokenized once per ngram_range; trials of one feature set run in `n_jobs`
+    processes that receive the matrices once.
+    """
+    rows = []
+    for ngram_range in grid["ngram_range"]:
+        t0 = time.perf_counter()
+        features = build_features(X_train, X_val, {"ngram_range": tuple(ngram_range)},
+                                  cache_dir=cache_dir, n_jobs=n_jobs)
+        count_seconds = time.perf_counter() - t0
+        for max_features in grid["max_features"]:
+            t0 = time.perf_counter()
+            _, Xtr, Xv = features.tfidf({"ngram_range": tuple(ngram_range), "max_features": max_features})
+            data = {"Xtr": Xtr, "y_train": y_train, "Xv": Xv, "y_val": y_val,
+                    "ngram_range": ngram_range, "max_features": max_features}
+            vectorize_seconds = count_seconds + time.perf_counter() - t0
+            count_seconds = 0.0  # counted (or loaded) once per ngram_range
+            print(f"ngram_range={ngram_range} max_features={max_features}: "
+                  f"{Xtr.shape[1]} features, vectorized in {vectorize_seconds:.1f}s")
+
+            jobs = list(_jobs(grid))
+            if n_jobs and n_jobs > 1:
+                with ProcessPoolExecutor(max_workers=min(n_jobs, len(jobs)),
+                                         initializer=_init_worker, initargs=(data,)) as pool:
+                    results = list(pool.map(_run_job, jobs))
+            else:
+                _init_worker(data)
+                results = [_run_job(job) for job in jobs]
+            for job_rows in results:
+                for row in job_rows:
+                    row["vectorize_seconds"] = vectorize_seconds
+                    rows.append(row)
+
+    board = pd.DataFrame(rows).sort_values(["macro_f1", "train_seconds"], ascending=[False, True])
+    return board.reset_index(drop=True)
+
+
+def main():
+    df = load_processed(DATA_PATH, columns=["text", "sentiment"], max_samples=MAX_SAMPLES,
+                        random_state=RANDOM_STATE)
+    df = df.dropna(subset=['text', 'sentiment'])
+    le = LabelEncoder()
+    y_enc = le.fit_transform(df['sentiment'].astype(str).values)
+    X_train, X_val, y_train, y_val = train_test_split(
+        df['text'].astype(str).values, y_enc, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y_enc
+    )
+
+    t0 = time.perf_counter()
+    board = run_sweep(X_train, y_train, X_val, y_val, GRID, N_JOBS)
+    total = time.perf_counter() - t0
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    board.to_csv(os.path.join(OUT_DIR, "svm_sweep_leaderboard.csv"), index=False)
+    with open(os.path.join(OUT_DIR, "svm_sweep_leaderboard.json"), "w", encoding="utf8") as f:
+        json.dump({
+            "grid": GRID,
+            "n_train": len(X_train),
+            "n_val": len(X_val),
+            "n_jobs": N_JOBS,
+            "total_seconds": round(total, 1),
+            "trials": board.to_dict(orient="records"),
+        }, f, indent=2)
+
+    print(f"{len(board)} trials in {total:.1f}s ({N_JOBS} processes); top 5:")
+    print(board.head(5)[["estimator", "ngram_range", "max_features", "C", "max_iter",
+                         "macro_f1", "train_seconds", "predict_us_per_row"]].to_string(index=False))
+    print("Leaderboard saved to", os.path.join(OUT_DIR, "svm_sweep_leaderboard.csv"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import os
 import json
+import time
+import shutil
 import pickle
+import tempfile
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
@@ -8,84 +11,182 @@ from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report
 import tensorflow as tf
 from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
 from tensorflow.keras import layers, models
 
+try:
+    from src.lstm_numpy import export_lstm
+    from src.processed_data import processed_path, load_processed
+    from src.lstm_data import (configure_threads, text_vectorizer, processed_texts,
+                               token_dataset, EpochTimer)
+except ImportError:
+    from lstm_numpy import export_lstm
+    from processed_data import processed_path, load_processed
+    from lstm_data import (configure_threads, text_vectorizer, processed_texts,
+                           token_dataset, EpochTimer)
+
 # Config 
-DATA_PATH = os.path.join("data", "processed", "train_clean.csv")
-OUT_DIR = os.path.join("models")
+# train_clean.parquet (see processed_data.py) when present, otherwise train_clean.csv
+DATA_PATH = os.environ.get("DATA_PATH") or processed_path("train_clean")
+OUT_DIR = os.environ.get("MODELS_OUT_DIR", os.path.join("models"))
 os.makedirs(OUT_DIR, exist_ok=True)
 
 RANDOM_STATE = 42
 MAX_SAMPLES = 20000    # set lower for quick runs; set to None to use all
 TEST_SIZE = 0.1
 
+# "sample": MAX_SAMPLES rows in memory, stratified split (default)
+# "stream": the full processed file, read in chunks every epoch; validation = ~VAL_FRACTION
+#           of rows chosen by text hash (train_streaming.py rule); nothing is held in RAM
+#           except the vocabulary counts and the token-id cache (on disk, see CACHE)
+DATA_SOURCE = os.environ.get("LSTM_DATA", "sample")
+VAL_FRACTION = 0.1
+STREAM_CHUNK = 20000
+SHUFFLE_BUFFER = 50000   # examples; the sample mode shuffles the whole training set
+# token ids are cached after the first epoch: "memory", "disk" (a temp directory under
+# LSTM_CACHE_DIR, removed when training ends or fails) or "none" (re-read and re-tokenize
+# every epoch). Never under OUT_DIR: files there count as served model artifacts.
+CACHE = os.environ.get("LSTM_CACHE", "memory" if DATA_SOURCE == "sample" else "disk")
+CACHE_DIR = os.environ.get("LSTM_CACHE_DIR") or tempfile.gettempdir()
+
+# CPU threading: TensorFlow op pools and the tf.data pool (0 = TF default, all cores)
+INTRA_OP_THREADS = int(os.environ.get("TF_INTRA_OP_THREADS", 0))
+INTER_OP_THREADS = int(os.environ.get("TF_INTER_OP_THREADS", 0))
+DATA_THREADS = int(os.environ.get("TF_DATA_THREADS", 0))
+# "mixed_bfloat16" speeds up training on CPUs with AVX512-BF16/AMX; weights stay float32,
+# so the Keras and NumPy exports are unchanged. None = float32 everywhere.
+MIXED_PRECISION = os.environ.get("LSTM_MIXED_PRECISION") or None
+
 # LSTM params
 MAX_VOCAB = 30000
 MAX_LEN = 200
 EMBEDDING_DIM = 128
 LSTM_UNITS = 128
 BATCH_SIZE = 128
-EPOCHS = 5   # increase if you have time/GPU
+EPOCHS = int(os.environ.get("LSTM_EPOCHS", 5))   # increase if you have time/GPU
+# batches are built from sequences of similar length and padded only to their bucket
+# width (padding is masked, so the model sees the same inputs as with MAX_LEN padding)
+LENGTH_BUCKETS = [32, 64, 128, MAX_LEN]
 
 MODEL_NAME = "lstm"
+# also write lstm_model_numpy.npz + lstm_tokenizer.json so serving doesn't need TensorFlow
+# (None = float32 weights, "float16" or "int8" for smaller files)
+EXPORT_NUMPY = True
+NUMPY_QUANTIZE = None
 
-# Load data 
-df = pd.read_csv(DATA_PATH)
-df = df.dropna(subset=['text', 'sentiment'])
-if MAX_SAMPLES and len(df) > MAX_SAMPLES:
-    df = df.sample(n=MAX_SAMPLES, random_state=RANDOM_STATE)
-
-texts = df['text'].astype(str).values
-labels = df['sentiment'].astype(str).values
-
-# Encode labels 
-le = LabelEncoder()
-y_enc = le.fit_transform(labels)
-num_classes = len(le.classes_)
-
-# Train/Val split 
-X_train, X_val, y_train, y_val = train_test_split(
-    texts, y_enc, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y_enc
-)
+configure_threads(INTRA_OP_THREADS, INTER_OP_THREADS)
+if MIXED_PRECISION:
+    tf.keras.mixed_precision.set_global_policy(MIXED_PRECISION)
 
-# Tokenize 
 tokenizer = Tokenizer(num_words=MAX_VOCAB, oov_token="<OOV>")
-tokenizer.fit_on_texts(X_train)
-Xtr_seq = tokenizer.texts_to_sequences(X_train)
-Xv_seq = tokenizer.texts_to_sequences(X_val)
-
-Xtr = pad_sequences(Xtr_seq, maxlen=MAX_LEN, padding='post', truncating='post')
-Xv = pad_sequences(Xv_seq, maxlen=MAX_LEN, padding='post', truncating='post')
-
-# Build model 
-tf.keras.backend.clear_session()
-model = models.Sequential([
-    layers.Embedding(input_dim=min(MAX_VOCAB, len(tokenizer.word_index) + 1),
-                     output_dim=EMBEDDING_DIM, input_length=MAX_LEN),
-    layers.Bidirectional(layers.LSTM(LSTM_UNITS)),
-    layers.Dropout(0.4),
-    layers.Dense(64, activation='relu'),
-    layers.Dropout(0.3),
-    layers.Dense(num_classes, activation='softmax')
-])
-
-model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
-model.summary()
-
-# Train 
-history = model.fit(
-    Xtr, y_train,
-    validation_data=(Xv, y_val),
-    epochs=EPOCHS,
-    batch_size=BATCH_SIZE,
-    verbose=1
-)
-
-# Eval 
-y_prob = model.predict(Xv, batch_size=BATCH_SIZE)
-y_pred = np.argmax(y_prob, axis=1)
-report = classification_report(y_val, y_pred, target_names=le.classes_, output_dict=True)
+t0 = time.perf_counter()
+if DATA_SOURCE == "stream":
+    # Encode labels 
+    le = LabelEncoder().fit(["negative", "neutral", "positive"])
+    train_texts = processed_texts(DATA_PATH, le, VAL_FRACTION, validation=False, batch_size=STREAM_CHUNK)
+    val_texts = processed_texts(DATA_PATH, le, VAL_FRACTION, validation=True, batch_size=STREAM_CHUNK)
+    # Vocabulary: one pass over the training rows, word counts only
+    n_train = 0
+    for texts_b, _ in train_texts.batch(STREAM_CHUNK).as_numpy_iterator():
+        tokenizer.fit_on_texts([t.decode("utf8") for t in texts_b])
+        n_train += len(texts_b)
+    shuffle_buffer = SHUFFLE_BUFFER
+else:
+    # Load data 
+    # only text/sentiment are read; Parquet input is sampled by row group
+    df = load_processed(DATA_PATH, columns=["text", "sentiment"], max_samples=MAX_SAMPLES,
+                        random_state=RANDOM_STATE)
+    df = df.dropna(subset=['text', 'sentiment'])
+
+    texts = df['text'].astype(str).values
+    labels = df['sentiment'].astype(str).values
+
+    # Encode labels 
+    le = LabelEncoder()
+    y_enc = le.fit_transform(labels)
+
+    # Train/Val split 
+    X_train, X_val, y_train, y_val = train_test_split(
+        texts, y_enc, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y_enc
+    )
+    tokenizer.fit_on_texts(X_train)
+    train_texts = tf.data.Dataset.from_tensor_slices((X_train.astype(str), y_train.astype(np.int32)))
+    val_texts = tf.data.Dataset.from_tensor_slices((X_val.astype(str), y_val.astype(np.int32)))
+    n_train = len(X_train)
+    shuffle_buffer = n_train
+num_classes = len(le.classes_)
+print(f"Vocabulary of {len(tokenizer.word_index)} words from {n_train} training rows "
+      f"in {time.perf_counter() - t0:.1f}s")
+
+# Tokenize inside the tf.data graph (same ids as tokenizer.texts_to_sequences)
+vectorizer = text_vectorizer(tokenizer)
+cache_dir = tempfile.mkdtemp(prefix="sentiment_tokens_", dir=CACHE_DIR) if CACHE == "disk" else None
+
+
+def dataset_cache(name):
+    if CACHE == "disk":
+        return os.path.join(cache_dir, name)
+    return "memory" if CACHE == "memory" else None
+
+
+try:
+    train_ds = token_dataset(train_texts, vectorizer, MAX_LEN, BATCH_SIZE, LENGTH_BUCKETS,
+                             shuffle_buffer=shuffle_buffer, cache=dataset_cache("train"),
+                             seed=RANDOM_STATE, threads=DATA_THREADS)
+    val_ds = token_dataset(val_texts, vectorizer, MAX_LEN, BATCH_SIZE, LENGTH_BUCKETS,
+                           cache=dataset_cache("val"), threads=DATA_THREADS)
+
+    # Build model 
+    tf.keras.backend.clear_session()
+    model = models.Sequential([
+        layers.Embedding(input_dim=min(MAX_VOCAB, len(tokenizer.word_index) + 1),
+                         output_dim=EMBEDDING_DIM, mask_zero=True),
+        layers.Bidirectional(layers.LSTM(LSTM_UNITS)),
+        layers.Dropout(0.4),
+        layers.Dense(64, activation='relu'),
+        layers.Dropout(0.3),
+        # float32 softmax output also under a mixed precision policy
+        layers.Dense(num_classes, activation='softmax', dtype='float32')
+    ])
+
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    model.summary()
+
+    # Train 
+    timer = EpochTimer()
+    history = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=EPOCHS,
+        callbacks=[timer],
+        verbose=1
+    )
+    # epoch 1 includes reading + tokenizing into the cache; later epochs read the cache
+    epoch_seconds = [round(s, 2) for s in timer.epoch_seconds]
+    print("Epoch times (s):", epoch_seconds,
+          f"- {n_train / min(timer.epoch_seconds):,.0f} training rows/s at best")
+
+    # Eval (bucketing reorders examples, so collect labels alongside predictions)
+    y_true, y_pred = [], []
+    for xb, yb in val_ds:
+        y_pred.append(np.argmax(model(xb, training=False), axis=1))
+        y_true.append(yb.numpy())
+    y_true = np.concatenate(y_true)
+    y_pred = np.concatenate(y_pred)
+    report = classification_report(y_true, y_pred, target_names=le.classes_, output_dict=True)
+    report["training"] = {
+        "data_source": DATA_SOURCE,
+        "train_rows": n_train,
+        "epoch_seconds": epoch_seconds,
+        "rows_per_second": [round(n_train / s, 1) for s in timer.epoch_seconds],
+        "intra_op_threads": INTRA_OP_THREADS,
+        "inter_op_threads": INTER_OP_THREADS,
+        "data_threads": DATA_THREADS,
+        "mixed_precision": MIXED_PRECISION,
+        "cache": CACHE,
+    }
+finally:
+    if cache_dir:
+        shutil.rmtree(cache_dir, ignore_errors=True)
 
 # Save artifacts 
 # Keras model
@@ -97,6 +198,10 @@ tokenizer_path = os.path.join(OUT_DIR, f"{MODEL_NAME}_tokenizer.pkl")
 with open(tokenizer_path, "wb") as f:
     pickle.dump(tokenizer, f)
 
+# TensorFlow-free serving export
+if EXPORT_NUMPY:
+    export_lstm(model, tokenizer, OUT_DIR, quantize=NUMPY_QUANTIZE)
+
 # label encoder
 le_path = os.path.join(OUT_DIR, f"{MODEL_NAME}_label_encoder.joblib")
 import joblib
@@ -107,13 +212,20 @@ config = {
     "model": MODEL_NAME,
     "max_vocab": MAX_VOCAB,
     "max_len": MAX_LEN,
+    "mask_zero": True,
+    "length_buckets": LENGTH_BUCKETS,
+    "padding": "post",
+    "numpy_quantize": NUMPY_QUANTIZE if EXPORT_NUMPY else None,
     "embedding_dim": EMBEDDING_DIM,
     "lstm_units": LSTM_UNITS,
     "batch_size": BATCH_SIZE,
     "epochs": EPOCHS,
     "random_state": RANDOM_STATE,
-    "max_samples": MAX_SAMPLES,
-    "test_size": TEST_SIZE
+    "max_samples": MAX_SAMPLES if DATA_SOURCE == "sample" else None,
+    "test_size": TEST_SIZE if DATA_SOURCE == "sample" else VAL_FRACTION,
+    "data_source": DATA_SOURCE,
+    "tokenization": "text_vectorization",
+    "mixed_precision": MIXED_PRECISION,
 }
 with open(os.path.join(OUT_DIR, f"{MODEL_NAME}_config.json"), "w", encoding="utf8") as f:
     json.dump(config, f, indent=2)
@@ -0,0 +1,152 @@
+# src/train_streaming.py
+# Out-of-core training of Naive Bayes (MultinomialNB.partial_fit) and a linear SVM
+# (SGDClassifier, hinge loss) on the FULL processed dataset. Data is read in chunks of
+# BATCH_SIZE rows and vectorized with the stateless HashedTfidfVectorizer, so peak memory
+# does not grow with the number of rows:
+#   pass 1: document frequencies -> idf (train rows), validation holdout (~VAL_FRACTION by text hash)
+#   pass 2: partial_fit on every train chunk (EPOCHS passes for the SGD model)
+# Artifacts use the same names/format as train_nb.py / train_svm.py with VECTORIZER=hashing,
+# so the model registry serves them directly (SENTIMENT_MODELS_DIR=models_streaming).
+import os
+import json
+import time
+import joblib
+import numpy as np
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import classification_report
+from sklearn.preprocessing import LabelEncoder
+
+try:
+    from src.hashed_tfidf import HashedTfidfVectorizer
+    from src.processed_data import processed_path, iter_processed
+    from src.dedup import text_hashes
+    from src.model_registry import memory_usage
+except ImportError:
+    from hashed_tfidf import HashedTfidfVectorizer
+    from processed_data import processed_path, iter_processed
+    from dedup import text_hashes
+    from model_registry import memory_usage
+
+# === Config ===
+DATA_PATH = os.environ.get("DATA_PATH") or processed_path("train_clean")
+OUT_DIR = os.environ.get("MODELS_OUT_DIR", os.path.join("models_streaming"))
+os.makedirs(OUT_DIR, exist_ok=True)
+
+RANDOM_STATE = 42
+BATCH_SIZE = 20000
+VAL_FRACTION = 0.1       # rows whose text hash falls in the first 10% of buckets
+VAL_MAX_ROWS = 50000     # holdout kept in memory for the final metrics
+EPOCHS = 2               # passes over the data for the SGD model (NB needs exactly one)
+
+CLASSES = ["negative", "neutral", "positive"]
+HASHING_N_FEATURES = 2 ** 20
+NGRAM_RANGE = (1, 2)
+
+SGD_PARAMS = {
+    "loss": "hinge",
+    "alpha": 1e-6,
+    "random_state": RANDOM_STATE,
+}
+
+# which models to train: "naive_bayes", "svm"
+MODELS = os.environ.get("STREAMING_MODELS", "naive_bayes,svm").split(",")
+
+
+def batches():
+    for df in iter_processed(DATA_PATH, columns=["text", "sentiment"], batch_size=BATCH_SIZE):
+        df = df.dropna(subset=["text", "sentiment"])
+        texts = df["text"].astype(str).tolist()
+        is_val = text_hashes(texts) % np.uint64(1000) < np.uint64(int(VAL_FRACTION * 1000))
+        yield np.asarray(texts, dtype=object), le.transform(df["sentiment"].astype(str)), is_val
+
+
+le = LabelEncoder().fit(CLASSES)
+classes_enc = le.transform(CLASSES)
+vectorizer = HashedTfidfVectorizer(n_features=HASHING_N_FEATURES, ngram_range=NGRAM_RANGE)
+peak_rss = 0.0
+
+# === Pass 1: idf + validation holdout ===
+t0 = time.perf_counter()
+rows = 0
+val_texts, val_y = [], []
+for texts, y, is_val in batches():
+    vectorizer.partial_fit(texts[~is_val])
+    room = VAL_MAX_ROWS - sum(len(v) for v in val_texts)
+    if room > 0:
+        val_texts.append(texts[is_val][:room])
+        val_y.append(y[is_val][:room])
+    rows += len(texts)
+    peak_rss = max(peak_rss, memory_usage().get("rss", 0.0))
+idf_seconds = time.perf_counter() - t0
+val_texts = np.concatenate(val_texts) if val_texts else np.empty(0, dtype=object)
+val_y = np.concatenate(val_y) if val_y else np.empty(0, dtype=np.int64)
+print(f"Pass 1: {rows} rows, {vectorizer.n_docs_} train docs, {len(val_texts)} validation rows "
+      f"({rows / idf_seconds:,.0f} rows/s)")
+
+# === Pass 2: incremental training ===
+models = {}
+if "naive_bayes" in MODELS:
+    models["naive_bayes"] = MultinomialNB()
+if "svm" in MODELS:
+    models["svm"] = SGDClassifier(**SGD_PARAMS)
+train_seconds = {name: 0.0 for name in models}
+vectorize_seconds = 0.0
+train_rows = 0
+
+for epoch in range(EPOCHS):
+    active = {n: m for n, m in models.items() if n != "naive_bayes" or epoch == 0}
+    if not active:
+        break
+    for texts, y, is_val in batches():
+        t = time.perf_counter()
+        X = vectorizer.transform(texts[~is_val])
+        vectorize_seconds += time.perf_counter() - t
+        for name, model in active.items():
+            t = time.perf_counter()
+            model.partial_fit(X, y[~is_val], classes=classes_enc)
+            train_seconds[name] += time.perf_counter() - t
+        if epoch == 0:
+            train_rows += X.shape[0]
+        peak_rss = max(peak_rss, memory_usage().get("rss", 0.0))
+    print(f"Epoch {epoch + 1}/{EPOCHS} done")
+
+# === Eval + save ===
+Xv = vectorizer.transform(val_texts)
+for name, model in models.items():
+    report = classification_report(val_y, model.predict(Xv), labels=classes_enc,
+                                   target_names=le.classes_, output_dict=True, zero_division=0)
+    epochs = 1 if name == "naive_bayes" else EPOCHS
+    report["streaming"] = {
+        "rows": rows,
+        "train_rows": train_rows,
+        "validation_rows": int(len(val_texts)),
+        "epochs": epochs,
+        "idf_pass_rows_per_s": round(rows / idf_seconds, 1),
+        "train_rows_per_s": round(train_rows * epochs / (train_seconds[name] + vectorize_seconds / len(models)), 1),
+        "peak_rss_mb": peak_rss,
+    }
+
+    joblib.dump(model, os.path.join(OUT_DIR, f"{name}_model.joblib"))
+    vectorizer.save(OUT_DIR, name)
+    joblib.dump(le, os.path.join(OUT_DIR, f"{name}_label_encoder.joblib"))
+    config = {
+        "model": name,
+        "training": "streaming",
+        "vectorizer": "hashing",
+        "hashing_n_features": HASHING_N_FEATURES,
+        "ngram_range": list(NGRAM_RANGE),
+        "estimator_params": SGD_PARAMS if name == "svm" else {},
+        "batch_size": BATCH_SIZE,
+        "epochs": epochs,
+        "val_fraction": VAL_FRACTION,
+        "random_state": RANDOM_STATE,
+    }
+    with open(os.path.join(OUT_DIR, f"{name}_config.json"), "w", encoding="utf8") as f:
+        json.dump(config, f, indent=2)
+    with open(os.path.join(OUT_DIR, f"{name}_metrics.json"), "w", encoding="utf8") as f:
+        json.dump(report, f, indent=2)
+    print(f"{name}: macro F1 {report['macro avg']['f1-score']:.4f}, "
+          f"{report['streaming']['train_rows_per_s']:,.0f} rows/s")
+
+print("Streaming training complete. Artifacts saved to", OUT_DIR, f"(peak RSS {peak_rss} MB)")
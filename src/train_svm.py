@@ -10,13 +10,28 @@ from sklearn.svm import LinearSVC
 from sklearn.metrics import classification_report
 from sklearn.preprocessing import LabelEncoder
 
+try:
+    from src.compact_tfidf import export_vectorizer
+    from src.hashed_tfidf import HashedTfidfVectorizer
+    from src.processed_data import processed_path, load_processed
+    from src.parallel_tfidf import parallel_fit_transform, parallel_transform
+    from src.feature_store import build_features
+except ImportError:
+    from compact_tfidf import export_vectorizer
+    from hashed_tfidf import HashedTfidfVectorizer
+    from processed_data import processed_path, load_processed
+    from parallel_tfidf import parallel_fit_transform, parallel_transform
+    from feature_store import build_features
+
 # === Config ===
-DATA_PATH = os.path.join("data", "processed", "train_clean.csv")
-OUT_DIR = os.path.join("models")
+# train_clean.parquet (see processed_data.py) when present, otherwise train_clean.csv
+DATA_PATH = processed_path("train_clean")
+OUT_DIR = os.environ.get("MODELS_OUT_DIR", os.path.join("models"))
 os.makedirs(OUT_DIR, exist_ok=True)
 
 RANDOM_STATE = 42
-MAX_SAMPLES = 200_000
+# same sample for every trainer, so they share one feature_store entry (cache key = split texts)
+MAX_SAMPLES = int(os.environ.get("TRAIN_MAX_SAMPLES", 200_000)) or None  # 0 = use all
 TEST_SIZE = 0.1
 
 TFIDF_PARAMS = {
@@ -31,13 +46,29 @@ SVM_PARAMS = {
     "random_state": RANDOM_STATE,
 }
 
+# "tfidf": vocabulary-based TfidfVectorizer (default)
+# "hashing": feature hashing into HASHING_N_FEATURES columns + stored idf vector (no vocabulary)
+VECTORIZER = os.environ.get("VECTORIZER", "tfidf")
+HASHING_N_FEATURES = 2 ** 20
+
+# processes for TF-IDF tokenizing/counting (same vocabulary and matrix as n_jobs=1)
+N_JOBS = int(os.environ.get("TFIDF_N_JOBS", os.cpu_count() or 1))
+
+# reuse the n-gram counts of this split cached by feature_store.py (data/features), shared
+# with the other trainers; only max_features selection and idf weighting are redone here
+FEATURE_CACHE = os.environ.get("FEATURE_CACHE", "1") != "0"
+
+# also write the memory-mapped vocabulary/idf export (<model>_tfidf_*.npy + meta json)
+# that the serving registry loads instead of unpickling the vectorizer
+EXPORT_COMPACT_TFIDF = True
+
 MODEL_NAME = "svm"
 
 # === Load data ===
-df = pd.read_csv(DATA_PATH)
+# only text/sentiment are read; Parquet input is sampled by row group
+df = load_processed(DATA_PATH, columns=["text", "sentiment"], max_samples=MAX_SAMPLES,
+                    random_state=RANDOM_STATE)
 df = df.dropna(subset=['text', 'sentiment'])
-if MAX_SAMPLES and len(df) > MAX_SAMPLES:
-    df = df.sample(n=MAX_SAMPLES, random_state=RANDOM_STATE)
 
 X = df['text'].astype(str).values
 y = df['sentiment'].astype(str).values
@@ -52,9 +83,18 @@ X_train, X_val, y_train, y_val = train_test_split(
 )
 
 # === Vectorize ===
-tfidf = TfidfVectorizer(**TFIDF_PARAMS)
-Xtr = tfidf.fit_transform(X_train)
-Xv = tfidf.transform(X_val)
+if VECTORIZER == "hashing":
+    tfidf = HashedTfidfVectorizer(n_features=HASHING_N_FEATURES, ngram_range=TFIDF_PARAMS["ngram_range"])
+    Xtr = tfidf.fit_transform(X_train)
+    Xv = tfidf.transform(X_val)
+elif FEATURE_CACHE:
+    features = build_features(X_train, X_val, TFIDF_PARAMS, n_jobs=N_JOBS)
+    print("Feature cache", "hit:" if features.meta["cache_hit"] else "miss, built:", features.meta["key"])
+    tfidf, Xtr, Xv = features.tfidf(TFIDF_PARAMS)
+else:
+    tfidf = TfidfVectorizer(**TFIDF_PARAMS)
+    Xtr = parallel_fit_transform(tfidf, X_train, n_jobs=N_JOBS)
+    Xv = parallel_transform(tfidf, X_val, n_jobs=N_JOBS)
 
 # === Train SVM (LinearSVC) ===
 clf = LinearSVC(**SVM_PARAMS)
@@ -66,12 +106,19 @@ report = classification_report(y_val, y_pred, target_names=le.classes_, output_d
 
 # === Save artifacts ===
 joblib.dump(clf, os.path.join(OUT_DIR, f"{MODEL_NAME}_model.joblib"))
-joblib.dump(tfidf, os.path.join(OUT_DIR, f"{MODEL_NAME}_tfidf.joblib"))
+if VECTORIZER == "hashing":
+    tfidf.save(OUT_DIR, MODEL_NAME)
+else:
+    joblib.dump(tfidf, os.path.join(OUT_DIR, f"{MODEL_NAME}_tfidf.joblib"))
+    if EXPORT_COMPACT_TFIDF:
+        export_vectorizer(tfidf, OUT_DIR, MODEL_NAME)
 joblib.dump(le, os.path.join(OUT_DIR, f"{MODEL_NAME}_label_encoder.joblib"))
 
 config = {
     "model": MODEL_NAME,
+    "vectorizer": VECTORIZER,
     "tfidf_params": TFIDF_PARAMS,
+    "hashing_n_features": HASHING_N_FEATURES if VECTORIZER == "hashing" else None,
     "svm_params": SVM_PARAMS,
     "random_state": RANDOM_STATE,
     "max_samples": MAX_SAMPLES,
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from src.bulk_load import bulk_insert, bulk_transaction, SQLITE_STANDIN_SCHEMA
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}", future=True)
+    with engine.begin() as conn:
+        for ddl in SQLITE_STANDIN_SCHEMA:
+            conn.exec_driver_sql(ddl)
+    return engine
+
+
+def test_bulk_insert_numpy_columns_and_constants(engine):
+    rng = np.random.default_rng(0)
+    reviews = pd.DataFrame({
+        "user_id": rng.choice(np.arange(1, 6), size=2500),
+        "product_id": rng.choice(np.arange(1, 4), size=2500),
+        "title": "t",
+        "text": [f"review {i} with 'quotes', tabs\tand \\ backslashes" for i in range(2500)],
+        "language": "en",
+    })
+    with bulk_transaction(engine) as conn:
+        n = bulk_insert(conn, "Review", reviews, {"created_at": "CURRENT_TIMESTAMP"}, batch_size=1000)
+    assert n == 2500
+
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT user_id, product_id, text, created_at FROM Review ORDER BY id").fetchall()
+    assert len(rows) == 2500
+    assert [r[0] for r in rows] == reviews["user_id"].tolist()
+    assert rows[7][2] == reviews["text"][7]
+    assert all(r[3] is not None for r in rows)
+
+
+def test_bulk_transaction_rolls_back_and_restores_pragma(engine):
+    with engine.connect() as conn:
+        before = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+    with pytest.raises(RuntimeError):
+        with bulk_transaction(engine) as conn:
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 0
+            bulk_insert(conn, "User", pd.DataFrame({"username": ["a", "b"], "language": "en"}))
+            raise RuntimeError("abort")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM User").scalar() == 0
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == before
@@ -0,0 +1,68 @@
+import os
+import shutil
+import joblib
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.compact_tfidf import CompactTfidfVectorizer, export_vectorizer
+from src.model_registry import MODELS_DIR, ModelRegistry
+
+DOCS = [
+    "I love this product!! Works great, great great.",
+    "",
+    "Terrible. Été café naïve résumé",
+    "a b c",
+    "The the THE best best product ever",
+]
+
+
+def _assert_same_csr(a, b):
+    assert a.shape == b.shape
+    assert a.dtype == b.dtype
+    assert np.array_equal(a.indptr, b.indptr)
+    assert np.array_equal(a.indices, b.indices)
+    assert np.array_equal(a.data, b.data)
+
+
+@pytest.mark.parametrize("ngram_range", [(1, 1), (1, 2), (2, 2)])
+def test_transform_matches_tfidf_vectorizer(tmp_path, ngram_range):
+    vec = TfidfVectorizer(ngram_range=ngram_range).fit(DOCS * 3 + ["great product", "café résumé"])
+    compact = CompactTfidfVectorizer.from_vectorizer(vec)
+    compact.save(tmp_path, "toy")
+    loaded = CompactTfidfVectorizer.load(tmp_path, "toy", mmap=True)
+    queries = DOCS + ["unknown words only", "great " * 50]
+    _assert_same_csr(vec.transform(queries), loaded.transform(queries))
+
+
+def test_transform_matches_trained_svm_vectorizer():
+    vec = joblib.load(os.path.join(MODELS_DIR, "svm_tfidf.joblib"))
+    compact = CompactTfidfVectorizer.from_vectorizer(vec)
+    _assert_same_csr(vec.transform(DOCS), compact.transform(DOCS))
+
+
+def test_unsupported_settings_rejected():
+    vec = TfidfVectorizer(sublinear_tf=True).fit(DOCS)
+    with pytest.raises(ValueError):
+        CompactTfidfVectorizer.from_vectorizer(vec)
+
+
+def test_string_input_rejected():
+    vec = TfidfVectorizer().fit(DOCS)
+    with pytest.raises(ValueError):
+        CompactTfidfVectorizer.from_vectorizer(vec).transform("a single string")
+
+
+def test_registry_prefers_exported_vocabulary(tmp_path):
+    for name in ("svm_model.joblib", "svm_tfidf.joblib", "svm_label_encoder.joblib"):
+        shutil.copy(os.path.join(MODELS_DIR, name), tmp_path / name)
+    vec = joblib.load(tmp_path / "svm_tfidf.joblib")
+    export_vectorizer(vec, tmp_path, "svm")
+
+    loaded = ModelRegistry(tmp_path).get("svm")
+    assert isinstance(loaded.vectorizer, CompactTfidfVectorizer)
+    assert isinstance(loaded.vectorizer.terms, np.memmap)
+    _assert_same_csr(vec.transform(DOCS), loaded.vectorizer.transform(DOCS))
+
+    fallback = ModelRegistry(tmp_path, prefer_compact=False).get("svm")
+    assert not isinstance(fallback.vectorizer, CompactTfidfVectorizer)
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.pool import QueuePool
+
+from src import db
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(db, "DB_REPLICA_URL", None)
+    monkeypatch.setattr(db, "_engines", {})
+    monkeypatch.setattr(db, "_reflected", {})
+    db.init_db()
+    yield db.get_engine()
+    db.get_engine().dispose()
+
+
+def _count(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(db.Review.__table__)).scalar()
+
+
+def test_session_scope_commits_and_rolls_back(sqlite_db):
+    with db.session_scope() as session:
+        session.add(db.Review(product_id="p1", user_id="u1", rating=5.0, review_text="great"))
+    assert _count(sqlite_db) == 1
+
+    with pytest.raises(ValueError):
+        with db.session_scope() as session:
+            session.add(db.Review(product_id="p2", user_id="u2", rating=1.0, review_text="bad"))
+            session.flush()
+            raise ValueError("abort")
+    assert _count(sqlite_db) == 1
+
+    with db.session_scope(readonly=True) as session:
+        session.add(db.Review(product_id="p3", user_id="u3", rating=3.0, review_text="meh"))
+        session.flush()
+    assert _count(sqlite_db) == 1
+
+
+def test_engine_is_shared_and_replica_falls_back(sqlite_db):
+    assert db.engine is db.get_engine() is db.get_engine(readonly=True)
+    assert sqlite_db is db.get_engine()
+
+
+def test_reflection_runs_once(sqlite_db, monkeypatch):
+    calls = []
+    reflect = db.MetaData.reflect
+    monkeypatch.setattr(db.MetaData, "reflect", lambda self, **kw: calls.append(1) or reflect(self, **kw))
+    assert "reviews" in db.reflected_metadata().tables
+    assert db.reflected_table("products").c.keys() == ["id", "title", "category", "price"]
+    assert len(calls) == 1
+    db.reflected_metadata(refresh=True)
+    assert len(calls) == 2
+
+
+def test_pool_settings_and_overrides(tmp_path):
+    engine = db.create_pooled_engine(f"sqlite:///{tmp_path / 'pool.db'}",
+                                     poolclass=QueuePool, pool_size=3, max_overflow=1)
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 1
+    assert engine.pool._pre_ping is db.POOL_PRE_PING
+    assert engine.pool._recycle == db.POOL_RECYCLE
+    engine.dispose()
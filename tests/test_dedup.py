@@ -0,0 +1,66 @@
+import numpy as np
+
+from src.dedup import Deduplicator, HashSet64, MinHashLSH, text_hashes
+
+
+def test_hash_set_membership_across_runs():
+    s = HashSet64()
+    rng = np.random.RandomState(0)
+    values = rng.randint(0, 2 ** 62, size=5000, dtype=np.int64).astype(np.uint64) * np.uint64(2)
+    for part in np.array_split(values, 37):
+        s.add(part)
+    assert len(s) == len(np.unique(values))
+    assert s.contains(values).all()
+    assert not s.contains(values + np.uint64(1)).any()
+    assert s.first_seen(np.array([values[0], 7, 7, 9], dtype=np.uint64)).tolist() == [False, True, False, True]
+
+
+def test_text_hashes_are_stable():
+    assert text_hashes(["a", "b", "a"])[0] == text_hashes(["a"])[0]
+    assert text_hashes(["a"])[0] != text_hashes(["b"])[0]
+
+
+def test_exact_dedup_across_chunks_and_resume(tmp_path):
+    d = Deduplicator()
+    keep1, keys1 = d.filter(["good", "bad", "good"])
+    keep2, keys2 = d.filter(["bad", "new"])
+    assert keep1.tolist() == [True, True, False]
+    assert keep2.tolist() == [False, True]
+    assert d.report() == {"rows_seen": 5, "exact_dropped": 2, "near_dropped": 0}
+
+    path = str(tmp_path / "keys.bin")
+    d.append_keys(path, keys1)
+    d.append_keys(path, keys2)
+    restored = Deduplicator()
+    restored.load_keys(path, n_rows=2)  # only the first chunk was committed
+    assert restored.filter(["good", "new"])[0].tolist() == [False, True]
+
+
+def test_near_duplicates_are_dropped():
+    base = "the battery lasts all day and the screen is bright and sharp even outside in the sun"
+    d = Deduplicator(near_duplicates=True)
+    keep, keys = d.filter([base, base + " !", "terrible product it broke after two days and support never answered"])
+    assert keep.tolist() == [True, False, True]
+    assert keys.shape == (2, 1 + 8)
+    assert d.near_dropped == 1
+
+
+def test_minhash_band_keys_are_deterministic():
+    texts = ["one two three four", "five six seven eight"]
+    a, b = MinHashLSH(seed=1).band_keys(texts), MinHashLSH(seed=1).band_keys(texts)
+    assert a.shape == (2, 8) and (a == b).all()
+
+
+def test_all_duplicate_chunk_with_near_duplicates(tmp_path):
+    d = Deduplicator(near_duplicates=True)
+    _, keys1 = d.filter(["hello world foo bar", "another text here ok"])
+    keep, keys2 = d.filter(["hello world foo bar"])
+    assert keep.tolist() == [False]
+    assert keys2.shape == (0, d.width) and keys2.dtype == np.uint64
+
+    path = str(tmp_path / "keys.bin")
+    d.append_keys(path, keys1)
+    d.append_keys(path, keys2)
+    restored = Deduplicator(near_duplicates=True)
+    restored.load_keys(path, n_rows=2)
+    assert restored.filter(["another text here ok"])[0].tolist() == [False]
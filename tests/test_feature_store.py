@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.feature_store import build_features, cache_key
+
+WORDS = "great terrible okay love hate broke works cheap price quality fast slow the and it".split()
+
+
+def _docs(n, seed=0):
+    rng = np.random.RandomState(seed)
+    return [" ".join(rng.choice(WORDS, size=rng.randint(1, 12))) for _ in range(n)]
+
+
+TRAIN, VAL = _docs(300), _docs(40, seed=1)
+
+
+@pytest.mark.parametrize("params", [
+    {"max_features": 40, "ngram_range": (1, 2)},
+    {"max_features": 10, "ngram_range": (1, 2), "min_df": 2, "sublinear_tf": True},
+    {"ngram_range": (1, 2), "max_df": 0.3, "binary": True},
+])
+def test_tfidf_from_cached_counts_matches_fresh_fit(tmp_path, params):
+    build_features(TRAIN, VAL, params, cache_dir=tmp_path)  # populate the cache
+    features = build_features(TRAIN, VAL, params, cache_dir=tmp_path)
+    assert features.meta["cache_hit"]
+    vec, Xtr, Xv = features.tfidf(params)
+
+    ref = TfidfVectorizer(**params)
+    Xtr_ref = ref.fit_transform(TRAIN)
+    assert vec.vocabulary_ == ref.vocabulary_
+    assert np.array_equal(vec.idf_, ref.idf_)
+    assert np.allclose(Xtr.toarray(), Xtr_ref.toarray())
+    assert np.allclose(Xv.toarray(), ref.transform(VAL).toarray())
+    # the derived vectorizer is a regular fitted TfidfVectorizer
+    assert np.allclose(vec.transform(VAL).toarray(), Xv.toarray())
+
+
+def test_one_entry_serves_different_max_features(tmp_path):
+    first = build_features(TRAIN, VAL, {"max_features": 50, "ngram_range": (1, 2)}, cache_dir=tmp_path)
+    second = build_features(TRAIN, VAL, {"max_features": 5, "ngram_range": (1, 2)}, cache_dir=tmp_path)
+    assert not first.meta["cache_hit"] and second.meta["cache_hit"]
+    assert len(second.tfidf({"max_features": 5, "ngram_range": (1, 2)})[0].vocabulary_) == 5
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+
+def test_key_changes_with_data_and_tokenizer():
+    base = cache_key(TRAIN, VAL, {"ngram_range": (1, 2)})
+    assert base == cache_key(TRAIN, VAL, {"ngram_range": (1, 2), "max_features": 7})
+    assert base != cache_key(TRAIN[:-1], VAL, {"ngram_range": (1, 2)})
+    assert base != cache_key(TRAIN, VAL, {"ngram_range": (1, 1)})
+    assert base != cache_key(TRAIN, VAL, {"ngram_range": (1, 2), "lowercase": False})
+
+
+def test_tokenizer_mismatch_is_rejected(tmp_path):
+    features = build_features(TRAIN, VAL, {"ngram_range": (1, 2)}, cache_dir=tmp_path)
+    with pytest.raises(ValueError):
+        features.tfidf({"ngram_range": (1, 1)})
+
+
+def test_derived_vectorizer_uses_public_vocabulary_param(tmp_path):
+    params = {"max_features": 8, "ngram_range": (1, 2)}
+    vec, _, _ = build_features(TRAIN, VAL, params, cache_dir=tmp_path).tfidf(params)
+    assert vec.get_params()["vocabulary"] == vec.vocabulary_
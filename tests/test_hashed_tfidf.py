@@ -0,0 +1,47 @@
+import json
+import joblib
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+from sklearn.svm import LinearSVC
+
+from src.hashed_tfidf import HashedTfidfVectorizer
+from src.model_registry import ModelRegistry
+
+DOCS = ["great product love it", "terrible waste of money", "it is okay", "love love love", "awful broke"]
+LABELS = ["positive", "negative", "neutral", "positive", "negative"]
+
+
+def test_save_load_roundtrip(tmp_path):
+    vec = HashedTfidfVectorizer(n_features=2 ** 12)
+    X = vec.fit_transform(DOCS)
+    assert X.shape == (len(DOCS), 2 ** 12)
+    assert (X.data > 0).all()
+    vec.save(tmp_path, "svm")
+    loaded = HashedTfidfVectorizer.load(tmp_path, "svm")
+    assert loaded.n_features == 2 ** 12
+    assert np.allclose(loaded.transform(DOCS).toarray(), X.toarray())
+
+
+def test_registry_serves_hashing_model_without_vocabulary(tmp_path):
+    vec = HashedTfidfVectorizer(n_features=2 ** 12)
+    le = LabelEncoder()
+    y = le.fit_transform(LABELS)
+    clf = LinearSVC().fit(vec.fit_transform(DOCS), y)
+    vec.save(tmp_path, "svm")
+    joblib.dump(clf, tmp_path / "svm_model.joblib")
+    joblib.dump(le, tmp_path / "svm_label_encoder.joblib")
+    (tmp_path / "svm_config.json").write_text(json.dumps({"model": "svm", "vectorizer": "hashing"}))
+
+    loaded = ModelRegistry(tmp_path).get("svm")
+    assert isinstance(loaded.vectorizer, HashedTfidfVectorizer)
+    pred = loaded.labels[loaded.model.predict(loaded.vectorizer.transform(DOCS))]
+    assert list(pred) == LABELS
+
+
+def test_partial_fit_matches_fit():
+    full = HashedTfidfVectorizer(n_features=2 ** 12).fit(DOCS)
+    streamed = HashedTfidfVectorizer(n_features=2 ** 12)
+    for start in range(0, len(DOCS), 2):
+        streamed.partial_fit(DOCS[start:start + 2])
+    assert streamed.n_docs_ == len(DOCS)
+    assert np.allclose(streamed.idf_, full.idf_)
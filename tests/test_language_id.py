@@ -0,0 +1,27 @@
+from src.language_id import LanguageIdentifier, quick_english
+
+
+def test_quick_english_only_accepts_confident_english():
+    assert quick_english("This is the best blender I have ever owned and it was worth every penny.")
+    assert not quick_english("Great product!")  # too short, left to the full detector
+    assert not quick_english("Das war ein Fehler, ich will mein Geld zurück, die Qualität ist in Ordnung.")
+    assert not quick_english("No me gusta nada, la calidad es mala y no lo recomiendo a nadie.")
+
+
+def test_identifier_short_circuits_and_memoizes():
+    calls = []
+
+    def detector(text):
+        calls.append(text)
+        return "de"
+
+    lid = LanguageIdentifier(detector=detector)
+    texts = [
+        "Sehr gutes Produkt, schnelle Lieferung",
+        "It works fine and I would buy it again from this seller.",
+        "",
+        "Sehr gutes Produkt, schnelle Lieferung",
+    ]
+    assert lid.detect_batch(texts) == ["de", "en", "unknown", "de"]
+    assert calls == ["Sehr gutes Produkt, schnelle Lieferung"]
+    assert lid.stats == {"cached": 1, "prefiltered": 1, "detected": 1}
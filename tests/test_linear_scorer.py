@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import LinearSVC
+
+from src.linear_scorer import LinearScorer
+from src.model_registry import ModelRegistry, MODELS_DIR
+
+DOCS = [
+    "great product love it", "terrible waste of money", "it is okay I guess",
+    "love love love", "awful broke in a day", "fine for the price", "best purchase ever",
+    "worst customer service", "average quality, nothing special",
+]
+LABELS = [2, 0, 1, 2, 0, 1, 2, 0, 1]
+
+
+@pytest.mark.parametrize("model", [LinearSVC(), MultinomialNB(), SGDClassifier(random_state=0)])
+def test_same_predictions_as_sklearn(model):
+    vec = TfidfVectorizer(ngram_range=(1, 2)).fit(DOCS)
+    X = vec.transform(DOCS)
+    model.fit(X, LABELS)
+    scorer = LinearScorer.from_estimator(model)
+    assert np.array_equal(scorer.predict(X), model.predict(X))
+    for i in range(X.shape[0]):
+        assert scorer.predict(X[i])[0] == model.predict(X[i])[0]
+
+
+def test_binary_model():
+    vec = TfidfVectorizer().fit(DOCS)
+    X = vec.transform(DOCS)
+    y = [1 if label == 2 else 0 for label in LABELS]
+    model = LinearSVC().fit(X, y)
+    assert np.array_equal(LinearScorer.from_estimator(model).predict(X), model.predict(X))
+
+
+def test_trained_svm_matches_predict():
+    loaded = ModelRegistry(MODELS_DIR).get("svm")
+    texts = DOCS + ["This product arrived quickly and the battery life is excellent."]
+    X = loaded.vectorizer.transform(texts)
+    assert loaded.scorer is not None
+    assert np.array_equal(loaded.predict_encoded(X), loaded.model.predict(X))
+
+
+def test_unsupported_estimator():
+    with pytest.raises(TypeError):
+        LinearScorer.from_estimator(object())
@@ -0,0 +1,89 @@
+import threading
+import pytest
+
+from src.lstm_batcher import MicroBatcher, process_batcher
+
+
+def test_results_are_routed_to_each_caller():
+    calls = []
+
+    def predict_fn(texts):
+        calls.append(len(texts))
+        return [t.upper() for t in texts]
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=8, max_delay_ms=50)
+    texts = [f"review {i}" for i in range(20)]
+    futures = [batcher.submit(t) for t in texts]
+    assert [f.result(timeout=5) for f in futures] == [t.upper() for t in texts]
+    batcher.close()
+    assert sum(calls) == 20
+    assert max(calls) <= 8
+    assert len(calls) < 20
+
+
+def test_concurrent_callers_share_batches():
+    sizes = []
+    barrier = threading.Barrier(16)
+
+    def predict_fn(texts):
+        sizes.append(len(texts))
+        return list(range(len(texts)))
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=16, max_delay_ms=200)
+    results = []
+
+    def client():
+        barrier.wait()
+        results.append(batcher.predict("text", timeout=5))
+
+    threads = [threading.Thread(target=client) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+    assert len(results) == 16
+    assert len(sizes) < 16
+
+
+def test_errors_propagate_to_every_caller():
+    def predict_fn(texts):
+        raise FileNotFoundError("lstm_model.h5")
+
+    batcher = MicroBatcher(predict_fn, max_delay_ms=1)
+    with pytest.raises(FileNotFoundError):
+        batcher.predict("text", timeout=5)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit("text")
+
+
+def test_short_results_and_base_exceptions_fail_the_batch_not_the_worker():
+    replies = iter([["only one"], KeyboardInterrupt(), ["ok"]])
+
+    def predict_fn(texts):
+        reply = next(replies)
+        if isinstance(reply, BaseException):
+            raise reply
+        return reply
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=2, max_delay_ms=200)
+    futures = [batcher.submit("a"), batcher.submit("b")]
+    for future in futures:
+        with pytest.raises(ValueError, match="1 results for 2 texts"):
+            future.result(timeout=5)
+    with pytest.raises(KeyboardInterrupt):
+        batcher.predict("c", timeout=5)
+    assert batcher.predict("d", timeout=5) == "ok"
+    batcher.close()
+
+
+def test_process_batcher_is_shared_and_recreated_after_fork(monkeypatch):
+    get = process_batcher(lambda texts: texts, max_delay_ms=1)
+    first = get()
+    assert get() is first and first.predict("x", timeout=5) == "x"
+    monkeypatch.setattr(first, "pid", -1)  # as seen from a forked child
+    second = get()
+    assert second is not first and second.predict("y", timeout=5) == "y"
+    first.close()
+    second.close()
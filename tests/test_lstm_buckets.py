@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from src.model_registry import LoadedModel, pad_int_sequences
+
+
+class WordTokenizer:
+    """Minimal stand-in for the keras Tokenizer used by train_lstm.py."""
+
+    def __init__(self, words):
+        self.word_index = {w: i + 1 for i, w in enumerate(words)}
+
+    def texts_to_sequences(self, texts):
+        return [[self.word_index[w] for w in t.split() if w in self.word_index] for t in texts]
+
+
+def _label_enc():
+    return LabelEncoder().fit(["negative", "neutral", "positive"])
+
+
+def test_pad_int_sequences_matches_keras_semantics():
+    seqs = [[1, 2, 3], [], [4, 5, 6, 7, 8]]
+    post = pad_int_sequences(seqs, 4, padding="post", truncating="post")
+    assert post.tolist() == [[1, 2, 3, 0], [0, 0, 0, 0], [4, 5, 6, 7]]
+    pre = pad_int_sequences(seqs, 4, padding="pre", truncating="pre")
+    assert pre.tolist() == [[0, 1, 2, 3], [0, 0, 0, 0], [5, 6, 7, 8]]
+
+
+def test_bucket_selection():
+    loaded = LoadedModel("lstm", model=None, label_enc=_label_enc(), tokenizer=WordTokenizer([]),
+                         config={"max_len": 200, "mask_zero": True})
+    assert loaded.length_buckets == [32, 64, 128, 200]
+    assert loaded.bucket_for(0) == 32
+    assert loaded.bucket_for(33) == 64
+    assert loaded.bucket_for(500) == 200
+    unmasked = LoadedModel("lstm", model=None, label_enc=_label_enc(), config={"max_len": 100})
+    assert not unmasked.bucketed
+
+
+def test_bucketed_predictions_match_full_padding():
+    tf = pytest.importorskip("tensorflow")
+    words = [f"w{i}" for i in range(30)]
+    model = tf.keras.Sequential([
+        tf.keras.layers.Embedding(len(words) + 1, 8, mask_zero=True),
+        tf.keras.layers.Bidirectional(tf.keras.layers.LSTM(4)),
+        tf.keras.layers.Dense(3, activation="softmax"),
+    ])
+    loaded = LoadedModel("lstm", model=model, label_enc=_label_enc(), tokenizer=WordTokenizer(words),
+                         config={"max_len": 16, "mask_zero": True, "length_buckets": [4, 8]})
+    rng = np.random.RandomState(0)
+    texts = [" ".join(rng.choice(words, size=n)) for n in (1, 3, 5, 9, 20, 2)]
+
+    bucketed = loaded.predict_proba(texts)
+    full = np.asarray(model(loaded.pad(texts), training=False))
+    assert bucketed.shape == (len(texts), 3)
+    assert np.allclose(bucketed, full, atol=1e-5)
+    assert sorted(loaded._graphs) == [4, 8, 16]
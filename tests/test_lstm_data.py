@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+tf = pytest.importorskip("tensorflow")
+from tensorflow.keras.preprocessing.text import Tokenizer
+
+from src.lstm_data import text_vectorizer, token_dataset, processed_texts
+
+TRAIN = [
+    "Great product, works GREAT!!", "terrible... broke after a week", "it's okay i guess",
+    "love love love it", "don't buy: waste of money", "Über gut, sehr schön",
+]
+TEST = TRAIN + ["new words never seen", "double  spaces\tand\ttabs\nnewline", "", "ÜBER GUT"]
+
+
+def test_text_vectorizer_matches_tokenizer_ids():
+    tokenizer = Tokenizer(num_words=12, oov_token="<OOV>")
+    tokenizer.fit_on_texts(TRAIN)
+    ids = text_vectorizer(tokenizer)(tf.constant(TEST)).to_list()
+    assert ids == tokenizer.texts_to_sequences(TEST)
+
+
+def test_token_dataset_buckets_every_example():
+    tokenizer = Tokenizer(oov_token="<OOV>")
+    tokenizer.fit_on_texts(TRAIN)
+    texts = [" ".join(["love"] * n) for n in range(1, 40)]
+    labels = np.arange(len(texts), dtype=np.int32)
+    ds = token_dataset(tf.data.Dataset.from_tensor_slices((texts, labels)), text_vectorizer(tokenizer),
+                       max_len=20, batch_size=4, length_buckets=[8, 20], shuffle_buffer=10)
+    seen = []
+    for xb, yb in ds:
+        assert xb.shape[1] in (8, 20)
+        lengths = np.count_nonzero(xb.numpy(), axis=1)
+        assert (lengths == np.minimum(yb.numpy() + 1, 20)).all()
+        seen.extend(yb.numpy().tolist())
+    assert sorted(seen) == labels.tolist()
+
+
+def test_processed_texts_split_is_disjoint(tmp_path):
+    path = tmp_path / "train_clean.csv"
+    texts = [f"review number {i}" for i in range(300)]
+    pd.DataFrame({"text": texts, "sentiment": ["positive", "negative", "neutral"] * 100}).to_csv(path, index=False)
+    le = LabelEncoder().fit(["negative", "neutral", "positive"])
+
+    def rows(validation):
+        ds = processed_texts(str(path), le, 0.2, validation=validation, batch_size=64)
+        return [t.decode() for t, _ in ds.as_numpy_iterator()]
+
+    train, val = rows(False), rows(True)
+    assert sorted(train + val) == sorted(texts)
+    assert 20 < len(val) < 100
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from src.lstm_numpy import JsonTokenizer, NumpyLSTM, export_lstm, NUMPY_MODEL_FILE, TOKENIZER_JSON_FILE
+
+
+def _keras_model(tf, vocab, mask_zero=True):
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.layers.Embedding(vocab, 8, mask_zero=mask_zero),
+        tf.keras.layers.Bidirectional(tf.keras.layers.LSTM(6)),
+        tf.keras.layers.Dropout(0.5),
+        tf.keras.layers.Dense(5, activation="relu"),
+        tf.keras.layers.Dense(3, activation="softmax"),
+    ])
+    model.build((None, 12))
+    return model
+
+
+def test_json_tokenizer_matches_keras_tokenizer(tmp_path):
+    pytest.importorskip("tensorflow")
+    from tensorflow.keras.preprocessing.text import Tokenizer
+
+    corpus = ["Great product, works great!", "terrible... broke after 2 days", "ok\tfor the PRICE"]
+    for kwargs in ({}, {"num_words": 5}, {"num_words": 5, "oov_token": "<OOV>"}):
+        tokenizer = Tokenizer(**kwargs)
+        tokenizer.fit_on_texts(corpus)
+        restored = JsonTokenizer(tokenizer.word_index, num_words=tokenizer.num_words,
+                                 oov_token=tokenizer.oov_token, filters=tokenizer.filters)
+        texts = corpus + ["unseen words, great days", ""]
+        assert restored.texts_to_sequences(texts) == tokenizer.texts_to_sequences(texts)
+
+
+@pytest.mark.parametrize("quantize,atol", [(None, 1e-5), ("float16", 1e-2), ("int8", 5e-2)])
+def test_numpy_backend_matches_keras(tmp_path, quantize, atol):
+    tf = pytest.importorskip("tensorflow")
+    from tensorflow.keras.preprocessing.text import Tokenizer
+
+    words = [f"w{i}" for i in range(40)]
+    tokenizer = Tokenizer()
+    tokenizer.fit_on_texts([" ".join(words)])
+    model = _keras_model(tf, len(words) + 1)
+    export_lstm(model, tokenizer, tmp_path, quantize=quantize)
+    assert (tmp_path / NUMPY_MODEL_FILE).exists() and (tmp_path / TOKENIZER_JSON_FILE).exists()
+
+    rng = np.random.RandomState(0)
+    x = rng.randint(1, len(words) + 1, size=(16, 12))
+    x[::2, 7:] = 0  # post-padding, masked
+    x[1::4, :5] = 0  # pre-padding, masked
+    expected = np.asarray(model(x, training=False))
+    got = NumpyLSTM.load(tmp_path / NUMPY_MODEL_FILE)(x)
+    assert got.shape == expected.shape
+    assert np.allclose(got, expected, atol=atol)
+
+
+def test_registry_serves_numpy_export_without_keras_model(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    import joblib
+    from tensorflow.keras.preprocessing.text import Tokenizer
+    from src.model_registry import ModelRegistry
+
+    tokenizer = Tokenizer()
+    tokenizer.fit_on_texts(["good great fine bad awful okay"])
+    model = _keras_model(tf, 7)
+    export_lstm(model, tokenizer, tmp_path)
+    joblib.dump(LabelEncoder().fit(["negative", "neutral", "positive"]), tmp_path / "lstm_label_encoder.joblib")
+
+    # only the NumPy export is on disk, so the keras backend must fail and auto must pick numpy
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry(tmp_path, lstm_backend="keras").get("lstm")
+    loaded = ModelRegistry(tmp_path).get("lstm")
+    assert loaded.backend == "numpy"
+    texts = ["good great", "awful bad bad okay"]
+    expected = np.asarray(model(loaded.pad(texts), training=False))
+    assert np.allclose(loaded.predict_proba(texts), expected, atol=1e-5)
@@ -0,0 +1,115 @@
+import gc
+import os
+import sys
+import time
+import threading
+import numpy as np
+import pytest
+
+from src.compact_tfidf import CompactTfidfVectorizer
+from src.model_registry import ModelRegistry, MODELS_DIR, get_registry
+
+
+def test_models_are_loaded_lazily():
+    reg = ModelRegistry(MODELS_DIR)
+    assert not reg.is_loaded("svm")
+    loaded = reg.get("svm")
+    assert reg.is_loaded("svm")
+    assert not reg.is_loaded("lstm")
+    assert reg.get("SVM") is loaded
+    assert list(loaded.labels) == ["negative", "neutral", "positive"]
+
+
+def test_concurrent_first_use_loads_once(monkeypatch):
+    reg = ModelRegistry(MODELS_DIR)
+    calls = []
+
+    def slow_load(name):
+        calls.append(name)
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(reg, "_load", slow_load)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reg.get("nb"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["nb"]
+    assert all(r is results[0] for r in results)
+
+
+def test_warmup_and_unload(tmp_path):
+    reg = ModelRegistry(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        reg.warmup(["svm"])
+    assert reg.warmup(ignore_missing=True) == []
+
+    reg = ModelRegistry(MODELS_DIR)
+    assert "svm" in reg.warmup(["svm"])
+    reg.unload(["svm"])
+    assert not reg.is_loaded("svm")
+
+
+def test_unknown_model_name():
+    with pytest.raises(ValueError):
+        ModelRegistry(MODELS_DIR).get("bert")
+
+
+def test_get_registry_is_shared_per_directory(tmp_path):
+    assert get_registry() is get_registry(MODELS_DIR)
+    assert get_registry(tmp_path) is not get_registry(MODELS_DIR)
+
+
+def test_tfidf_models_do_not_import_tensorflow():
+    if "tensorflow" in sys.modules:
+        pytest.skip("tensorflow already imported by another test")
+    ModelRegistry(MODELS_DIR).get("svm")
+    assert "tensorflow" not in sys.modules
+
+
+def test_share_for_fork_keeps_predictions(tmp_path):
+    texts = ["I love this product!", "Terrible experience.", "It is okay."]
+    plain = ModelRegistry(MODELS_DIR).get("svm")
+    expected = plain.model.predict(plain.vectorizer.transform(texts))
+
+    reg = ModelRegistry(MODELS_DIR)
+    try:
+        assert reg.share_for_fork(["svm"], shared_dir=tmp_path) == ["svm"]
+    finally:
+        gc.unfreeze()
+    shared = reg.get("svm")
+    assert isinstance(shared.vectorizer, CompactTfidfVectorizer)
+    assert isinstance(shared.model.coef_, np.memmap)
+    assert np.array_equal(shared.model.predict(shared.vectorizer.transform(texts)), expected)
+
+
+def test_share_for_fork_never_rewrites_mapped_files(tmp_path):
+    stale = tmp_path / "pid999999999-old"
+    stale.mkdir()
+    reg = ModelRegistry(MODELS_DIR)
+    try:
+        reg.share_for_fork(["svm"], shared_dir=tmp_path)
+        first_dir, first_coef = reg.shared_dir, reg.get("svm").model.coef_
+        reg.share_for_fork(["svm"], shared_dir=tmp_path)
+    finally:
+        gc.unfreeze()
+    assert reg.shared_dir != first_dir and os.path.dirname(reg.shared_dir) == str(tmp_path)
+    assert os.path.isdir(first_dir)  # still mapped by this master: kept
+    assert not stale.exists()        # its master is gone: removed
+    assert np.array_equal(first_coef, reg.get("svm").model.coef_)
+
+
+def test_share_for_fork_skips_the_keras_lstm(tmp_path, caplog):
+    (tmp_path / "lstm_model.h5").write_bytes(b"not loaded")  # trained before the NumPy export
+    reg = ModelRegistry(tmp_path, lstm_backend="auto")
+    assert reg.lstm_backend_to_load() == "keras"
+    had_tf = "tensorflow" in sys.modules
+    try:
+        assert reg.share_for_fork(["lstm"], shared_dir=tmp_path / "shared") == []
+    finally:
+        gc.unfreeze()
+    assert not reg.is_loaded("lstm")
+    assert ("tensorflow" in sys.modules) == had_tf
+    assert "not fork-safe" in caplog.text
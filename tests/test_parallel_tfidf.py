@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+from src import parallel_tfidf
+from src.hashed_tfidf import HashedTfidfVectorizer
+from src.parallel_tfidf import parallel_fit_transform, parallel_transform
+
+WORDS = "great terrible okay love hate broke works cheap price quality fast slow the and it".split()
+
+
+def _docs(n, seed=0):
+    rng = np.random.RandomState(seed)
+    return [" ".join(rng.choice(WORDS, size=rng.randint(1, 12))) for _ in range(n)]
+
+
+def _assert_identical(a, b):
+    assert a.shape == b.shape
+    assert a.dtype == b.dtype
+    for attr in ("data", "indices", "indptr"):
+        assert np.array_equal(getattr(a, attr), getattr(b, attr))
+
+
+def _assert_equivalent(a, b):
+    # same entries; the per-row summation order of the l2 norm may differ in the last bit
+    a, b = a.copy(), b.copy()
+    a.sort_indices()
+    b.sort_indices()
+    assert a.shape == b.shape
+    assert a.dtype == b.dtype
+    assert np.array_equal(a.indices, b.indices)
+    assert np.array_equal(a.indptr, b.indptr)
+    np.testing.assert_allclose(a.data, b.data, rtol=1e-12)
+
+
+@pytest.mark.parametrize("params", [
+    {"max_features": 30, "ngram_range": (1, 2)},
+    {"min_df": 3, "max_df": 0.5},
+    {"ngram_range": (1, 3), "stop_words": "english", "sublinear_tf": True},
+])
+def test_parallel_fit_transform_matches_sequential(monkeypatch, params):
+    monkeypatch.setattr(parallel_tfidf, "MIN_DOCS_PER_JOB", 10)
+    docs = _docs(200)
+    reference = TfidfVectorizer(**params)
+    X_ref = reference.fit_transform(docs)
+
+    vec = TfidfVectorizer(**params)
+    X = parallel_fit_transform(vec, docs, n_jobs=3)
+    assert vec.vocabulary_ == reference.vocabulary_
+    assert np.array_equal(vec.idf_, reference.idf_)
+    _assert_equivalent(X, X_ref)
+    assert vec.get_params()["vocabulary"] == vec.vocabulary_
+
+    new_docs = _docs(50, seed=1)
+    _assert_identical(parallel_transform(vec, new_docs, n_jobs=2), reference.transform(new_docs))
+
+
+def test_small_inputs_and_hashing_fall_back_to_sequential():
+    docs = _docs(20)
+    vec = TfidfVectorizer()
+    _assert_identical(parallel_fit_transform(vec, docs, n_jobs=4), TfidfVectorizer().fit_transform(docs))
+
+    hashed = HashedTfidfVectorizer(n_features=2 ** 10)
+    X = parallel_fit_transform(hashed, docs, n_jobs=4)
+    assert X.shape == (len(docs), 2 ** 10)
+
+
+def test_max_features_ties_and_count_vectorizer_match_sklearn(monkeypatch):
+    monkeypatch.setattr(parallel_tfidf, "MIN_DOCS_PER_JOB", 10)
+    # every term occurs equally often: max_features is decided by sklearn's tie order alone
+    docs = [" ".join(WORDS)] * 40
+    for n in (3, 7):
+        vec = CountVectorizer(max_features=n)
+        X = parallel_fit_transform(vec, docs, n_jobs=2)
+        reference = CountVectorizer(max_features=n)
+        _assert_equivalent(X, reference.fit_transform(docs))
+        assert vec.vocabulary_ == reference.vocabulary_
+
+
+def test_pruning_errors_match_sklearn(monkeypatch):
+    monkeypatch.setattr(parallel_tfidf, "MIN_DOCS_PER_JOB", 10)
+    docs = _docs(40)
+    with pytest.raises(ValueError, match="no terms remain"):
+        parallel_fit_transform(TfidfVectorizer(min_df=35), docs, n_jobs=2)
+    with pytest.raises(ValueError, match="empty vocabulary"):
+        parallel_fit_transform(TfidfVectorizer(stop_words=["the", "and", "it"]), ["the and it"] * 40, n_jobs=2)
@@ -0,0 +1,35 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.recommender import positive_mask, _is_positive_value
+
+# Row counts benchmarked; 10M takes ~30s for the row-wise baseline alone, so it is opt-in:
+#   PERF_NORMALIZE_ROWS=1000000,10000000 pytest -s tests/test_performance_recommender.py
+ROWS = [int(n) for n in os.getenv("PERF_NORMALIZE_ROWS", "1000000").split(",")]
+MIN_SPEEDUP = float(os.getenv("PERF_NORMALIZE_SPEEDUP", "5"))
+
+def sentiment_column(kind, n, seed=0):
+    rng = np.random.default_rng(seed)
+    if kind == "int":
+        return pd.Series(rng.integers(0, 2, n))
+    labels = np.array(["positive", "negative", "neutral"], dtype=object)
+    return pd.Series(labels[rng.integers(0, 3, n)])
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+@pytest.mark.parametrize("n", ROWS)
+@pytest.mark.parametrize("kind", ["int", "str"])
+def test_positive_mask_speedup(kind, n):
+    s = sentiment_column(kind, n)
+    expected, rowwise = timed(lambda: s.apply(_is_positive_value).to_numpy(dtype=bool))
+    mask, vectorized = timed(lambda: positive_mask(s))
+    assert (mask == expected).all()
+    speedup = rowwise / vectorized
+    print(f"\n{kind} {n:,} rows: apply {rowwise:.2f}s, positive_mask {vectorized * 1000:.1f}ms ({speedup:.0f}x)")
+    assert speedup >= MIN_SPEEDUP, f"positive_mask only {speedup:.1f}x faster than Series.apply"
@@ -0,0 +1,84 @@
+import os
+import shutil
+import time
+
+from src.model_registry import ModelRegistry, MODELS_DIR
+from src.prediction_cache import LRUCache, PredictionCache
+
+
+def test_lru_cache_evicts_least_recently_used_and_expires():
+    cache = LRUCache(max_size=2, ttl=None)
+    cache.set_many({"a": 1, "b": 2})
+    assert cache.get_many(["a"]) == {"a": 1}
+    cache.set_many({"c": 3})
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+    cache = LRUCache(max_size=10, ttl=0.01)
+    cache.set_many({"a": 1})
+    time.sleep(0.02)
+    assert cache.get_many(["a"]) == {}
+    assert len(cache) == 0
+
+
+def test_prediction_cache_normalizes_and_counts():
+    calls = []
+
+    def predict(texts):
+        calls.append(list(texts))
+        return [t.upper() for t in texts]
+
+    cache = PredictionCache(lambda name: "v1")
+    out = cache.predict(["great  product", " great product ", "bad"], "svm", predict)
+    assert out == ["GREAT PRODUCT", "GREAT PRODUCT", "BAD"]
+    assert calls == [["great product", "bad"]]
+    assert cache.predict(["bad"], "SVM", predict) == ["BAD"]
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5, "size": 2}
+
+
+def test_new_artifact_version_misses():
+    version = {"svm": "v1"}
+    cache = PredictionCache(lambda name: version[name])
+    cache.predict(["ok"], "svm", lambda texts: ["old"] * len(texts))
+    version["svm"] = "v2"
+    assert cache.predict(["ok"], "svm", lambda texts: ["new"] * len(texts)) == ["new"]
+
+
+def test_registry_reloads_retrained_artifacts(tmp_path):
+    for name in os.listdir(MODELS_DIR):
+        if name.startswith("svm_"):
+            shutil.copy(os.path.join(MODELS_DIR, name), tmp_path / name)
+    reg = ModelRegistry(tmp_path)
+    first = reg.get("svm")
+    assert reg.reload_if_changed("svm", interval=0) is first
+
+    # "deploy" a retrained model: same file name, new contents/mtime
+    path = tmp_path / "svm_config.json"
+    path.write_text(path.read_text() + "\n")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    second = reg.reload_if_changed("svm", interval=0)
+    assert second is not first
+    assert second.fingerprint != first.fingerprint
+    assert reg.get("svm") is second
+
+
+def test_failed_reload_keeps_serving_and_retries(tmp_path):
+    for name in os.listdir(MODELS_DIR):
+        if name.startswith("svm_"):
+            shutil.copy(os.path.join(MODELS_DIR, name), tmp_path / name)
+    reg = ModelRegistry(tmp_path)
+    first = reg.get("svm")
+
+    # half-deployed model: the artifacts changed but cannot be loaded yet
+    path = tmp_path / "svm_config.json"
+    good = path.read_text()
+    path.write_text("{not json")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert reg.reload_if_changed("svm", interval=0) is first
+    assert reg.reload_if_changed("svm", interval=3600) is first  # throttled until the next interval
+    assert reg.get("svm") is first
+
+    path.write_text(good + "\n")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 2 * 10**9))
+    second = reg.reload_if_changed("svm", interval=0)
+    assert second is not first and reg.get("svm") is second
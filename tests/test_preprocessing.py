@@ -5,6 +5,7 @@ from pathlib import Path
 import csv
 import json
 import shutil
+import pytest
 
 # Import functions from your preprocessing module.
 # This assumes you placed the combined script at src/preprocess_csvs.py
@@ -61,3 +62,101 @@ def test_preprocess_file_writes_output(tmp_path):
     assert any("I love it" in x for x in df['text'].values)
     assert "negative" in df['sentiment'].values
 
+
+def _rows(n):
+    return [((i % 5) + 1, f"Title {i}", f"Review number {i} is about this product") for i in range(n)]
+
+
+def test_preprocess_file_parallel_output_is_ordered(tmp_path):
+    inp = tmp_path / "train.csv"
+    _write_small_csv(inp, _rows(50))
+    seq, par = tmp_path / "seq.csv", tmp_path / "par.csv"
+    preprocess_file(str(inp), str(seq), chunksize=7, workers=1)
+    preprocess_file(str(inp), str(par), chunksize=7, workers=2)
+    assert seq.read_bytes() == par.read_bytes()
+    assert len(pd.read_csv(par)) == 50
+
+
+def test_preprocess_file_resumes_after_interruption(tmp_path, monkeypatch):
+    import src.preprocessing as pp
+
+    inp = tmp_path / "train.csv"
+    _write_small_csv(inp, _rows(40))
+    full, out = tmp_path / "full.csv", tmp_path / "out.csv"
+    preprocess_file(str(inp), str(full), chunksize=10, workers=1)
+
+    original = pp.process_chunk
+    calls = []
+
+    def crash_on_third_chunk(chunk):
+        calls.append(len(chunk))
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return original(chunk)
+
+    monkeypatch.setattr(pp, "process_chunk", crash_on_third_chunk)
+    try:
+        preprocess_file(str(inp), str(out), chunksize=10, workers=1)
+    except KeyboardInterrupt:
+        pass
+    with open(out, "a", encoding="utf8") as f:
+        f.write("half-written,row")  # torn write from the interrupted chunk
+    monkeypatch.setattr(pp, "process_chunk", original)
+
+    state = preprocess_file(str(inp), str(out), chunksize=10, workers=1)
+    assert state["finished"] and state["rows_in"] == 40
+    assert out.read_bytes() == full.read_bytes()
+    # a finished output is not reprocessed, an unknown existing file is not overwritten
+    assert preprocess_file(str(inp), str(out), chunksize=10)["finished"]
+    stray = tmp_path / "stray.csv"
+    stray.write_text("x")
+    with pytest.raises(FileExistsError):
+        preprocess_file(str(inp), str(stray), chunksize=10)
+
+
+def test_preprocess_file_drops_duplicates_across_chunks(tmp_path):
+    inp = tmp_path / "train.csv"
+    rows = _rows(20)
+    _write_small_csv(inp, rows + rows[:5] + [(5, "Title 1", "Review number 1 is about this product!")])
+    for workers in (1, 2):  # cleaned in the pool, deduplicated in this process in input order
+        out = tmp_path / f"out{workers}.csv"
+        state = preprocess_file(str(inp), str(out), chunksize=8, workers=workers, near_duplicates=True)
+        df = pd.read_csv(out)
+        assert len(df) == 20 and df["text"].is_unique
+        assert state["duplicates_dropped"] == 5
+        assert state["near_duplicates_dropped"] == 1
+    assert (tmp_path / "out1.csv").read_bytes() == (tmp_path / "out2.csv").read_bytes()
+
+
+def test_preprocess_file_parquet_output_resumes(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    import src.preprocessing as pp
+
+    inp = tmp_path / "train.csv"
+    _write_small_csv(inp, _rows(30))
+    out = tmp_path / "train_clean.parquet"
+    original = pp.process_chunk
+
+    def crash_on_second_chunk(chunk):
+        if chunk["text"].str.contains("Title 10").any():
+            raise KeyboardInterrupt
+        return original(chunk)
+
+    monkeypatch.setattr(pp, "process_chunk", crash_on_second_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        preprocess_file(str(inp), str(out), chunksize=10, workers=1)
+    monkeypatch.setattr(pp, "process_chunk", original)
+    preprocess_file(str(inp), str(out), chunksize=10, workers=1)
+
+    df = pd.read_parquet(out)
+    assert df["text"].tolist() == [f"Title {i}. Review number {i} is about this product" for i in range(30)]
+    assert str(df["score"].dtype) == "int8"
+
+
+def test_iterations_keeps_its_300_row_unit(tmp_path):
+    inp = tmp_path / "train.csv"
+    _write_small_csv(inp, _rows(700))
+    out = tmp_path / "out.csv"
+    with pytest.warns(DeprecationWarning, match="max_rows"):
+        state = preprocess_file(str(inp), str(out), iterations=2, chunksize=250, workers=1)
+    assert state["rows_in"] == 600
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from src.processed_data import iter_processed, load_processed, processed_path, row_groups, write_part
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _frame(n, start=0):
+    return pd.DataFrame({
+        "text": [f"review {i}" for i in range(start, start + n)],
+        "language": ["en"] * n,
+        "score": [(i % 5) + 1 for i in range(start, start + n)],
+        "sentiment": ["positive" if i % 2 else "negative" for i in range(start, start + n)],
+    })
+
+
+def test_parquet_parts_are_typed_and_sampled_by_row_group(tmp_path):
+    dataset = str(tmp_path / "train_clean.parquet")
+    for i in range(4):
+        write_part(_frame(50, start=50 * i), dataset, i, row_group_size=10)
+    assert len(row_groups(dataset)) == 20
+    assert processed_path("train_clean", processed_dir=str(tmp_path)) == dataset
+
+    full = load_processed(dataset, columns=["text", "language", "score", "sentiment"])
+    assert full["text"].tolist() == [f"review {i}" for i in range(200)]
+    assert str(full["score"].dtype) == "int8"
+    assert str(full["sentiment"].dtype) == "category"
+
+    sample = load_processed(dataset, columns=["text"], max_samples=25, random_state=0)
+    assert list(sample.columns) == ["text"] and len(sample) == 25
+    assert sample.equals(load_processed(dataset, columns=["text"], max_samples=25, random_state=0))
+
+
+def test_csv_input_still_supported(tmp_path):
+    path = tmp_path / "train_clean.csv"
+    _frame(30).to_csv(path, index=False)
+    assert processed_path("train_clean", processed_dir=str(tmp_path)) == str(path)
+    df = load_processed(str(path), columns=["text", "sentiment"], max_samples=10)
+    assert list(df.columns) == ["text", "sentiment"] and len(df) == 10
+
+
+def test_iter_processed_streams_in_order(tmp_path):
+    dataset = str(tmp_path / "train_clean.parquet")
+    write_part(_frame(25), dataset, 0)
+    write_part(_frame(25, start=25), dataset, 1)
+    csv = tmp_path / "train_clean.csv"
+    _frame(50).to_csv(csv, index=False)
+    for path in (dataset, str(csv)):
+        chunks = list(iter_processed(path, columns=["text"], batch_size=10))
+        assert max(len(c) for c in chunks) <= 10
+        assert pd.concat(chunks)["text"].tolist() == [f"review {i}" for i in range(50)]
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src import db
+from src.product_similarity import SimilarityIndex, blocked_top_k, product_vectors, iter_positive_reviews
+
+REVIEWS = [
+    ("phone", "great battery life and a bright screen"),
+    ("phone", "screen is sharp, battery lasts two days"),
+    ("tablet", "big bright screen and long battery life"),
+    ("kettle", "boils water fast, quiet kettle"),
+    ("teapot", "keeps water hot, lovely for tea"),
+    ("kettle", "water boils in a minute"),
+    ("novel", "gripping story, could not put the book down"),
+]
+
+
+@pytest.fixture
+def vectorizer():
+    return TfidfVectorizer().fit([t for _, t in REVIEWS])
+
+
+def chunks(size):
+    for start in range(0, len(REVIEWS), size):
+        part = REVIEWS[start:start + size]
+        yield [p for p, _ in part], [t for _, t in part]
+
+
+def test_product_vectors_are_normalized_means(vectorizer):
+    ids, vectors, n_reviews = product_vectors(chunks(3), vectorizer)
+    assert ids == ["phone", "tablet", "kettle", "teapot", "novel"]
+    assert n_reviews.tolist() == [2, 1, 2, 1, 1]
+    X = vectorizer.transform([t for _, t in REVIEWS]).toarray()
+    phone = X[:2].mean(axis=0)
+    np.testing.assert_allclose(vectors[0].toarray().ravel(), phone / np.linalg.norm(phone), rtol=1e-5)
+    np.testing.assert_allclose(sp.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+
+
+@pytest.mark.parametrize("dense", [False, True])
+@pytest.mark.parametrize("block_size", [1, 7, 64])
+def test_blocked_top_k_matches_brute_force(dense, block_size):
+    rng = np.random.default_rng(0)
+    X = sp.random(50, 30, density=0.2, random_state=1, format="csr", dtype=np.float32)
+    X = sp.csr_matrix(X / np.maximum(sp.linalg.norm(X, axis=1), 1e-9)[:, None])
+    vectors = X.toarray() if dense else X
+    neighbors, scores = blocked_top_k(vectors, k=5, block_size=block_size)
+    full = (X @ X.T).toarray()
+    np.fill_diagonal(full, -np.inf)
+    for row in rng.choice(50, 10, replace=False):
+        np.testing.assert_allclose(scores[row], np.sort(full[row])[::-1][:5], rtol=1e-5)
+        assert row not in neighbors[row]
+
+
+@pytest.mark.parametrize("n_components", [None, 3])
+def test_index_similar_and_round_trip(tmp_path, vectorizer, n_components):
+    index = SimilarityIndex.build(chunks(2), vectorizer, n_components=n_components, top_k=2)
+    assert index.similar("phone", 1)[0][0] == "tablet"
+    assert index.similar("kettle", 1)[0][0] == "teapot"
+    assert index.similar("unknown") == []
+    assert [p for p, _ in index.similar("phone", 4)][0] == "tablet"  # beyond the stored top_k
+
+    index.save(tmp_path / "idx")
+    loaded = SimilarityIndex.load(tmp_path / "idx")
+    assert loaded.meta == index.meta
+    for pid in index.product_ids:
+        assert loaded.similar(pid, 2) == pytest.approx(index.similar(pid, 2))
+
+
+def test_iter_positive_reviews_reads_scored_reviews(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(db, "_engines", {})
+    db.init_db()
+    with db.session_scope() as session:
+        session.add_all(db.Review(product_id=p, review_text=t, sentiment=i % 3 != 2) for i, (p, t) in enumerate(REVIEWS))
+        session.add(db.Review(product_id="phone", review_text="unscored"))
+    read = [(p, t) for ids, texts in iter_positive_reviews(chunk_rows=2) for p, t in zip(ids, texts)]
+    assert read == [r for i, r in enumerate(REVIEWS) if i % 3 != 2]
+    db.get_engine().dispose()
+
+
+def test_service_reloads_a_rebuilt_index(tmp_path, monkeypatch, vectorizer):
+    from sentiment_app.services import recommendations
+
+    monkeypatch.setattr(recommendations, "INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(recommendations, "_index_state", {"index": None, "mtime": None, "checked": 0.0})
+    assert recommendations.similarity_index(interval=0) is None  # nothing built yet
+
+    SimilarityIndex.build(chunks(2), vectorizer, top_k=2).save(tmp_path)
+    first = recommendations.similarity_index(interval=0)
+    assert first is not None and "phone" in first
+    assert recommendations.similarity_index(interval=0) is first
+
+    SimilarityIndex.build(chunks(7), vectorizer, top_k=1).save(tmp_path)
+    os.utime(tmp_path / "meta.json", ns=(1, 1))  # a new mtime even on coarse clocks
+    second = recommendations.similarity_index(interval=0)
+    assert second is not first and second.neighbors.shape[1] == 1
+
+
+def test_sparse_rebuild_replaces_dense_index(tmp_path, vectorizer):
+    SimilarityIndex.build(chunks(2), vectorizer, n_components=3, top_k=2).save(tmp_path)
+    fewer = [r for r in REVIEWS if r[0] != "novel"]
+    sparse = SimilarityIndex.build([([p for p, _ in fewer], [t for _, t in fewer])], vectorizer, top_k=2)
+    sparse.save(tmp_path)
+    assert not (tmp_path / "vectors.npy").exists()
+
+    loaded = SimilarityIndex.load(tmp_path)
+    assert sp.issparse(loaded.vectors)
+    assert loaded.vectors.shape[0] == len(loaded) == 4
+    assert loaded.similar("phone", 10) == pytest.approx(sparse.similar("phone", 10))
@@ -0,0 +1,96 @@
+import random
+
+import pytest
+from sqlalchemy import select
+
+from src import db
+from src.product_stats import (record_scored, rebuild_product_stats, top_products, sample_top_products,
+                                recommend_from_stats)
+from src.sentiment_backfill import backfill
+
+
+@pytest.fixture
+def stats_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(db, "_engines", {})
+    db.init_db()
+    yield
+    db.get_engine().dispose()
+
+
+def stats_rows():
+    with db.session_scope(readonly=True) as session:
+        return {
+            s.product_id: (s.positive, s.neutral, s.negative, s.rating_count, s.mean_rating)
+            for s in session.scalars(select(db.ProductSentimentStats))
+        }
+
+
+def add_reviews(rows):
+    with db.session_scope() as session:
+        session.add_all(db.Review(product_id=p, user_id="u", rating=r, review_text=t) for p, r, t in rows)
+
+
+def test_backfill_maintains_stats_incrementally(stats_db):
+    rng = random.Random(0)
+    words = ["good", "bad", "ok"]
+    rows = [(f"p{rng.randrange(7)}", rng.choice([1.0, 3.0, 5.0, None]), rng.choice(words)) for _ in range(200)]
+    add_reviews(rows[:120])
+    score = lambda texts: ["positive" if t == "good" else "neutral" if t == "ok" else "negative" for t in texts]
+    backfill("svm", batch_size=16, score=score)
+    add_reviews(rows[120:])
+    backfill("svm", batch_size=16, score=score)
+    incremental = stats_rows()
+
+    with db.session_scope() as session:
+        assert rebuild_product_stats(session) == len(incremental)
+    assert stats_rows().keys() == incremental.keys()
+    for pid, (pos, neu, neg, n_rated, mean) in stats_rows().items():
+        assert incremental[pid][:4] == (pos, neu, neg, n_rated)
+        assert incremental[pid][4] == pytest.approx(mean)
+    assert sum(sum(v[:3]) for v in incremental.values()) == 200
+
+
+def test_top_products_order_and_sampling(stats_db):
+    with db.session_scope() as session:
+        record_scored(session, ["a", "b", "b", "c", "c", "c", "d"], [5, 4, None, 1, 2, 3, 5], [1, 1, 1, 1, 1, 0, 0])
+        record_scored(session, ["a"], [1], [1])
+    with db.session_scope(readonly=True) as session:
+        assert top_products(session, 2) == ["c", "b"]
+        assert top_products(session, 10) == ["c", "b", "a"]  # d has no positive review
+        sample = sample_top_products(session, 2, pool=3, rng=random.Random(1))
+        assert len(sample) == 2 and set(sample) <= {"a", "b", "c"}
+        a = session.get(db.ProductSentimentStats, "a")
+        assert (a.positive, a.rating_count, a.mean_rating) == (2, 2, 3.0)
+
+
+def test_recommend_products_reads_stats(stats_db):
+    from src.recommender import recommend_products
+    with db.session_scope() as session:
+        record_scored(session, ["x", "y", "y"], [None] * 3, [1, 1, 1])
+    result = recommend_products("I love this, it is great!", model_name="svm")
+    assert set(result["recommended_products"]) <= {"x", "y"}
+    if result["user_sentiment"] == "positive":
+        assert result["recommended_products"] == ["y", "x"]
+
+
+def test_recommend_from_stats_pools_non_positive_users(stats_db):
+    with db.session_scope() as session:
+        record_scored(session, [f"p{i:03d}" for i in range(150)], [None] * 150, [1] * 150)
+    assert recommend_from_stats(True, k=3) == ["p149", "p148", "p147"]
+    for _ in range(20):
+        picked = recommend_from_stats(False, k=5, pool=100)
+        assert len(picked) == 5 and all(p >= "p050" for p in picked)
+
+
+
+def test_unsupported_dialect_fails_before_scoring(monkeypatch):
+    from types import SimpleNamespace
+    from src import sentiment_backfill
+
+    monkeypatch.setattr(sentiment_backfill, "get_engine",
+                        lambda readonly=False: SimpleNamespace(dialect=SimpleNamespace(name="oracle")))
+    scored = []
+    with pytest.raises(ValueError, match="mysql, postgresql, sqlite"):
+        backfill("svm", score=lambda texts: scored.extend(texts) or ["positive"] * len(texts))
+    assert scored == []
@@ -1,6 +1,8 @@
+import os
+import joblib
 import pytest
 import pandas as pd
-from src.recommender import predict_sentiment, recommend_products
+from src.recommender import predict_sentiment, predict_sentiment_batch, recommend_products, MODELS_DIR
 
 def test_predict_sentiment_nb():
     text = "I love this product!"
@@ -27,3 +29,69 @@ def test_recommend_products():
     assert "user_sentiment" in result
     assert "recommended_products" in result
     assert isinstance(result["recommended_products"], list)
+
+@pytest.mark.parametrize("model_name,prefix", [("nb", "naive_bayes"), ("svm", "svm")])
+def test_predict_sentiment_batch_matches_sklearn(model_name, prefix):
+    # reference: the raw training artifacts, without the registry / LinearScorer fast path
+    paths = [os.path.join(MODELS_DIR, f"{prefix}_{part}.joblib") for part in ("model", "tfidf", "label_encoder")]
+    missing = [p for p in paths if not os.path.exists(p)]
+    if missing:
+        pytest.skip(f"model artifact not found: {missing[0]}")
+    model, vectorizer, label_enc = (joblib.load(p) for p in paths)
+    texts = ["I love this product!", "Terrible experience.", "", "It is okay I guess."]
+    expected = label_enc.inverse_transform(model.predict(vectorizer.transform(texts))).tolist()
+    batch = predict_sentiment_batch(texts, model_name=model_name, batch_size=3, use_cache=False)
+    assert batch == expected
+
+def test_predict_sentiment_batch_return_array():
+    preds = predict_sentiment_batch(["good", "bad"], model_name="svm", return_array=True)
+    assert preds.shape == (2,)
+    assert set(preds) <= {"positive", "neutral", "negative"}
+
+def test_predict_sentiment_batch_unknown_model():
+    with pytest.raises(ValueError):
+        predict_sentiment_batch(["text"], model_name="bert")
+
+def _is_positive_val_reference(v):
+    # the row-wise normalization recommend_products used before positive_mask
+    if pd.isna(v):
+        return False
+    if isinstance(v, (int, float)):
+        return int(v) == 1
+    return str(v).strip().lower() in {"positive", "pos", "1", "true", "yes"}
+
+@pytest.mark.parametrize("values,dtype", [
+    ([1, 0, 1, 2, -1], None),
+    ([1.0, 0.0, float("nan"), 1.7, 2.0, 0.9], None),
+    ([1, None, 0, 1], "Int8"),
+    ([True, False, True], None),
+    (["positive", " POS ", "negative", None, "Yes", "1", "neutral"], None),
+    (["positive", "negative", None, "pos"], "category"),
+    ([1, "positive", 0.0, None, "no", True], object),
+])
+def test_positive_mask_matches_rowwise_normalization(values, dtype):
+    from src.recommender import positive_mask
+    s = pd.Series(values, dtype=dtype)
+    expected = [_is_positive_val_reference(v) for v in s.astype(object)]
+    assert positive_mask(s).tolist() == expected
+
+def test_recommend_products_normalized_sentiment():
+    df = pd.DataFrame({
+        "product_id": ["p1", "p2", "p3", "p1", "p2"],
+        "review_text": ["good", "bad", "good", "excellent", "ok"],
+        "sentiment": pd.Series([1, 0, 1, 1, 0], dtype="int8"),
+    })
+    result = recommend_products("I like this!", df, model_name="svm", normalized_sentiment=True)
+    assert set(result["recommended_products"]) <= {"p1", "p3"}
+    if result["user_sentiment"] == "positive":
+        assert result["recommended_products"] == ["p1", "p3"]
+
+def test_normalized_sentiment_treats_neutral_code_as_not_positive():
+    from src.recommender import positive_mask
+    s = pd.Series([1, 0, 2, 1, None], dtype="Int8")
+    assert positive_mask(s, normalized=True).tolist() == [True, False, False, True, False]
+
+def test_normalized_sentiment_rejects_non_integer_column():
+    df = pd.DataFrame({"product_id": ["p1"], "review_text": ["good"], "sentiment": ["positive"]})
+    with pytest.raises(TypeError):
+        recommend_products("I like this!", df, model_name="svm", normalized_sentiment=True)
@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import select
+
+from src import db
+from src.sentiment_backfill import backfill, encode_sentiments, shard_key
+
+
+@pytest.fixture
+def reviews_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(db, "_engines", {})
+    db.init_db()
+    yield
+    db.get_engine().dispose()
+
+
+def add_reviews(texts):
+    with db.session_scope() as session:
+        session.add_all(db.Review(product_id="p", user_id="u", review_text=t) for t in texts)
+
+
+def sentiments():
+    with db.session_scope(readonly=True) as session:
+        return dict(session.execute(select(db.Review.id, db.Review.sentiment)).all())
+
+
+def keyword_score(texts):
+    return ["positive" if "good" in t else "neutral" if "ok" in t else "negative" for t in texts]
+
+
+def test_backfill_scores_in_batches_and_resumes(reviews_db):
+    add_reviews(["good", "bad", "ok"] * 5)
+    stats = backfill("svm", batch_size=4, score=keyword_score)
+    assert (stats["rows"], stats["batches"], stats["last_id"]) == (15, 4, 15)
+    assert sentiments() == {i: [1, 0, 2][(i - 1) % 3] for i in range(1, 16)}
+
+    # new reviews arrive: only they are read, starting from the checkpoint
+    add_reviews(["good", "bad"])
+    seen = []
+    stats = backfill("svm", batch_size=4, score=lambda t: seen.extend(t) or keyword_score(t))
+    assert seen == ["good", "bad"] and stats["last_id"] == 17
+    with db.session_scope(readonly=True) as session:
+        checkpoint = session.get(db.BackfillCheckpoint, shard_key("svm", 0, 1))
+        assert (checkpoint.last_id, checkpoint.rows) == (17, 17)
+
+
+def test_failed_batch_is_not_checkpointed(reviews_db):
+    add_reviews(["good"] * 6)
+    with pytest.raises(ValueError):
+        backfill("nb", batch_size=3, score=lambda texts: ["great"] * len(texts))
+    assert set(sentiments().values()) == {None}
+    assert backfill("nb", batch_size=3, score=keyword_score)["rows"] == 6
+
+
+def test_shards_partition_the_table(reviews_db):
+    add_reviews([f"good {i}" for i in range(10)])
+    seen = []
+    for shard in range(3):
+        stats = backfill("svm", batch_size=2, shard=shard, shards=3,
+                         score=lambda t: seen.extend(t) or keyword_score(t))
+        assert stats["rows"] == len(range(shard or 3, 11, 3))
+    assert sorted(seen) == sorted(f"good {i}" for i in range(10))
+    assert set(sentiments().values()) == {1}
+
+
+def test_skip_locked_mode_and_max_batches(reviews_db):
+    add_reviews(["bad"] * 5)
+    assert backfill("svm", batch_size=2, skip_locked=True, max_batches=2, score=keyword_score)["rows"] == 4
+    assert backfill("svm", batch_size=2, skip_locked=True, score=keyword_score)["rows"] == 1
+    assert set(sentiments().values()) == {0}
+
+
+def test_encode_sentiments():
+    assert encode_sentiments(["Positive", "negative ", "neutral"]) == [1, 0, 2]
+    with pytest.raises(ValueError):
+        encode_sentiments(["mixed"])
+
+
+def test_rows_below_the_checkpoint_are_rescanned(reviews_db):
+    add_reviews(["good"] * 6)
+    assert backfill("svm", batch_size=4, score=keyword_score)["last_id"] == 6
+    # committed late with a lower id / reset for re-scoring: below the checkpoint
+    with db.session_scope() as session:
+        session.get(db.Review, 2).sentiment = None
+        session.get(db.Review, 5).sentiment = None
+    seen = []
+    stats = backfill("svm", batch_size=4, score=lambda t: seen.extend(t) or keyword_score(t))
+    assert stats["rows"] == 2 and len(seen) == 2
+    assert set(sentiments().values()) == {1}
+    with db.session_scope(readonly=True) as session:
+        assert session.get(db.BackfillCheckpoint, shard_key("svm", 0, 1)).last_id == 6
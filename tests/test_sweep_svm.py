@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.sweep_svm import run_sweep
+
+POS = "great love works perfect fast excellent".split()
+NEG = "terrible broke hate slow awful refund".split()
+FILLER = "the it and product item price".split()
+
+
+def _data(n, seed):
+    rng = np.random.RandomState(seed)
+    y = rng.randint(0, 2, size=n)
+    texts = [" ".join(rng.choice((POS if label else NEG) + FILLER, size=8)) for label in y]
+    return texts, y
+
+
+def test_sweep_leaderboard(tmp_path):
+    X_train, y_train = _data(400, 0)
+    X_val, y_val = _data(100, 1)
+    grid = {"estimator": ["linear_svc", "sgd"], "ngram_range": [(1, 1), (1, 2)],
+            "max_features": [5, 50], "C": [0.1, 1.0], "max_iter": [1000]}
+
+    board = run_sweep(X_train, y_train, X_val, y_val, grid, n_jobs=2, cache_dir=tmp_path)
+
+    assert len(board) == 2 * 2 * 2 * 2
+    assert board["macro_f1"].is_monotonic_decreasing
+    assert board["macro_f1"].iloc[0] > 0.9
+    assert {"train_seconds", "predict_seconds", "n_iter", "converged", "vectorize_seconds"} <= set(board)
+    sgd = board[board["estimator"] == "sgd"]
+    # along each SGD path only the first (smallest C) fit starts cold
+    assert set(sgd.loc[~sgd["warm_start"], "C"]) == {0.1}
+    assert not board.loc[board["estimator"] == "linear_svc", "warm_start"].any()
+    # one count cache entry per ngram_range, reused for every max_features
+    assert len(list(tmp_path.glob("*.npz"))) == 2